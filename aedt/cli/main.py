@@ -4,7 +4,10 @@ This module provides the main command-line interface for AEDT.
 """
 
 import click
+import logging
+import re
 import sys
+from datetime import datetime
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -60,5 +63,98 @@ def init(force: bool, is_global: bool):
         raise click.Abort()
 
 
+def _parse_time(value: str, option: str) -> float:
+    """Parse an ISO 8601 local time option into Unix time"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise click.BadParameter(f"无效的时间: {value}（示例: 2025-01-31T12:00）",
+                                 param_hint=option)
+
+
+@cli.command()
+@click.option('--project', 'project_name', help='只查询该项目的 Epic 日志')
+@click.option('--epic', 'epic_id', help='只查询该 Epic 的日志')
+@click.option('--agent', 'agent_id', help='只显示该 Agent 的记录')
+@click.option('--level', type=click.Choice(['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+                                           case_sensitive=False),
+              help='最低日志级别')
+@click.option('--since', help='起始时间 (ISO 8601)')
+@click.option('--until', help='结束时间 (ISO 8601)')
+@click.option('--grep', 'pattern', help='正则表达式过滤')
+@click.option('-n', '--limit', type=click.IntRange(min=1),
+              help='最多显示的记录数（跟踪时为先显示的最近记录数，默认 10）')
+@click.option('-f', '--follow', is_flag=True, help='持续显示新写入的记录（跨日志轮转）')
+def logs(project_name, epic_id, agent_id, level, since, until, pattern, limit, follow):
+    """查询 AEDT 日志
+
+    在全局日志和 Epic 日志（包括已轮转和压缩的历史文件）中查询记录，
+    利用日志索引跳过不相关的部分。使用 -f 时先显示最近的记录，然后
+    持续显示新记录，多个日志按时间合并，按 Ctrl+C 结束。
+
+    示例:
+        aedt logs --level ERROR --agent agent-1
+        aedt logs --project demo --epic 3 --since 2025-01-31T09:00
+        aedt logs --grep "timeout" -n 20
+        aedt logs -f --project demo --level WARNING
+    """
+    # Imported here to keep CLI startup fast for the other commands
+    from aedt.core.log_index import LogQuery, find_log_files, query_log
+
+    try:
+        regex = re.compile(pattern) if pattern else None
+    except re.error as e:
+        raise click.BadParameter(f"无效的正则表达式: {e}", param_hint='--grep')
+
+    query = LogQuery(
+        min_level=getattr(logging, level.upper()) if level else logging.NOTSET,
+        agent_id=agent_id,
+        epic_id=epic_id,
+        since=_parse_time(since, '--since') if since else None,
+        until=_parse_time(until, '--until') if until else None,
+        pattern=regex,
+    )
+
+    aedt_dir = Path.cwd() / ".aedt"
+    if follow:
+        _follow_logs(aedt_dir, project_name, epic_id, query, limit or 10)
+        return
+
+    log_files = find_log_files(aedt_dir, project_name=project_name, epic_id=epic_id)
+    if not log_files:
+        click.echo(click.style('未找到日志文件', fg='yellow'), err=True)
+        return
+
+    shown = 0
+    for log_file in log_files:
+        for entry in query_log(log_file, query):
+            click.echo(entry.text)
+            shown += 1
+            if limit is not None and shown >= limit:
+                return
+
+
+def _follow_logs(aedt_dir: Path, project_name, epic_id, query, backlog: int):
+    """Print matching records as they are written until interrupted"""
+    from aedt.core.log_follow import follow_logs
+    from aedt.core.log_index import find_log_files
+
+    if not aedt_dir.is_dir():
+        click.echo(click.style('未找到 .aedt 目录', fg='yellow'), err=True)
+        return
+
+    def discover():
+        return find_log_files(aedt_dir, project_name=project_name, epic_id=epic_id)
+
+    entries = follow_logs(discover(), query=query, backlog=backlog, discover=discover)
+    try:
+        for entry in entries:
+            click.echo(entry.text)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        entries.close()
+
+
 if __name__ == '__main__':
     cli()
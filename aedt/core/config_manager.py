@@ -3,18 +3,28 @@
 This module handles initialization, loading, and validation of AEDT configuration files.
 """
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field, fields, is_dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from types import MappingProxyType
 import yaml
 import logging
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+
+import aedt
+from aedt.core.config_schema import Field, ObjectSchema
+from aedt.core.file_watcher import WatchSubscription, get_watcher_service
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True)
 class SubagentConfig:
     """Subagent configuration"""
     max_concurrent: int = 5
@@ -22,24 +32,21 @@ class SubagentConfig:
     model: str = "claude-sonnet-4"
 
 
-@dataclass
+@dataclass(frozen=True)
 class QualityGatesConfig:
     """Quality gates configuration"""
-    pre_commit: List[str] = None
-    epic_complete: List[str] = None
-    pre_merge: List[str] = None
+    pre_commit: Tuple[str, ...] = ()
+    epic_complete: Tuple[str, ...] = ()
+    pre_merge: Tuple[str, ...] = ()
 
     def __post_init__(self):
-        """Initialize empty lists if None"""
-        if self.pre_commit is None:
-            self.pre_commit = []
-        if self.epic_complete is None:
-            self.epic_complete = []
-        if self.pre_merge is None:
-            self.pre_merge = []
+        """Store gate lists as tuples (None means no gates)"""
+        for f in fields(self):
+            value = getattr(self, f.name)
+            object.__setattr__(self, f.name, tuple(value) if value is not None else ())
 
 
-@dataclass
+@dataclass(frozen=True)
 class GitConfig:
     """Git configuration"""
     worktree_base: str = ".aedt/worktrees"
@@ -47,34 +54,199 @@ class GitConfig:
     auto_cleanup: bool = True
 
 
-@dataclass
+@dataclass(frozen=True)
+class StateConfig:
+    """State persistence configuration"""
+    backend: str = "file"  # file/sqlite
+    sqlite_path: str = ".aedt/state.db"  # Relative to the project root
+
+
+@dataclass(frozen=True)
 class AEDTConfig:
-    """AEDT main configuration"""
+    """AEDT main configuration
+
+    Immutable, like its sections: a published config can be shared between
+    threads. Derive a changed copy with dataclasses.replace, e.g.
+    replace(config, subagent=replace(config.subagent, max_concurrent=10)).
+    """
     version: str
     subagent: SubagentConfig
     quality_gates: QualityGatesConfig
     git: GitConfig
+    state: StateConfig = field(default_factory=StateConfig)
+
+
+# Declarative schema of config.yaml. Compiled once at import; reuse it for
+# other inputs, e.g. AEDT_CONFIG_SCHEMA.compile(partial=True) for overrides.
+AEDT_CONFIG_SCHEMA = ObjectSchema({
+    'version': Field(str, required=True),
+    'subagent': Field(ObjectSchema({
+        'max_concurrent': Field(int, default=5, gt=0),
+        'timeout': Field(int, default=3600, gt=0),
+        'model': Field(str, default="claude-sonnet-4"),
+    }, factory=SubagentConfig), required=True),
+    'quality_gates': Field(ObjectSchema({
+        'pre_commit': Field(list, items=Field(str), nullable=True, default_factory=list),
+        'epic_complete': Field(list, items=Field(str), nullable=True, default_factory=list),
+        'pre_merge': Field(list, items=Field(str), nullable=True, default_factory=list),
+    }, factory=QualityGatesConfig), required=True),
+    'git': Field(ObjectSchema({
+        'worktree_base': Field(str, default=".aedt/worktrees"),
+        'branch_prefix': Field(str, default="epic"),
+        'auto_cleanup': Field(bool, default=True),
+    }, factory=GitConfig), required=True),
+    'state': Field(ObjectSchema({
+        'backend': Field(str, default="file", choices=("file", "sqlite")),
+        'sqlite_path': Field(str, default=".aedt/state.db"),
+    }, factory=StateConfig), nullable=True, default_factory=StateConfig),
+}, unknown="ignore", factory=AEDTConfig)
+
+_config_validator = AEDT_CONFIG_SCHEMA.compile()
+
+
+def flatten_config(config: Any, prefix: str = "") -> Dict[str, Any]:
+    """Flatten a config dataclass tree into a dot-path lookup table
+
+    Both sections and leaves are included, e.g. 'subagent' maps to the
+    SubagentConfig object and 'subagent.max_concurrent' to its value.
+
+    Args:
+        config: Config dataclass instance
+        prefix: Key prefix for nested sections
+
+    Returns:
+        Dictionary mapping dot-path keys to values
+    """
+    table: Dict[str, Any] = {}
+    for f in fields(config):
+        key = f"{prefix}{f.name}"
+        value = getattr(config, f.name)
+        table[key] = value
+        if is_dataclass(value):
+            table.update(flatten_config(value, prefix=f"{key}."))
+    return table
+
+
+@dataclass(frozen=True)
+class ConfigChange:
+    """A single changed configuration value"""
+    key: str  # Dot-path key, e.g. 'subagent.max_concurrent'
+    old_value: Any
+    new_value: Any
+
+
+def diff_configs(old: Optional[AEDTConfig], new: Optional[AEDTConfig]) -> List[ConfigChange]:
+    """Compute the leaf-level differences between two configurations
+
+    Args:
+        old: Previous configuration (None counts as empty)
+        new: New configuration (None counts as empty)
+
+    Returns:
+        Changes sorted by key; sections themselves are not reported,
+        only the leaves that differ
+    """
+    old_table = flatten_config(old) if old is not None else {}
+    new_table = flatten_config(new) if new is not None else {}
+
+    changes = []
+    for key in sorted(old_table.keys() | new_table.keys()):
+        old_value = old_table.get(key)
+        new_value = new_table.get(key)
+        if is_dataclass(old_value) or is_dataclass(new_value):
+            continue
+        if old_value != new_value:
+            changes.append(ConfigChange(key, old_value, new_value))
+    return changes
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """An immutable view of one published configuration
+
+    A snapshot pairs a config with the lookup table and source identity it
+    was built from. ConfigManager replaces its snapshot with a single
+    reference assignment, so a reader holding one never sees fields of two
+    different loads. The config dataclasses are frozen; change configuration
+    through ``dataclasses.replace`` and ``ConfigManager.save_config``.
+    """
+    config: Optional[AEDTConfig] = None
+    values: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    content_hash: Optional[str] = None  # SHA-256 of config.yaml (file mode)
+    source_key: Optional[Tuple[Any, ...]] = None  # Layer keys (layered mode)
+    generation: int = 0  # Incremented on every publish
 
-
-class ConfigFileHandler(FileSystemEventHandler):
-    """File system event handler for config file changes"""
-
-    def __init__(self, config_manager):
-        """Initialize handler
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a configuration value using dot notation
 
         Args:
-            config_manager: ConfigManager instance to notify on changes
+            key: Configuration key, e.g. 'subagent.max_concurrent'
+            default: Default value if key not found
+
+        Returns:
+            Configuration value or default if not found
         """
-        self.config_manager = config_manager
+        return self.values.get(key, default)
 
-    def on_modified(self, event):
-        """Handle file modification event
 
-        Args:
-            event: File system event
-        """
-        if event.src_path.endswith('config.yaml'):
-            self.config_manager.reload_config()
+def merge_config_layers(*layers: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep-merge raw config dictionaries, later layers winning
+
+    Nested mappings are merged key by key; any other value (including
+    lists) replaces the earlier one.
+
+    Args:
+        *layers: Raw config dictionaries, lowest priority first
+
+    Returns:
+        New merged dictionary (inputs are not modified)
+    """
+    merged: Dict[str, Any] = {}
+    for layer in layers:
+        for key, value in layer.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = merge_config_layers(merged[key], value)
+            else:
+                merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def env_config_layer(environ: Mapping[str, str], prefix: str = "AEDT_") -> Dict[str, Any]:
+    """Build a raw config layer from environment variables
+
+    Only variables of the form AEDT_<SECTION>__<KEY> are used, e.g.
+    AEDT_SUBAGENT__MAX_CONCURRENT=10. Values are parsed as YAML scalars so
+    numbers, booleans and inline lists keep their types.
+
+    Args:
+        environ: Environment mapping (usually os.environ)
+        prefix: Variable name prefix
+
+    Returns:
+        Raw config dictionary
+    """
+    layer: Dict[str, Any] = {}
+    for name, raw_value in environ.items():
+        if not name.startswith(prefix) or "__" not in name:
+            continue
+
+        path = [part.lower() for part in name[len(prefix):].split("__")]
+        if not all(path):
+            continue
+
+        try:
+            value = yaml.safe_load(raw_value)
+        except yaml.YAMLError:
+            value = raw_value
+
+        node = layer
+        for part in path[:-1]:
+            node = node.setdefault(part, {})
+            if not isinstance(node, dict):
+                break
+        else:
+            node[path[-1]] = value
+    return layer
 
 
 class ConfigManager:
@@ -104,17 +276,101 @@ git:
   worktree_base: ".aedt/worktrees"
   branch_prefix: "epic"
   auto_cleanup: true
+
+state:
+  backend: "file"
+  sqlite_path: ".aedt/state.db"
 """
 
-    def __init__(self, config_path: Optional[Path] = None):
+    ENV_PREFIX = "AEDT_"
+
+    # Bump when the cache layout or the config dataclasses change
+    CACHE_FORMAT = 3
+    # Files modified this recently are not cached: a same-size rewrite within
+    # the file system's timestamp granularity would otherwise keep its key
+    CACHE_RACY_WINDOW_NS = 1_000_000_000
+
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        layered: bool = False,
+        global_config_path: Optional[Path] = None,
+        use_cache: bool = True
+    ):
         """Initialize ConfigManager
 
         Args:
             config_path: Path to config file. If None, uses .aedt/config.yaml in cwd
+            layered: Merge global config, project config and AEDT_* environment
+                overrides (see load_layered) instead of reading config_path alone
+            global_config_path: Global config file (default: ~/.aedt/config.yaml)
+            use_cache: Let load() reuse the validated config cached next to
+                config.yaml (see cache_path) while the file is unchanged
         """
         self.config_path = config_path or Path.cwd() / ".aedt" / "config.yaml"
-        self.config: Optional[AEDTConfig] = None
-        self._observer: Optional[Observer] = None
+        self.global_config_path = global_config_path or Path.home() / ".aedt" / "config.yaml"
+        self.layered = layered
+        self.use_cache = use_cache
+
+        # layer name -> (source key, raw dict); source key is (mtime_ns, size)
+        # for files and the sorted AEDT_* items for the environment
+        self._layer_cache: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+
+        # (key prefix, callback) pairs notified with changes after a reload
+        self._subscribers: List[Tuple[str, Callable[[List[ConfigChange]], None]]] = []
+
+        # Published configuration. Readers take the reference without
+        # locking; writers build a complete snapshot and swap it in, so a
+        # reader never observes a half-applied or rolled-back config.
+        self._snapshot = ConfigSnapshot()
+        # Serializes writers (reload on the watcher thread vs. load/save)
+        self._publish_lock = threading.RLock()
+        self._subscription: Optional[WatchSubscription] = None
+        self.last_reload_latency_ms: Optional[float] = None
+
+    @property
+    def config(self) -> Optional[AEDTConfig]:
+        """Currently loaded configuration"""
+        return self._snapshot.config
+
+    @config.setter
+    def config(self, config: Optional[AEDTConfig]):
+        """Publish a configuration that was not loaded from a file"""
+        with self._publish_lock:
+            self._publish(config)
+
+    def snapshot(self) -> ConfigSnapshot:
+        """Return the currently published configuration snapshot
+
+        Never blocks: a reload running on the watcher thread publishes its
+        result only once it is complete, so the returned snapshot is always
+        either the old or the new configuration as a whole.
+
+        Returns:
+            Current snapshot (its config is None if nothing was loaded yet)
+        """
+        return self._snapshot
+
+    def _publish(
+        self,
+        config: Optional[AEDTConfig],
+        content_hash: Optional[str] = None,
+        source_key: Optional[Tuple[Any, ...]] = None
+    ) -> ConfigSnapshot:
+        """Build a snapshot for config and make it current in one assignment
+
+        Callers hold _publish_lock, so generations follow the publish order.
+        """
+        values = flatten_config(config) if config is not None else {}
+        snapshot = ConfigSnapshot(
+            config=config,
+            values=MappingProxyType(values),
+            content_hash=content_hash,
+            source_key=source_key,
+            generation=self._snapshot.generation + 1
+        )
+        self._snapshot = snapshot
+        return snapshot
 
     def initialize(self, force: bool = False, is_global: bool = False) -> bool:
         """Initialize configuration file and directory structure
@@ -160,9 +416,18 @@ git:
 
         return True
 
+    @property
+    def cache_path(self) -> Path:
+        """Validated config cache file, next to config.yaml"""
+        return self.config_path.with_name(f".{self.config_path.name}.cache")
+
     def load(self) -> AEDTConfig:
         """Load configuration file
 
+        When use_cache is set and the cache written by an earlier load
+        matches config.yaml's path, mtime, size and the aedt version, the
+        cached config is used and YAML parsing is skipped.
+
         Returns:
             Loaded and validated configuration
 
@@ -170,126 +435,229 @@ git:
             FileNotFoundError: If config file does not exist
             ValueError: If config file has invalid format or missing fields
         """
-        if not self.config_path.exists():
+        if self.layered:
+            return self.load_layered()
+
+        try:
+            stat = self.config_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(
                 f"配置文件不存在: {self.config_path}\n"
                 "请先运行 'aedt init' 初始化配置"
             )
 
+        cache_key = self._cache_key(stat)
+        if self.use_cache:
+            cached = self._read_cache(cache_key)
+            if cached is not None:
+                config, content_hash = cached
+                with self._publish_lock:
+                    self._publish(config, content_hash=content_hash)
+                return config
+
+        content = self.config_path.read_bytes()
+        config = self._parse_content(content)
+        content_hash = hashlib.sha256(content).hexdigest()
+        with self._publish_lock:
+            self._publish(config, content_hash=content_hash)
+
+        if self.use_cache and time.time_ns() - stat.st_mtime_ns > self.CACHE_RACY_WINDOW_NS:
+            self._write_cache(cache_key, config, content_hash)
+        return config
+
+    def _cache_key(self, stat: os.stat_result) -> Tuple[Any, ...]:
+        """Identity of the config file content a cache entry is valid for"""
+        return (
+            self.CACHE_FORMAT,
+            aedt.__version__,
+            str(self.config_path.resolve()),
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+
+    def _cache_header(self, cache_key: Tuple[Any, ...]) -> bytes:
+        """First line of a cache file valid for cache_key"""
+        return json.dumps(list(cache_key), ensure_ascii=False).encode('utf-8') + b"\n"
+
+    def _read_cache(self, cache_key: Tuple[Any, ...]) -> Optional[Tuple[AEDTConfig, str]]:
+        """Return (config, content hash) from the cache if it matches cache_key
+
+        The cache is plain JSON data: the key line is compared before the
+        config line is parsed, and the config is rebuilt through the schema
+        validator, so a planted cache file can never run code. A missing,
+        stale or unreadable cache returns None.
+        """
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            raise ValueError(
-                f"配置文件 YAML 格式错误:\n{e}\n"
-                "请检查语法或运行 'aedt init --force' 重新生成"
+            with open(self.cache_path, 'rb') as f:
+                if f.readline() != self._cache_header(cache_key):
+                    return None
+                entry = json.loads(f.read())
+            config = _config_validator.validate(entry['config'], source=self.cache_path)
+            return config, str(entry['content_hash'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"忽略无效的配置缓存 {self.cache_path}: {e}")
+            return None
+
+    def _write_cache(self, cache_key: Tuple[Any, ...], config: AEDTConfig, content_hash: str):
+        """Atomically write the config cache; failures are only logged"""
+        entry = {'content_hash': content_hash, 'config': asdict(config)}
+        temp_path = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(self._cache_header(cache_key))
+                f.write(json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.debug(f"无法写入配置缓存 {self.cache_path}: {e}")
+            temp_path.unlink(missing_ok=True)
+
+    def load_layered(self) -> AEDTConfig:
+        """Load configuration merged from all layers
+
+        Priority (lowest first): global ~/.aedt/config.yaml, project
+        .aedt/config.yaml, AEDT_<SECTION>__<KEY> environment variables.
+        Each file layer is cached by mtime and size and only re-read when it
+        changed; if no layer changed, the previously merged config is
+        returned without merging or validating again.
+
+        Returns:
+            Merged and validated configuration
+
+        Raises:
+            FileNotFoundError: If neither global nor project config exists
+            ValueError: If a layer has invalid format or the merged config is invalid
+        """
+        names, keys, layers = self._read_layers()
+        merged_key = tuple(keys)
+        current = self._snapshot
+        if current.config is not None and merged_key == current.source_key:
+            return current.config
+
+        if all(key is None for key in keys[:-1]):
+            raise FileNotFoundError(
+                f"配置文件不存在: {self.config_path}\n"
+                "请先运行 'aedt init' 初始化配置"
             )
 
-        self.config = self._validate_and_parse(data)
-        return self.config
+        config = self._validate_and_parse(merge_config_layers(*layers))
+        with self._publish_lock:
+            self._publish(config, source_key=merged_key)
+        logger.debug(f"已合并配置层: {', '.join(names)}")
+        return config
 
-    def _validate_and_parse(self, data: dict) -> AEDTConfig:
-        """Validate and parse configuration data
+    def _read_layers(self) -> Tuple[List[str], List[Any], List[Dict[str, Any]]]:
+        """Read every config layer, lowest priority first
+
+        Returns:
+            Tuple of (layer names, source keys, raw dicts); the environment
+            layer comes last
+
+        Raises:
+            ValueError: If a file layer has invalid format
+        """
+        file_layers = [('project', self.config_path)]
+        if self.global_config_path.resolve() != self.config_path.resolve():
+            file_layers.insert(0, ('global', self.global_config_path))
+
+        names = []
+        keys = []
+        layers = []
+        for name, path in file_layers:
+            key, layer = self._read_file_layer(name, path)
+            names.append(name)
+            keys.append(key)
+            layers.append(layer)
+
+        env_items = tuple(sorted(
+            (k, v) for k, v in os.environ.items() if k.startswith(self.ENV_PREFIX)
+        ))
+        names.append('env')
+        keys.append(env_items)
+        layers.append(env_config_layer(dict(env_items), prefix=self.ENV_PREFIX))
+        return names, keys, layers
+
+    def _read_file_layer(self, name: str, path: Path) -> Tuple[Any, Dict[str, Any]]:
+        """Read one config file layer, reusing the cached parse if unchanged
 
         Args:
-            data: Raw configuration dictionary
+            name: Layer name
+            path: Config file path
 
         Returns:
-            Validated configuration object
+            Tuple of (source key, raw dict); key is None if the file is missing
 
         Raises:
-            ValueError: If required fields are missing or invalid
+            ValueError: If the file has invalid format
         """
-        if data is None:
-            raise ValueError("配置文件为空，请检查文件内容")
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._layer_cache.pop(name, None)
+            return None, {}
 
-        # Check required fields
-        required_fields = ['version', 'subagent', 'quality_gates', 'git']
-        missing_fields = [f for f in required_fields if f not in data]
-        if missing_fields:
-            raise ValueError(
-                f"配置文件缺少必需字段: {', '.join(missing_fields)}\n"
-                f"请检查 {self.config_path}"
-            )
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._layer_cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached
 
-        # Validate version
-        if not isinstance(data['version'], str):
-            raise ValueError(
-                f"version 必须是字符串类型，当前类型: {type(data['version']).__name__}"
-            )
+        try:
+            data = yaml.safe_load(path.read_text(encoding='utf-8'))
+        except (yaml.YAMLError, UnicodeDecodeError) as e:
+            raise ValueError(f"配置文件 YAML 格式错误: {path}\n{e}")
 
-        # Validate subagent config
-        subagent_data = data['subagent']
-        if not isinstance(subagent_data, dict):
-            raise ValueError(
-                f"subagent 必须是对象类型，当前类型: {type(subagent_data).__name__}"
-            )
+        data = data if data is not None else {}
+        if not isinstance(data, dict):
+            raise ValueError(f"配置文件顶层必须是对象类型: {path}")
 
-        # Validate max_concurrent
-        if 'max_concurrent' in subagent_data:
-            max_concurrent = subagent_data['max_concurrent']
-            if not isinstance(max_concurrent, int):
-                raise ValueError(
-                    f"subagent.max_concurrent 必须是整数类型，"
-                    f"当前类型: {type(max_concurrent).__name__}"
-                )
-            if max_concurrent <= 0:
-                raise ValueError(
-                    f"subagent.max_concurrent 必须大于 0，"
-                    f"当前值: {max_concurrent}"
-                )
+        self._layer_cache[name] = (key, data)
+        logger.debug(f"重新读取配置层 {name}: {path}")
+        return key, data
 
-        # Validate timeout
-        if 'timeout' in subagent_data:
-            timeout = subagent_data['timeout']
-            if not isinstance(timeout, int):
-                raise ValueError(
-                    f"subagent.timeout 必须是整数类型，"
-                    f"当前类型: {type(timeout).__name__}"
-                )
-            if timeout <= 0:
-                raise ValueError(
-                    f"subagent.timeout 必须大于 0，"
-                    f"当前值: {timeout}"
-                )
+    def _parse_content(self, content: bytes) -> AEDTConfig:
+        """Parse and validate raw config file content
 
-        # Validate quality_gates config
-        quality_gates_data = data['quality_gates']
-        if not isinstance(quality_gates_data, dict):
-            raise ValueError(
-                f"quality_gates 必须是对象类型，当前类型: {type(quality_gates_data).__name__}"
-            )
+        Args:
+            content: config.yaml bytes
 
-        # Validate quality gate lists
-        for gate_name in ['pre_commit', 'epic_complete', 'pre_merge']:
-            if gate_name in quality_gates_data:
-                gate_value = quality_gates_data[gate_name]
-                if gate_value is not None and not isinstance(gate_value, list):
-                    raise ValueError(
-                        f"quality_gates.{gate_name} 必须是列表类型，"
-                        f"当前类型: {type(gate_value).__name__}"
-                    )
-
-        # Validate git config
-        git_data = data['git']
-        if not isinstance(git_data, dict):
-            raise ValueError(
-                f"git 必须是对象类型，当前类型: {type(git_data).__name__}"
-            )
+        Returns:
+            Validated configuration object
 
+        Raises:
+            ValueError: If config has invalid format or missing fields
+        """
         try:
-            return AEDTConfig(
-                version=data['version'],
-                subagent=SubagentConfig(**subagent_data),
-                quality_gates=QualityGatesConfig(**quality_gates_data),
-                git=GitConfig(**git_data)
-            )
-        except TypeError as e:
+            data = yaml.safe_load(content.decode('utf-8'))
+        except (yaml.YAMLError, UnicodeDecodeError) as e:
             raise ValueError(
-                f"配置文件字段类型错误: {e}\n"
-                f"请检查配置文件格式"
+                f"配置文件 YAML 格式错误:\n{e}\n"
+                "请检查语法或运行 'aedt init --force' 重新生成"
             )
 
+        return self._validate_and_parse(data)
+
+    def _validate_and_parse(self, data: dict) -> AEDTConfig:
+        """Validate and parse configuration data
+
+        Validation runs the compiled AEDT_CONFIG_SCHEMA and reports every
+        error at once, each with its dot-path. Unknown top-level keys are
+        ignored; unknown keys inside a section are errors.
+
+        Args:
+            data: Raw configuration dictionary
+
+        Returns:
+            Validated configuration object
+
+        Raises:
+            ValueError: If required fields are missing or invalid
+        """
+        if data is None:
+            raise ValueError("配置文件为空，请检查文件内容")
+
+        return _config_validator.validate(data, source=self.config_path)
+
     def _ensure_directory(self, path: Path) -> bool:
         """Ensure directory exists
 
@@ -310,7 +678,10 @@ git:
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value using dot notation
 
-        Supports nested key access like 'subagent.max_concurrent'
+        Supports nested key access like 'subagent.max_concurrent'. Keys are
+        resolved from the current snapshot's lookup table, built once per
+        load, so each call is a single dict lookup. Use snapshot() to read
+        several keys consistently.
 
         Args:
             key: Configuration key (supports dot notation for nested access)
@@ -319,29 +690,33 @@ git:
         Returns:
             Configuration value or default if not found
         """
-        if not self.config:
+        snapshot = self._snapshot
+        if snapshot.config is None:
             self.load()
+            snapshot = self._snapshot
 
-        # Split key by dots for nested access
-        keys = key.split('.')
-        value = self.config
-
-        for k in keys:
-            if hasattr(value, k):
-                value = getattr(value, k)
-            else:
-                return default
-
-        return value
+        return snapshot.values.get(key, default)
 
     def save_config(self, config: Optional[AEDTConfig] = None):
         """Save configuration to config.yaml
 
+        The file is written to a temporary file and renamed over config.yaml,
+        so a concurrent reader never sees a truncated file. The saved
+        configuration is validated and published directly, together with the
+        hash of the written bytes; the hot reload triggered by our own write
+        then finds the hash unchanged and is skipped.
+
+        In layered mode only the project layer is written: the project
+        file's own keys plus the values that differ from the current merged
+        configuration. Values coming from the global config or AEDT_*
+        environment variables are not copied into the project file.
+
         Args:
             config: Configuration to save. If None, saves current config.
 
         Raises:
-            ValueError: If no config provided and no config loaded
+            ValueError: If no config provided and no config loaded, or the
+                config is invalid
         """
         if config is None:
             config = self.config
@@ -349,6 +724,10 @@ git:
         if config is None:
             raise ValueError("没有配置可保存。请先加载或提供配置对象。")
 
+        if self.layered:
+            self._save_project_layer(config)
+            return
+
         # Convert config objects to dict
         config_dict = {
             'version': config.version,
@@ -358,66 +737,210 @@ git:
                 'model': config.subagent.model,
             },
             'quality_gates': {
-                'pre_commit': config.quality_gates.pre_commit or [],
-                'epic_complete': config.quality_gates.epic_complete or [],
-                'pre_merge': config.quality_gates.pre_merge or [],
+                'pre_commit': list(config.quality_gates.pre_commit or []),
+                'epic_complete': list(config.quality_gates.epic_complete or []),
+                'pre_merge': list(config.quality_gates.pre_merge or []),
             },
             'git': {
                 'worktree_base': config.git.worktree_base,
                 'branch_prefix': config.git.branch_prefix,
                 'auto_cleanup': config.git.auto_cleanup,
+            },
+            'state': {
+                'backend': config.state.backend,
+                'sqlite_path': config.state.sqlite_path,
             }
         }
 
-        # Ensure parent directory exists
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+        # Validate before touching the file; the result is what gets published
+        saved_config = self._validate_and_parse(config_dict)
+        content = yaml.safe_dump(config_dict, default_flow_style=False,
+                                 allow_unicode=True, sort_keys=False).encode('utf-8')
 
-        # Write to file
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            yaml.safe_dump(config_dict, f, default_flow_style=False,
-                          allow_unicode=True, sort_keys=False)
+        with self._publish_lock:
+            old = self._snapshot
+            self._atomic_write(content)
+            self._publish(saved_config, content_hash=hashlib.sha256(content).hexdigest())
 
         logger.info(f"配置已保存到: {self.config_path}")
+        self._notify_subscribers(diff_configs(old.config, saved_config))
+
+    def _save_project_layer(self, config: AEDTConfig):
+        """Write the changes of config relative to the merged config to the project file
 
-    def enable_hot_reload(self):
+        Raises:
+            ValueError: If the merged configuration would be invalid
+        """
+        with self._publish_lock:
+            try:
+                current = self.load_layered()
+            except FileNotFoundError:
+                current = None
+            names, _, layers = self._read_layers()
+            project_index = names.index('project')
+            project = copy.deepcopy(layers[project_index])
+
+            for change in diff_configs(current, config):
+                *sections, leaf = change.key.split(".")
+                node = project
+                for section in sections:
+                    if not isinstance(node.get(section), dict):
+                        node[section] = {}
+                    node = node[section]
+                value = change.new_value
+                node[leaf] = list(value) if isinstance(value, tuple) else value
+
+            # Validate the merged result before touching the file
+            layers[project_index] = project
+            self._validate_and_parse(merge_config_layers(*layers))
+            content = yaml.safe_dump(project, default_flow_style=False,
+                                     allow_unicode=True, sort_keys=False).encode('utf-8')
+            self._atomic_write(content)
+            self.reload_config()
+        logger.info(f"配置已保存到: {self.config_path}")
+
+    def _atomic_write(self, content: bytes):
+        """Replace config.yaml with content via temporary file + rename"""
+        self.config_path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.config_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, self.config_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def enable_hot_reload(self, debounce: float = 0.1):
         """Enable hot reloading of config file on changes
 
-        Watches the config file directory and reloads configuration
-        automatically when config.yaml is modified.
+        Subscribes to config.yaml on the shared file watcher service, which
+        coalesces the several events editors emit per save (truncate + write,
+        or write a temp file and rename it over config.yaml) into one reload
+        after ``debounce`` quiet seconds.
+
+        Args:
+            debounce: Quiet period in seconds used to coalesce bursts of events
         """
-        if self._observer is not None:
+        if self._subscription is not None:
             logger.warning("配置热加载已经启用")
             return
 
-        event_handler = ConfigFileHandler(self)
-        self._observer = Observer()
-        self._observer.schedule(event_handler, str(self.config_path.parent),
-                               recursive=False)
-        self._observer.start()
+        self._subscription = get_watcher_service().subscribe(
+            self.config_path.parent,
+            self.config_path.name,
+            lambda path: self.reload_config(),
+            debounce=debounce
+        )
         logger.info(f"已启用配置热加载，监听: {self.config_path}")
 
-    def reload_config(self):
+    def reload_config(self) -> bool:
         """Reload configuration from file
 
         Called automatically by hot reload or can be called manually.
-        On validation failure, preserves the old configuration.
+        Skipped when the file content is unchanged since the last load.
+        The new configuration is parsed and validated before anything is
+        published; on failure the old snapshot simply stays current.
+
+        Returns:
+            True if a new configuration was loaded
         """
-        old_config = self.config
+        start = time.perf_counter()
+
+        with self._publish_lock:
+            old = self._snapshot
+
+            if self.layered:
+                try:
+                    if self.load_layered() is old.config:
+                        return False
+                except Exception as e:
+                    logger.error(f"配置重新加载失败，保留旧配置: {e}")
+                    return False
+                new = self._snapshot
+                self.last_reload_latency_ms = (time.perf_counter() - start) * 1000
+                logger.info(f"分层配置已重新加载 (耗时 {self.last_reload_latency_ms:.1f}ms)")
+            else:
+                try:
+                    content = self.config_path.read_bytes()
+                except OSError as e:
+                    logger.error(f"配置重新加载失败，保留旧配置: {e}")
+                    return False
+
+                content_hash = hashlib.sha256(content).hexdigest()
+                if old.config is not None and content_hash == old.content_hash:
+                    logger.debug(f"配置内容未变化，跳过重新加载: {self.config_path}")
+                    return False
+
+                try:
+                    config = self._parse_content(content)
+                except Exception as e:
+                    logger.error(f"配置重新加载失败，保留旧配置: {e}")
+                    return False
+
+                new = self._publish(config, content_hash=content_hash)
+                self.last_reload_latency_ms = (time.perf_counter() - start) * 1000
+                logger.info(
+                    f"配置已重新加载: {self.config_path} "
+                    f"(耗时 {self.last_reload_latency_ms:.1f}ms)"
+                )
 
-        try:
-            self.load()
-            logger.info(f"配置已重新加载: {self.config_path}")
-        except Exception as e:
-            logger.error(f"配置重新加载失败，保留旧配置: {e}")
-            self.config = old_config
+        self._notify_subscribers(diff_configs(old.config, new.config))
+        return True
+
+    def subscribe(self, prefix: str, callback: Callable[[List[ConfigChange]], None]):
+        """Subscribe to configuration changes under a key prefix
+
+        After each reload, the callback receives the changes whose key equals
+        the prefix or lies below it (e.g. prefix 'subagent' matches
+        'subagent.max_concurrent'). It is not called if nothing under the
+        prefix changed. An empty prefix matches every key.
+
+        Args:
+            prefix: Dot-path key prefix
+            callback: Called as callback(changes)
+        """
+        self._subscribers.append((prefix, callback))
+
+    def unsubscribe(self, callback: Callable[[List[ConfigChange]], None]):
+        """Remove all subscriptions of a callback
+
+        Args:
+            callback: Previously subscribed callback
+        """
+        self._subscribers = [
+            (prefix, cb) for prefix, cb in self._subscribers if cb != callback
+        ]
+
+    def _notify_subscribers(self, changes: List[ConfigChange]):
+        """Deliver changes to the subscribers whose prefix they match"""
+        if not changes:
+            return
+
+        for prefix, callback in list(self._subscribers):
+            matching = [
+                change for change in changes
+                if not prefix or change.key == prefix or change.key.startswith(prefix + ".")
+            ]
+            if not matching:
+                continue
+            try:
+                callback(matching)
+            except Exception as e:
+                logger.error(f"配置变更回调失败 ({prefix}): {e}")
 
     def stop_watching(self):
         """Stop watching config file for changes
 
         Disables hot reload functionality.
         """
-        if self._observer:
-            self._observer.stop()
-            self._observer.join()
-            self._observer = None
+        if self._subscription is not None:
+            get_watcher_service().unsubscribe(self._subscription)
+            self._subscription = None
             logger.info("已停止配置热加载")
@@ -0,0 +1,281 @@
+"""Declarative schemas for AEDT YAML inputs
+
+A schema describes the expected shape of a YAML mapping: field types,
+required fields, defaults, allowed values and what to do with unknown keys.
+compile() turns it into a validator once; validating a document then calls
+prebuilt check functions instead of re-interpreting the schema, and
+reports every error together with the dot-path where it occurred.
+
+The same schemas validate config.yaml and partial inputs such as per-epic
+frontmatter overrides (compile(partial=True)).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+# Human-readable type names used in error messages
+TYPE_LABELS = {
+    str: "字符串",
+    bool: "布尔",
+    int: "整数",
+    float: "数字",
+    list: "列表",
+    dict: "对象",
+}
+
+UNKNOWN_POLICIES = ("error", "ignore", "keep")
+
+# Marks an absent default / absent mapping key
+MISSING = object()
+
+
+@dataclass(frozen=True)
+class Field:
+    """Schema of a single mapping value"""
+    type: Any = object  # Python type, tuple of types, or ObjectSchema
+    required: bool = False
+    default: Any = MISSING
+    default_factory: Optional[Callable[[], Any]] = None
+    nullable: bool = False  # None counts as absent (the default applies)
+    choices: Optional[Tuple[Any, ...]] = None
+    gt: Optional[float] = None  # Value must be greater than this
+    items: Optional['Field'] = None  # Element schema for list fields
+
+
+@dataclass(frozen=True)
+class ObjectSchema:
+    """Schema of a mapping"""
+    fields: Mapping[str, Field]
+    unknown: str = "error"  # error/ignore/keep
+    factory: Optional[Callable[..., Any]] = None  # Builds the result, e.g. a dataclass
+
+    def __post_init__(self):
+        """Validate the unknown-key policy"""
+        if self.unknown not in UNKNOWN_POLICIES:
+            raise ValueError(f"未知的 unknown 策略: {self.unknown}")
+
+    def compile(self, partial: bool = False) -> 'CompiledSchema':
+        """Compile this schema into a validator
+
+        Args:
+            partial: Validate only the keys present: no required fields, no
+                defaults, and plain dicts instead of factory objects
+
+        Returns:
+            Reusable validator
+        """
+        return CompiledSchema(_compile_object(self, partial))
+
+
+@dataclass(frozen=True)
+class SchemaError:
+    """A single validation error"""
+    path: str  # Dot-path, e.g. 'subagent.max_concurrent' or 'quality_gates.pre_commit[2]'
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path} {self.message}" if self.path else self.message
+
+
+class SchemaValidationError(ValueError):
+    """Raised when a document does not match its schema"""
+
+    def __init__(self, errors: List[SchemaError], source: Any = None):
+        """Initialize error
+
+        Args:
+            errors: All validation errors found
+            source: File the document came from, mentioned in the message
+        """
+        self.errors = errors
+        self.source = source
+        if len(errors) == 1:
+            message = str(errors[0])
+        else:
+            message = f"发现 {len(errors)} 个配置错误:\n" + "\n".join(
+                f"  - {error}" for error in errors
+            )
+        if source is not None:
+            message += f"\n请检查 {source}"
+        super().__init__(message)
+
+
+# Compiled check: (value, path, errors) -> validated value
+Check = Callable[[Any, str, List[SchemaError]], Any]
+
+
+class CompiledSchema:
+    """Validator produced by ObjectSchema.compile()"""
+
+    def __init__(self, check: Check):
+        self._check = check
+
+    def errors(self, data: Any) -> List[SchemaError]:
+        """Validate data and return all errors (empty if valid)"""
+        errors: List[SchemaError] = []
+        self._check(data, "", errors)
+        return errors
+
+    def validate(self, data: Any, source: Any = None) -> Any:
+        """Validate data and build the result
+
+        Args:
+            data: Parsed YAML document
+            source: File the document came from (for error messages)
+
+        Returns:
+            Validated value (factory object, or dict with defaults applied)
+
+        Raises:
+            SchemaValidationError: Listing every error found
+        """
+        errors: List[SchemaError] = []
+        result = self._check(data, "", errors)
+        if errors:
+            raise SchemaValidationError(errors, source)
+        return result
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
+
+
+def _type_label(expected: Any) -> str:
+    """Label for one type or a tuple of types"""
+    if isinstance(expected, tuple):
+        return "或".join(TYPE_LABELS.get(t, t.__name__) for t in expected)
+    return TYPE_LABELS.get(expected, getattr(expected, "__name__", str(expected)))
+
+
+def _type_error(path: str, label: str, value: Any) -> SchemaError:
+    return SchemaError(path, f"必须是{label}类型，当前类型: {type(value).__name__}")
+
+
+def _compile_object(schema: ObjectSchema, partial: bool) -> Check:
+    """Compile a mapping schema into a single check function"""
+    compiled = []
+    for name, spec in schema.fields.items():
+        if spec.default_factory is not None:
+            default = spec.default_factory
+        elif spec.default is not MISSING:
+            default = (lambda value=spec.default: value)
+        else:
+            default = None
+        compiled.append((
+            name,
+            _compile_field(spec, partial),
+            spec.required and not partial,
+            None if partial else default,
+            spec.nullable,
+        ))
+
+    known = frozenset(schema.fields)
+    unknown = schema.unknown
+    factory = None if partial else schema.factory
+
+    def check_object(value: Any, path: str, errors: List[SchemaError]) -> Any:
+        if not isinstance(value, dict):
+            errors.append(_type_error(path or "配置文件顶层", "对象", value))
+            return None
+
+        result: Dict[str, Any] = {}
+        missing = []
+        for name, check, required, default, nullable in compiled:
+            item = value.get(name, MISSING)
+            if item is None and nullable:
+                item = MISSING
+            if item is MISSING:
+                if required:
+                    missing.append(_join(path, name))
+                elif default is not None:
+                    result[name] = default()
+                continue
+            result[name] = check(item, _join(path, name), errors)
+
+        if missing:
+            errors.append(SchemaError("", f"缺少必需字段: {', '.join(missing)}"))
+
+        if unknown != "ignore" and not known.issuperset(value):
+            for key in value:
+                if key in known:
+                    continue
+                if unknown == "error":
+                    errors.append(SchemaError(_join(path, str(key)), "是未知字段"))
+                else:
+                    result[key] = value[key]
+
+        if factory is not None and not errors:
+            return factory(**result)
+        return result
+
+    return check_object
+
+
+def _is_plain(spec: Field) -> bool:
+    """Whether a field only needs a type check"""
+    return (not isinstance(spec.type, ObjectSchema) and spec.choices is None
+            and spec.gt is None and spec.items is None)
+
+
+def _compile_field(spec: Field, partial: bool) -> Check:
+    """Compile a field schema into a single check function
+
+    Only the checks the field declares end up in the returned function, and
+    lists of plain-typed items are checked with one C-level type scan.
+    """
+    if isinstance(spec.type, ObjectSchema):
+        return _compile_object(spec.type, partial)
+
+    expected = spec.type
+    label = _type_label(expected)
+    choices = spec.choices
+    gt = spec.gt
+    if expected is object:
+        expected = None
+
+    item_check = None
+    if spec.items is not None:
+        item_spec = spec.items
+        if _is_plain(item_spec) and item_spec.type is not object:
+            item_type = item_spec.type
+            item_types = frozenset(item_type if isinstance(item_type, tuple) else (item_type,))
+            item_label = _type_label(item_type)
+
+            def item_check(value: list, value_path: str, errors: List[SchemaError]) -> list:
+                if item_types.issuperset(map(type, value)):
+                    return value
+                for index, item in enumerate(value):  # subclasses or real errors
+                    if not isinstance(item, item_type):
+                        errors.append(_type_error(f"{value_path}[{index}]", item_label, item))
+                return value
+        else:
+            element_check = _compile_field(item_spec, partial)
+
+            def item_check(value: list, value_path: str, errors: List[SchemaError]) -> list:
+                return [
+                    element_check(item, f"{value_path}[{index}]", errors)
+                    for index, item in enumerate(value)
+                ]
+
+    if choices is None and gt is None and item_check is None:
+        def check_type(value: Any, value_path: str, errors: List[SchemaError]) -> Any:
+            if expected is not None and not isinstance(value, expected):
+                errors.append(_type_error(value_path, label, value))
+            return value
+
+        return check_type
+
+    def check_value(value: Any, value_path: str, errors: List[SchemaError]) -> Any:
+        if expected is not None and not isinstance(value, expected):
+            errors.append(_type_error(value_path, label, value))
+            return value
+        if choices is not None and value not in choices:
+            allowed = " 或 ".join(repr(choice) for choice in choices)
+            errors.append(SchemaError(value_path, f"必须是 {allowed}，当前值: {value}"))
+        if gt is not None and value <= gt:
+            errors.append(SchemaError(value_path, f"必须大于 {gt}，当前值: {value}"))
+        if item_check is not None:
+            return item_check(value, value_path, errors)
+        return value
+
+    return check_value
@@ -4,7 +4,12 @@ This module provides atomic write operations and backup management for state fil
 """
 
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+import copy
+import hashlib
+import re
+import threading
 import yaml
 import tempfile
 import shutil
@@ -13,6 +18,22 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class _HashingReader:
+    """Binary stream wrapper that hashes everything read through it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.name = getattr(stream, 'name', '<file>')
+        self.sha = hashlib.sha256()
+        self.length = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.stream.read(size)
+        self.sha.update(chunk)
+        self.length += len(chunk)
+        return chunk
+
+
 class DataStore:
     """Data storage layer with atomic write operations
 
@@ -20,14 +41,37 @@ class DataStore:
     during crashes or failures.
     """
 
-    def __init__(self, base_path: Path):
+    # Backups are named {file}.backup.{timestamp}.{sha256}; the digest lets
+    # recovery verify a candidate without parsing it
+    DIGEST_LENGTH = 64
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    # Parsed files kept for integrity-checked reads, least recently used evicted
+    CACHE_SIZE = 256
+
+    # Integrity header written as a YAML comment on the first line, so plain
+    # YAML readers still parse the file. A header (not a footer) survives
+    # truncation, which is exactly the corruption it must detect.
+    INTEGRITY_PREFIX = b"# aedt-integrity:"
+    INTEGRITY_PATTERN = re.compile(
+        rb"^# aedt-integrity: sha256=(?P<digest>[0-9a-f]{64}) length=(?P<length>\d+)$"
+    )
+
+    def __init__(self, base_path: Path, integrity: bool = False):
         """Initialize DataStore
 
         Args:
             base_path: Base directory for data storage
+            integrity: Embed a content hash and length header in written files
         """
         self.base_path = base_path
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.integrity = integrity
+
+        # file path -> (content digest, parsed data) of the last read/write,
+        # in least-recently-used order; only filled with integrity enabled
+        self._cache: 'OrderedDict[Path, Tuple[str, Any]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def atomic_write(self, file_path: Path, data: Dict[str, Any]) -> bool:
         """Atomically write data to YAML file
@@ -52,25 +96,34 @@ class DataStore:
             # Ensure parent directory exists
             file_path.parent.mkdir(parents=True, exist_ok=True)
 
+            body = yaml.safe_dump(data, default_flow_style=False,
+                                  allow_unicode=True, sort_keys=False).encode('utf-8')
+            content = body
+            if self.integrity:
+                digest = hashlib.sha256(body).hexdigest()
+                header = f"# aedt-integrity: sha256={digest} length={len(body)}\n"
+                content = header.encode('ascii') + body
+
             # 1. Write to temporary file in same directory
             tmp_file_handle = tempfile.NamedTemporaryFile(
-                mode='w',
+                mode='wb',
                 dir=file_path.parent,
                 delete=False,
-                suffix='.tmp',
-                encoding='utf-8'
+                suffix='.tmp'
             )
             tmp_path = Path(tmp_file_handle.name)
 
             try:
-                yaml.safe_dump(data, tmp_file_handle, default_flow_style=False,
-                              allow_unicode=True, sort_keys=False)
+                tmp_file_handle.write(content)
             finally:
                 tmp_file_handle.close()
 
             # 2. Atomic rename (POSIX guarantees atomicity)
             shutil.move(str(tmp_path), str(file_path))
 
+            if self.integrity:
+                self._cache_put(file_path, digest, data)
+
             logger.debug(f"原子写入成功: {file_path}")
             return True
 
@@ -88,6 +141,9 @@ class DataStore:
     def read(self, file_path: Path) -> Dict[str, Any]:
         """Read data from YAML file
 
+        Files carrying an integrity header are verified against the recorded
+        hash and length before parsing.
+
         Args:
             file_path: File path to read
 
@@ -95,24 +151,252 @@ class DataStore:
             Parsed YAML data as dictionary
 
         Raises:
-            ValueError: If file format is invalid
+            ValueError: If file format is invalid or integrity check fails
+        """
+        return self._read(file_path)[0]
+
+    def read_with_digest(
+        self,
+        file_path: Path,
+        known_digest: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Read data from YAML file along with its content digest
+
+        With integrity enabled, a file whose digest matches the last read or
+        write is served from cache without re-parsing. Callers can pass the
+        digest they last validated as ``known_digest``; if the file still has
+        it, the file is read once and not parsed at all.
+
+        Args:
+            file_path: File path to read
+            known_digest: Digest of content the caller already holds
+
+        Returns:
+            Tuple of (parsed data, SHA-256 digest of the YAML body);
+            digest is None if the file does not exist, data is None if the
+            digest equals known_digest
+
+        Raises:
+            ValueError: If file format is invalid or integrity check fails
+        """
+        return self._read(file_path, with_digest=True, known_digest=known_digest)
+
+    def _read(
+        self,
+        file_path: Path,
+        with_digest: bool = False,
+        known_digest: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Read and parse a file; the body is hashed only if the digest is needed
+
+        The digest is needed when the caller asks for it or for the cache
+        (integrity enabled); an integrity header provides it already verified.
         """
         if not file_path.exists():
             logger.debug(f"文件不存在，返回空字典: {file_path}")
-            return {}
+            return {}, None
+
+        content = file_path.read_bytes()
+        body, digest = self._verify_integrity(file_path, content)
+        if digest is None and (with_digest or self.integrity):
+            digest = hashlib.sha256(body).hexdigest()
+        if known_digest is not None and digest == known_digest:
+            return None, digest
+
+        if self.integrity:
+            cached = self._cache_get(file_path, digest)
+            if cached is not None:
+                return cached, digest
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                return data if data is not None else {}
-        except yaml.YAMLError as e:
+            data = yaml.safe_load(body.decode('utf-8'))
+        except (yaml.YAMLError, UnicodeDecodeError) as e:
             raise ValueError(f"文件格式错误: {file_path}\n{e}")
 
+        data = data if data is not None else {}
+        if self.integrity:
+            self._cache_put(file_path, digest, data)
+        return data, digest
+
+    def _cache_get(self, file_path: Path, digest: str) -> Optional[Dict[str, Any]]:
+        """Copy of the cached data of file_path if its digest still matches"""
+        with self._cache_lock:
+            cached = self._cache.get(file_path)
+            if cached is None or cached[0] != digest:
+                return None
+            self._cache.move_to_end(file_path)
+            data = cached[1]
+        return copy.deepcopy(data)
+
+    def _cache_put(self, file_path: Path, digest: str, data: Dict[str, Any]):
+        """Cache a copy of data, evicting the least recently used files"""
+        data = copy.deepcopy(data)
+        with self._cache_lock:
+            self._cache[file_path] = (digest, data)
+            self._cache.move_to_end(file_path)
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def iter_entries(
+        self,
+        file_path: Path,
+        expand: Iterable[str] = ()
+    ) -> Iterator[Tuple[Optional[str], Any, Any]]:
+        """Stream the entries of a YAML mapping file
+
+        Parses the file event by event and constructs one entry at a time, so
+        peak memory is bounded by the largest single entry rather than the
+        whole document. Top-level keys listed in ``expand`` are not built as a
+        whole; their children are yielded one by one instead (e.g. one epic
+        at a time from ``epics:``).
+
+        The integrity header, if present, is verified once the stream has been
+        fully consumed; a mismatch raises after the entries were yielded.
+
+        Args:
+            file_path: File path to read
+            expand: Top-level mapping/sequence keys to stream entry by entry
+
+        Yields:
+            (parent, key, value) tuples: parent is None for top-level entries,
+            or the expanded key for its children (sequence items use the index
+            as key)
+
+        Raises:
+            ValueError: If the file is not a YAML mapping, is malformed,
+                or fails the integrity check
+        """
+        if not file_path.exists():
+            logger.debug(f"文件不存在，无条目: {file_path}")
+            return
+
+        expand = set(expand)
+        with open(file_path, 'rb') as raw:
+            expected = None
+            first_line = raw.readline()
+            if first_line.startswith(self.INTEGRITY_PREFIX):
+                match = self.INTEGRITY_PATTERN.match(first_line.rstrip(b"\n"))
+                if not match:
+                    raise ValueError(f"文件完整性头格式错误: {file_path}")
+                expected = (match.group('digest').decode('ascii'),
+                            int(match.group('length')))
+                reader = _HashingReader(raw)
+            else:
+                raw.seek(0)
+                reader = raw
+
+            loader = yaml.SafeLoader(reader)
+            try:
+                yield from self._iter_mapping(loader, file_path, expand)
+            except yaml.YAMLError as e:
+                raise ValueError(f"文件格式错误: {file_path}\n{e}")
+            finally:
+                loader.dispose()
+
+            if expected is not None:
+                # Drain anything the parser did not need (e.g. trailing comments)
+                while reader.read(self.HASH_CHUNK_SIZE):
+                    pass
+                if (reader.sha.hexdigest(), reader.length) != expected:
+                    raise ValueError(f"文件完整性校验失败: {file_path}")
+
+    def _iter_mapping(self, loader, file_path: Path, expand: set):
+        """Walk the top-level mapping of a document (see iter_entries)"""
+        loader.get_event()  # StreamStart
+        if loader.check_event(yaml.StreamEndEvent):
+            return  # Empty file
+        loader.get_event()  # DocumentStart
+
+        if loader.check_event(yaml.ScalarEvent) and loader.peek_event().value == '':
+            return  # Document with only comments
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise ValueError(f"文件顶层必须是映射: {file_path}")
+        loader.get_event()
+
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = self._construct_next(loader)
+            if key not in expand:
+                yield None, key, self._construct_next(loader)
+            elif loader.check_event(yaml.MappingStartEvent):
+                loader.get_event()
+                while not loader.check_event(yaml.MappingEndEvent):
+                    child_key = self._construct_next(loader)
+                    yield key, child_key, self._construct_next(loader)
+                loader.get_event()
+            elif loader.check_event(yaml.SequenceStartEvent):
+                loader.get_event()
+                index = 0
+                while not loader.check_event(yaml.SequenceEndEvent):
+                    yield key, index, self._construct_next(loader)
+                    index += 1
+                loader.get_event()
+            else:
+                # Scalar or null section: nothing to stream
+                self._construct_next(loader)
+
+    @staticmethod
+    def _construct_next(loader) -> Any:
+        """Compose and construct the next node only"""
+        node = loader.compose_node(None, None)
+        return loader.construct_document(node)
+
+    def content_digest(self, file_path: Path) -> Optional[str]:
+        """Verify a file and return its content digest without parsing it
+
+        Args:
+            file_path: File path to check
+
+        Returns:
+            SHA-256 digest of the YAML body, or None if the file does not exist
+
+        Raises:
+            ValueError: If the integrity check fails
+        """
+        if not file_path.exists():
+            return None
+        body, digest = self._verify_integrity(file_path, file_path.read_bytes())
+        return digest or hashlib.sha256(body).hexdigest()
+
+    def _verify_integrity(self, file_path: Path, content: bytes) -> Tuple[bytes, Optional[str]]:
+        """Check the integrity header of file content
+
+        Args:
+            file_path: File the content was read from (for error messages)
+            content: Raw file content
+
+        Returns:
+            Tuple of (YAML body without the header, its verified digest);
+            without a header, the content itself and None
+
+        Raises:
+            ValueError: If the recorded length or hash does not match
+        """
+        if not content.startswith(self.INTEGRITY_PREFIX):
+            return content, None
+
+        header, _, body = content.partition(b"\n")
+        match = self.INTEGRITY_PATTERN.match(header)
+        if not match:
+            raise ValueError(f"文件完整性头格式错误: {file_path}")
+
+        expected_length = int(match.group('length'))
+        if len(body) != expected_length:
+            raise ValueError(
+                f"文件完整性校验失败: {file_path} "
+                f"(长度 {len(body)}, 期望 {expected_length})"
+            )
+        digest = hashlib.sha256(body).hexdigest()
+        if digest != match.group('digest').decode('ascii'):
+            raise ValueError(f"文件完整性校验失败: {file_path} (哈希不匹配)")
+
+        return body, digest
+
     def backup(self, file_path: Path, keep_count: int = 3) -> bool:
         """Create backup of file
 
         Creates a backup copy with .backup extension and rotates old backups.
-        Keeps only the N most recent backups.
+        The SHA-256 digest of the content is embedded in the backup name so
+        recovery can verify it later. Keeps only the N most recent backups.
 
         Args:
             file_path: File to backup
@@ -126,22 +410,24 @@ class DataStore:
             return False
 
         try:
+            # Read once so the digest matches exactly what the backup holds
+            content = file_path.read_bytes()
+            digest = hashlib.sha256(content).hexdigest()
+
             # Create backup with high-precision timestamp
             import time
             timestamp = time.time()
             # Use microsecond precision to avoid collisions
             timestamp_str = f"{int(timestamp)}.{int((timestamp % 1) * 1000000)}"
-            backup_path = file_path.with_suffix(f"{file_path.suffix}.backup.{timestamp_str}")
-            shutil.copy2(file_path, backup_path)
+            backup_path = file_path.with_suffix(
+                f"{file_path.suffix}.backup.{timestamp_str}.{digest}"
+            )
+            backup_path.write_bytes(content)
+            shutil.copystat(file_path, backup_path)
             logger.debug(f"创建备份: {backup_path}")
 
             # Rotate old backups (keep only N most recent)
-            backup_pattern = f"{file_path.stem}{file_path.suffix}.backup.*"
-            backups = sorted(
-                file_path.parent.glob(backup_pattern),
-                key=lambda p: p.stat().st_mtime,
-                reverse=True  # Most recent first
-            )
+            backups = self.list_backups(file_path)
 
             # Remove old backups beyond keep_count
             for old_backup in backups[keep_count:]:
@@ -156,3 +442,79 @@ class DataStore:
         except Exception as e:
             logger.error(f"备份失败 {file_path}: {e}")
             return False
+
+    def list_backups(self, file_path: Path) -> List[Path]:
+        """List backups of a file, most recent first
+
+        Args:
+            file_path: Original file path
+
+        Returns:
+            Backup paths sorted by modification time (newest first); backups
+            removed while listing are left out
+        """
+        backup_pattern = f"{file_path.stem}{file_path.suffix}.backup.*"
+        stamped = []
+        for path in file_path.parent.glob(backup_pattern):
+            try:
+                stamped.append((path.stat().st_mtime, path))
+            except OSError:
+                continue  # Pruned meanwhile
+        stamped.sort(key=lambda item: item[0], reverse=True)
+        return [path for _, path in stamped]
+
+    def backup_digest(self, backup_path: Path) -> Optional[str]:
+        """Get the SHA-256 digest recorded in a backup's name
+
+        Args:
+            backup_path: Backup file path
+
+        Returns:
+            Hex digest, or None for backups created without one
+        """
+        digest = backup_path.name.rsplit('.', 1)[-1]
+        if len(digest) != self.DIGEST_LENGTH:
+            return None
+        try:
+            int(digest, 16)
+        except ValueError:
+            return None
+        return digest
+
+    def verify_backup(self, backup_path: Path) -> Optional[bool]:
+        """Verify a backup against the digest recorded at write time
+
+        Hashes the raw bytes instead of parsing YAML, so it is cheap even for
+        large files.
+
+        Args:
+            backup_path: Backup file path
+
+        Returns:
+            True if intact, False if corrupt or unreadable,
+            None if the backup has no recorded digest
+        """
+        expected = self.backup_digest(backup_path)
+        if expected is None:
+            return None
+
+        try:
+            return self.file_digest(backup_path) == expected
+        except OSError as e:
+            logger.warning(f"无法读取备份 {backup_path}: {e}")
+            return False
+
+    def file_digest(self, file_path: Path) -> str:
+        """Compute the SHA-256 digest of a file
+
+        Args:
+            file_path: File to hash
+
+        Returns:
+            Hex digest
+        """
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
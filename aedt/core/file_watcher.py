@@ -0,0 +1,406 @@
+"""File watching service for AEDT
+
+Config hot reload, state auto reload and any other file watching share one
+observer through FileWatcherService: subscribers register a directory, a
+glob pattern and a callback, and events are filtered and debounced per path
+before the callback runs.
+
+watchdog is imported only when the first observer is created, so commands
+that never watch files do not pay for it; without watchdog a stat-based
+polling observer is used instead.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import os
+import stat
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FileEvent:
+    """File system event emitted by PollingObserver
+
+    Mirrors the attributes of watchdog events that AEDT handlers use.
+    """
+    event_type: str  # created/modified/deleted/moved
+    src_path: str
+    dest_path: str = ""
+    is_directory: bool = False
+
+
+class FileEventHandler:
+    """Base class for file event handlers
+
+    Works with both watchdog observers and PollingObserver: observers call
+    dispatch(event), which routes on event.event_type like watchdog's
+    FileSystemEventHandler does.
+    """
+
+    def dispatch(self, event):
+        """Route an event to the matching on_* method
+
+        Args:
+            event: watchdog event or FileEvent
+        """
+        if getattr(event, 'is_directory', False):
+            return
+        method = getattr(self, f"on_{event.event_type}", None)
+        if method is not None:
+            method(event)
+
+    def on_created(self, event):
+        """Handle file creation event"""
+
+    def on_modified(self, event):
+        """Handle file modification event"""
+
+    def on_moved(self, event):
+        """Handle file move event"""
+
+    def on_deleted(self, event):
+        """Handle file deletion event"""
+
+
+class _PollingWatch:
+    """One directory watched by PollingObserver"""
+
+    def __init__(self, handler, path: Path, recursive: bool):
+        self.handler = handler
+        self.path = path
+        self.recursive = recursive
+        self.files: Dict[str, Tuple[int, int]] = {}
+
+
+class PollingObserver:
+    """Observer that detects changes by periodically stat'ing files
+
+    Fallback for environments without watchdog. Exposes the subset of the
+    watchdog Observer API AEDT uses (schedule, unschedule, start, stop,
+    join). Changes are reported as created/modified/deleted; a rename shows
+    up as a deletion plus a creation.
+    """
+
+    DEFAULT_INTERVAL = 0.5
+
+    def __init__(self, interval: Optional[float] = None):
+        """Initialize observer
+
+        Args:
+            interval: Seconds between scans (default: DEFAULT_INTERVAL)
+        """
+        self.interval = interval if interval is not None else self.DEFAULT_INTERVAL
+        self._watches: List[_PollingWatch] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, event_handler, path: str, recursive: bool = False) -> _PollingWatch:
+        """Watch a directory
+
+        Args:
+            event_handler: Object with a dispatch(event) method
+            path: Directory to watch
+            recursive: Also watch subdirectories
+
+        Returns:
+            Watch handle for unschedule()
+        """
+        watch = _PollingWatch(event_handler, Path(path), recursive)
+        watch.files = self._scan(watch.path, recursive)
+        with self._lock:
+            self._watches.append(watch)
+        return watch
+
+    def unschedule(self, watch: _PollingWatch):
+        """Stop watching a directory
+
+        Args:
+            watch: Handle returned by schedule()
+        """
+        with self._lock:
+            if watch in self._watches:
+                self._watches.remove(watch)
+
+    def start(self):
+        """Start the polling thread"""
+        self._thread = threading.Thread(target=self._run, name="aedt-polling-observer",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the polling thread to stop"""
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the polling thread to exit"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        """Whether the polling thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """Scan all watches until stopped"""
+        while not self._stop_event.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """Scan every watch once and dispatch the changes found"""
+        with self._lock:
+            watches = list(self._watches)
+        for watch in watches:
+            try:
+                self._poll_watch(watch)
+            except Exception as e:
+                logger.error(f"轮询文件变化失败: {watch.path}: {e}")
+
+    def _poll_watch(self, watch: _PollingWatch):
+        """Compare one watch against its previous scan and dispatch events"""
+        previous = watch.files
+        current = self._scan(watch.path, watch.recursive)
+        watch.files = current
+
+        for file_path, signature in current.items():
+            old = previous.get(file_path)
+            if old is None:
+                watch.handler.dispatch(FileEvent('created', file_path))
+            elif old != signature:
+                watch.handler.dispatch(FileEvent('modified', file_path))
+        for file_path in previous.keys() - current.keys():
+            watch.handler.dispatch(FileEvent('deleted', file_path))
+
+    @staticmethod
+    def _scan(path: Path, recursive: bool) -> Dict[str, Tuple[int, int]]:
+        """Map each file below path to its (mtime_ns, size)"""
+        result = {}
+        if recursive:
+            walker = os.walk(path)
+        else:
+            try:
+                walker = [(str(path), [], os.listdir(path))]
+            except OSError:
+                return result
+
+        for root, _, names in walker:
+            for name in names:
+                file_path = os.path.join(root, name)
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    result[file_path] = (st.st_mtime_ns, st.st_size)
+        return result
+
+
+def create_observer():
+    """Create a file system observer
+
+    Imports watchdog on first use; falls back to PollingObserver when
+    watchdog is not installed.
+
+    Returns:
+        watchdog Observer or PollingObserver instance
+    """
+    try:
+        from watchdog.observers import Observer
+    except ImportError:
+        logger.info("未安装 watchdog，使用轮询方式监听文件变化")
+        return PollingObserver()
+    return Observer()
+
+
+@dataclass(eq=False)
+class WatchSubscription:
+    """A registered interest in files below a directory"""
+    directory: Path
+    pattern: str  # Glob matched against the path relative to directory
+    callback: Callable[[Path], None]
+    recursive: bool = False
+    debounce: float = 0.1
+    active: bool = True
+
+    def matches(self, path: Path) -> bool:
+        """Whether a changed file path concerns this subscription"""
+        try:
+            relative = path.relative_to(self.directory)
+        except ValueError:
+            return False
+        if not self.recursive and len(relative.parts) != 1:
+            return False
+        return relative.match(self.pattern)
+
+
+class _WatchHandler(FileEventHandler):
+    """Routes the events of one observer watch to its subscriptions"""
+
+    def __init__(self, service: 'FileWatcherService'):
+        self.service = service
+        self.subscriptions: List[WatchSubscription] = []
+        self.watch = None
+
+    def on_created(self, event):
+        self.service._route(self, event.src_path)
+
+    def on_modified(self, event):
+        self.service._route(self, event.src_path)
+
+    def on_moved(self, event):
+        # Atomic saves write a temp file and rename it into place
+        self.service._route(self, event.dest_path)
+
+
+class FileWatcherService:
+    """One observer shared by every file subscriber in the process
+
+    Each (directory, recursive) pair is scheduled on the observer once, no
+    matter how many subscribers watch it. Events are matched against each
+    subscription's glob and debounced per (subscription, path): a burst of
+    events for one file runs the callback once, on a timer thread, after
+    ``debounce`` seconds without further events. The observer starts with
+    the first subscription and stops when the last one is removed.
+    """
+
+    def __init__(self, observer_factory: Optional[Callable[[], object]] = None):
+        """Initialize service
+
+        Args:
+            observer_factory: Creates the observer (default: create_observer)
+        """
+        self.observer_factory = observer_factory or create_observer
+        self._observer = None
+        self._handlers: Dict[Tuple[str, bool], _WatchHandler] = {}
+        self._timers: Dict[Tuple[int, str], threading.Timer] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the shared observer is currently running"""
+        return self._observer is not None
+
+    def subscribe(
+        self,
+        directory: Path,
+        pattern: str,
+        callback: Callable[[Path], None],
+        recursive: bool = False,
+        debounce: float = 0.1
+    ) -> WatchSubscription:
+        """Register a callback for changes to matching files
+
+        Args:
+            directory: Directory to watch (must exist)
+            pattern: Glob pattern, e.g. 'config.yaml' or '*.md'; matched
+                against the path relative to directory, from the right
+            callback: Called as callback(path) once a file's events settle
+            recursive: Also watch subdirectories
+            debounce: Quiet period in seconds before the callback runs
+
+        Returns:
+            Subscription handle for unsubscribe()
+        """
+        directory = Path(directory).resolve()
+        subscription = WatchSubscription(directory, pattern, callback, recursive, debounce)
+        key = (str(directory), recursive)
+
+        with self._lock:
+            if self._observer is None:
+                self._observer = self.observer_factory()
+                self._observer.start()
+                logger.info("已启动共享文件监听")
+
+            handler = self._handlers.get(key)
+            if handler is None:
+                handler = _WatchHandler(self)
+                handler.watch = self._observer.schedule(handler, key[0], recursive=recursive)
+                self._handlers[key] = handler
+            handler.subscriptions = handler.subscriptions + [subscription]
+
+        logger.debug(f"已订阅文件变化: {directory} ({pattern})")
+        return subscription
+
+    def unsubscribe(self, subscription: WatchSubscription):
+        """Remove a subscription and cancel its pending callbacks
+
+        Args:
+            subscription: Handle returned by subscribe()
+        """
+        observer = None
+        with self._lock:
+            if not subscription.active:
+                return
+            subscription.active = False
+
+            for timer_key in [k for k in self._timers if k[0] == id(subscription)]:
+                self._timers.pop(timer_key).cancel()
+
+            key = (str(subscription.directory), subscription.recursive)
+            handler = self._handlers.get(key)
+            if handler is not None:
+                handler.subscriptions = [
+                    s for s in handler.subscriptions if s is not subscription
+                ]
+                if not handler.subscriptions:
+                    del self._handlers[key]
+                    self._observer.unschedule(handler.watch)
+
+            if not self._handlers and self._observer is not None:
+                observer, self._observer = self._observer, None
+
+        if observer is not None:
+            observer.stop()
+            observer.join()
+            logger.info("已停止共享文件监听")
+
+    def _route(self, handler: _WatchHandler, src_path: str):
+        """Start or restart the debounce timer of every matching subscription"""
+        path = Path(src_path)
+        for subscription in handler.subscriptions:
+            if not subscription.active or not subscription.matches(path):
+                continue
+            timer_key = (id(subscription), src_path)
+            with self._lock:
+                if not subscription.active:
+                    continue
+                timer = self._timers.get(timer_key)
+                if timer is not None:
+                    timer.cancel()
+                timer = threading.Timer(subscription.debounce, self._fire,
+                                        args=(subscription, timer_key, path))
+                timer.daemon = True
+                self._timers[timer_key] = timer
+                timer.start()
+
+    def _fire(self, subscription: WatchSubscription, timer_key: Tuple[int, str], path: Path):
+        """Run a subscription callback once its debounce window has passed"""
+        with self._lock:
+            if self._timers.get(timer_key) is not threading.current_thread():
+                return
+            del self._timers[timer_key]
+        try:
+            subscription.callback(path)
+        except Exception as e:
+            logger.error(f"文件变化回调失败: {path}: {e}")
+
+
+_shared_service: Optional[FileWatcherService] = None
+_shared_lock = threading.Lock()
+
+
+def get_watcher_service() -> FileWatcherService:
+    """Return the process-wide FileWatcherService
+
+    Returns:
+        Shared service instance (created on first call)
+    """
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = FileWatcherService()
+        return _shared_service
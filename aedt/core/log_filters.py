@@ -0,0 +1,172 @@
+"""Rate limiting and sampling filters for AEDT logs
+
+A stuck agent or a reload storm can log the same message thousands of
+times per second. RateLimitFilter lets the first ``burst`` records of each
+(logger, message template) pair through per ``window`` seconds, counts the
+rest, and logs one "suppressed N messages" summary per pair and window.
+DEBUG records can additionally be sampled.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import random
+import threading
+import time
+
+# Record attribute caching the filter decision, so a record passing several
+# handlers of one logger is counted once
+DECISION_ATTR = "aedt_rate_limit"
+# Marks summary records, which are never limited
+SUMMARY_ATTR = "aedt_summary"
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Rate limiting settings"""
+    window: float = 10.0  # Seconds per window
+    burst: int = 20  # Identical records let through per window
+    debug_sample_rate: float = 1.0  # Fraction of DEBUG records kept
+
+    def __post_init__(self):
+        """Validate settings"""
+        if self.window <= 0:
+            raise ValueError(f"window 必须大于 0，当前值: {self.window}")
+        if self.burst < 1:
+            raise ValueError(f"burst 必须大于 0，当前值: {self.burst}")
+        if not 0.0 <= self.debug_sample_rate <= 1.0:
+            raise ValueError(
+                f"debug_sample_rate 必须在 0 到 1 之间，当前值: {self.debug_sample_rate}"
+            )
+
+
+class _Window:
+    """Counts of one (logger, template) pair in its current window"""
+
+    __slots__ = ("start", "count", "suppressed", "levelno", "name")
+
+    def __init__(self, start: float, levelno: int, name: str):
+        self.start = start
+        self.count = 0
+        self.suppressed = 0
+        self.levelno = levelno
+        self.name = name
+
+
+class RateLimitFilter(logging.Filter):
+    """Deduplicates identical records per time window and samples DEBUG
+
+    Summaries are logged through ``logger`` (the logger whose handlers
+    carry this filter) when the pair's next record arrives after its
+    window, when the periodic sweep finds an expired window, or on flush().
+    The sweep runs at most once per window, from whichever logging call
+    comes first, so no extra thread is needed.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        settings: RateLimit = RateLimit(),
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
+        """Initialize filter
+
+        Args:
+            logger: Logger whose handlers use this filter; receives summaries
+            settings: Window, burst and sampling settings
+            clock: Monotonic time source
+            rng: Random source for DEBUG sampling
+        """
+        super().__init__()
+        self.logger = logger
+        self.settings = settings
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.suppressed_total = 0
+        self.sampled_out = 0
+        self.summaries = 0
+        self._windows: Dict[Tuple[str, str], _Window] = {}
+        self._next_sweep = clock() + settings.window
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        decision = getattr(record, DECISION_ATTR, None)
+        if decision is not None:
+            return decision
+        if getattr(record, SUMMARY_ATTR, False):
+            return True
+        decision = self._decide(record)
+        setattr(record, DECISION_ATTR, decision)
+        return decision
+
+    def _decide(self, record: logging.LogRecord) -> bool:
+        settings = self.settings
+        if (record.levelno <= logging.DEBUG and settings.debug_sample_rate < 1.0
+                and self.rng.random() >= settings.debug_sample_rate):
+            with self._lock:
+                self.sampled_out += 1
+            return False
+
+        key = (record.name, record.msg if isinstance(record.msg, str) else repr(record.msg))
+        now = self.clock()
+        expired: List[Tuple[Tuple[str, str], _Window]] = []
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window.start >= settings.window:
+                if window is not None and window.suppressed:
+                    expired.append((key, window))
+                window = self._windows[key] = _Window(now, record.levelno, record.name)
+            window.count += 1
+            allowed = window.count <= settings.burst
+            if not allowed:
+                window.suppressed += 1
+                self.suppressed_total += 1
+
+            if now >= self._next_sweep:
+                self._next_sweep = now + settings.window
+                expired.extend(self._pop_expired(now))
+
+        for expired_key, expired_window in expired:
+            self._emit_summary(expired_key, expired_window)
+        return allowed
+
+    def _pop_expired(self, now: float):
+        """Remove finished windows; return those with suppressed records (lock held)"""
+        expired = []
+        for key, window in list(self._windows.items()):
+            if now - window.start >= self.settings.window:
+                del self._windows[key]
+                if window.suppressed:
+                    expired.append((key, window))
+        return expired
+
+    def _emit_summary(self, key: Tuple[str, str], window: _Window):
+        """Log how many records of a pair a window suppressed"""
+        record = logging.LogRecord(
+            window.name, window.levelno, __file__, 0,
+            "已抑制 %d 条重复日志 (%g 秒内): %s",
+            (window.suppressed, self.settings.window, key[1]), None
+        )
+        setattr(record, SUMMARY_ATTR, True)
+        with self._lock:
+            self.summaries += 1
+        self.logger.handle(record)
+
+    def flush(self):
+        """Log the summaries of all windows, finished or not"""
+        with self._lock:
+            pending = [(key, window) for key, window in self._windows.items() if window.suppressed]
+            self._windows.clear()
+        for key, window in pending:
+            self._emit_summary(key, window)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the filter counters"""
+        with self._lock:
+            return {
+                'suppressed': self.suppressed_total,
+                'sampled_out': self.sampled_out,
+                'summaries': self.summaries,
+                'tracked': len(self._windows),
+            }
@@ -0,0 +1,272 @@
+"""Follow AEDT logs as they are written
+
+LogFollower tails one log file across rotations: the open file keeps
+being read after RotatingFileHandler renames it away, backups rotated past
+in between two reads are read from their (possibly compressed) segments,
+and the new live file is then read from its start. follow_logs() follows
+several logs at once and merges their records by timestamp.
+
+New data is noticed through the shared FileWatcherService (inotify and
+friends via watchdog, or stat polling without it); every follower also
+re-checks its file each ``poll_interval`` seconds, so a busy file whose
+events are still being debounced is never starved.
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import heapq
+import os
+import threading
+
+from aedt.core.file_watcher import FileWatcherService, WatchSubscription, get_watcher_service
+from aedt.core.log_index import LogEntry, LogQuery, parse_entries
+from aedt.core.log_rotation import COMPRESSION_SUFFIXES, open_segment_binary
+
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+def _entry_key(entry: LogEntry) -> float:
+    return entry.ts if entry.ts is not None else 0.0
+
+
+class LogFollower:
+    """Reads the lines appended to one log file, across rotations
+
+    Rotations are detected by the live path pointing to a different file
+    (inode) than the one open; a file truncated in place is read again
+    from its start.
+    """
+
+    def __init__(self, log_file: Path, from_start: bool = False):
+        """Initialize follower
+
+        Args:
+            log_file: Live log file to follow (may not exist yet)
+            from_start: Read the existing content instead of starting at
+                the end (a file created later is always read from its start)
+        """
+        self.log_file = Path(log_file)
+        self._stream = None
+        self._identity: Optional[Tuple[int, int]] = None
+        self._buffer = b""
+        self._held: List[str] = []
+        self._open(at_end=not from_start)
+
+    @property
+    def position(self) -> int:
+        """Offset in the open file up to which lines have been read"""
+        return self._stream.tell() - len(self._buffer) if self._stream is not None else 0
+
+    def _open(self, at_end: bool) -> bool:
+        try:
+            stream = open(self.log_file, 'rb')
+        except FileNotFoundError:
+            return False
+        st = os.fstat(stream.fileno())
+        self._identity = (st.st_dev, st.st_ino)
+        if at_end:
+            stream.seek(0, os.SEEK_END)
+        self._stream = stream
+        return True
+
+    def _split(self, data: bytes, final: bool = False) -> List[str]:
+        """Complete lines of buffer + data; the partial rest stays buffered"""
+        parts = (self._buffer + data).split(b"\n")
+        self._buffer = parts.pop()
+        if final and self._buffer:
+            parts.append(self._buffer)
+            self._buffer = b""
+        return [part.decode('utf-8', errors='replace').rstrip("\r") for part in parts]
+
+    def _backup(self, number: int) -> Optional[Path]:
+        """Path of backup .number, compressed preferred (like log_segments)"""
+        base = f"{self.log_file}.{number}"
+        for suffix in [*COMPRESSION_SUFFIXES.values(), ""]:
+            path = Path(base + suffix)
+            if path.exists():
+                return path
+        return None
+
+    def _missed_backups(self) -> List[Path]:
+        """Backups rotated after the open file, oldest first
+
+        The open file is found among the plain backups by inode; once it
+        has been compressed its position is unknown and nothing is returned.
+        """
+        number = 1
+        while True:
+            path = self._backup(number)
+            if path is None:
+                return []
+            plain = Path(f"{self.log_file}.{number}")
+            try:
+                st = os.stat(plain)
+                if (st.st_dev, st.st_ino) == self._identity:
+                    break
+            except FileNotFoundError:
+                pass
+            number += 1
+        return [path for path in (self._backup(n) for n in range(number - 1, 0, -1))
+                if path is not None]
+
+    def _read_backup(self, path: Path) -> List[str]:
+        for _ in range(2):
+            try:
+                with open_segment_binary(path) as stream:
+                    return self._split(stream.read(), final=True)
+            except FileNotFoundError:
+                # Compressed since it was found; the compressed copy exists now
+                number = int(path.name[len(self.log_file.name) + 1:].split(".")[0])
+                path = self._backup(number)
+                if path is None:
+                    break
+        return []
+
+    def read_lines(self) -> List[str]:
+        """Return the complete lines written since the last call"""
+        if self._stream is None and not self._open(at_end=False):
+            return []
+        lines = self._split(self._stream.read())
+        try:
+            st = os.stat(self.log_file)
+        except FileNotFoundError:
+            st = None  # Renamed away, new live file not created yet
+
+        if st is None or (st.st_dev, st.st_ino) != self._identity:
+            # Rotated: finish the old file, then any backup rotated after
+            # it, then start on the new live file
+            lines.extend(self._split(self._stream.read(), final=True))
+            for path in self._missed_backups():
+                lines.extend(self._read_backup(path))
+            self.close()
+            if st is not None and self._open(at_end=False):
+                lines.extend(self._split(self._stream.read()))
+        elif st.st_size < self._stream.tell():
+            # Truncated in place
+            self._stream.seek(0)
+            self._buffer = b""
+            lines.extend(self._split(self._stream.read()))
+        return lines
+
+    def read_entries(self) -> List[LogEntry]:
+        """Return the records written since the last call
+
+        A text record may still get traceback lines, so the last one is held
+        back until the next record starts or a call finds nothing new.
+        """
+        lines = self.read_lines()
+        if not lines:
+            held, self._held = self._held, []
+            return list(parse_entries(self.log_file, held))
+        entries = list(parse_entries(self.log_file, self._held + lines))
+        self._held = []
+        if entries and not entries[-1].text.startswith("{"):
+            self._held = entries.pop().text.split("\n")
+        return entries
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+def _tail_entries(follower: LogFollower, n: int, query: Optional[LogQuery]) -> List[LogEntry]:
+    """Last n matching records of the live file before the follower's position"""
+    if n <= 0 or follower.position == 0:
+        return []
+    try:
+        with open(follower.log_file, 'rb') as stream:
+            data = stream.read(follower.position)
+    except FileNotFoundError:
+        return []
+    lines = data.decode('utf-8', errors='replace').splitlines()
+    return list(deque(
+        (entry for entry in parse_entries(follower.log_file, lines)
+         if query is None or query.matches(entry, None)),
+        maxlen=n
+    ))
+
+
+def follow_logs(
+    log_files: Iterable[Path],
+    query: Optional[LogQuery] = None,
+    backlog: int = 0,
+    stop: Optional[threading.Event] = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    discover: Optional[Callable[[], Iterable[Path]]] = None,
+    watcher: Optional[FileWatcherService] = None
+) -> Iterator[LogEntry]:
+    """Stream the records written to several logs, merged by timestamp
+
+    Following starts at the end of each file when this is called, not when
+    iteration starts. Records read in one pass over the files are merged by
+    timestamp; ordering across passes is the order they were written in.
+    The generator runs until ``stop`` is set or it is closed.
+
+    Args:
+        log_files: Live log files to follow (may not exist yet)
+        query: Only yield matching records (indexes are not used)
+        backlog: First yield the last this many matching records of the
+            live files
+        stop: Event ending the generator
+        poll_interval: Maximum seconds between checks of every file
+        discover: Called once per pass; returns the log files to follow,
+            new ones are followed from their start (e.g. new epics)
+        watcher: Service providing change notifications
+            (default: the shared get_watcher_service())
+
+    Returns:
+        Generator of LogEntry
+    """
+    followers = {Path(log_file): LogFollower(Path(log_file)) for log_file in log_files}
+    tail: List[LogEntry] = []
+    if backlog > 0:
+        tails = [_tail_entries(follower, backlog, query) for follower in followers.values()]
+        tail = list(heapq.merge(*tails, key=_entry_key))[-backlog:]
+    return _follow(followers, tail, query, stop, poll_interval, discover,
+                   watcher or get_watcher_service())
+
+
+def _follow(
+    followers: Dict[Path, LogFollower],
+    tail: List[LogEntry],
+    query: Optional[LogQuery],
+    stop: Optional[threading.Event],
+    poll_interval: float,
+    discover: Optional[Callable[[], Iterable[Path]]],
+    watcher: FileWatcherService
+) -> Iterator[LogEntry]:
+    changed = threading.Event()
+    subscriptions: Dict[Path, WatchSubscription] = {}
+
+    def watch_directories():
+        # Directories created after the follow started are watched once they exist
+        for log_file in followers:
+            directory = log_file.parent
+            if directory not in subscriptions and directory.is_dir():
+                subscriptions[directory] = watcher.subscribe(
+                    directory, "*", lambda path: changed.set(), debounce=0.05
+                )
+
+    try:
+        yield from tail
+        while stop is None or not stop.is_set():
+            changed.clear()
+            if discover is not None:
+                for log_file in map(Path, discover()):
+                    if log_file not in followers:
+                        followers[log_file] = LogFollower(log_file, from_start=True)
+            watch_directories()
+
+            batches = [follower.read_entries() for follower in list(followers.values())]
+            for entry in heapq.merge(*batches, key=_entry_key):
+                if query is None or query.matches(entry, None):
+                    yield entry
+            if not any(batches):
+                changed.wait(poll_interval)
+    finally:
+        for subscription in subscriptions.values():
+            watcher.unsubscribe(subscription)
+        for follower in followers.values():
+            follower.close()
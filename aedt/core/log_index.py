@@ -0,0 +1,598 @@
+"""Sidecar indexes for AEDT log files
+
+Every log segment (live file or rotated backup) can have a small JSON
+sidecar describing blocks of records: byte range in the uncompressed
+segment, time range, level counts and the epic/agent ids seen. Queries use
+the sidecar to skip whole segments and blocks that cannot match and read
+only the remaining byte ranges; anything not covered by the index (a crash
+before the sidecar was written, logs from before indexing) is scanned.
+
+Sidecar names drop the compression suffix:
+    aedt.log        -> aedt.log.idx
+    aedt.log.1.gz   -> aedt.log.1.idx
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+import json
+import logging
+import os
+import re
+import time
+
+from aedt.core.log_metrics import LogCounters
+from aedt.core.log_rotation import (
+    COMPRESSION_SUFFIXES,
+    CompressingRotatingFileHandler,
+    log_segments,
+    open_segment_binary,
+)
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+# Records per index block
+DEFAULT_BLOCK_RECORDS = 1000
+
+_EPIC_LOGGER = re.compile(r"\.epic\.([^.]+)$")
+_TEXT_HEADER = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] \[(\w+)\] \[([^\]]+)\] ")
+
+
+def sidecar_path(segment: Path) -> Path:
+    """Sidecar index path of a log segment"""
+    segment = Path(segment)
+    name = segment.name
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return segment.with_name(name + INDEX_SUFFIX)
+
+
+@dataclass
+class IndexBlock:
+    """Summary of a contiguous run of records in a segment"""
+    offset: int  # Byte offset of the first record
+    end: int = 0  # Byte offset after the last record
+    count: int = 0
+    first_ts: float = 0.0
+    last_ts: float = 0.0
+    levels: Dict[str, int] = field(default_factory=dict)
+    agents: Set[str] = field(default_factory=set)
+    epics: Set[str] = field(default_factory=set)
+
+    def add(self, record: logging.LogRecord, agent_id: Optional[str], epic_id: Optional[str]):
+        """Account for one record"""
+        if not self.count:
+            self.first_ts = record.created
+        self.count += 1
+        self.last_ts = record.created
+        self.levels[record.levelname] = self.levels.get(record.levelname, 0) + 1
+        if agent_id is not None:
+            self.agents.add(agent_id)
+        if epic_id is not None:
+            self.epics.add(epic_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'offset': self.offset,
+            'end': self.end,
+            'count': self.count,
+            'first_ts': self.first_ts,
+            'last_ts': self.last_ts,
+            'levels': self.levels,
+            'agents': sorted(self.agents),
+            'epics': sorted(self.epics),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IndexBlock':
+        return cls(
+            offset=data['offset'],
+            end=data['end'],
+            count=data['count'],
+            first_ts=data['first_ts'],
+            last_ts=data['last_ts'],
+            levels=dict(data['levels']),
+            agents=set(data['agents']),
+            epics=set(data['epics']),
+        )
+
+
+@dataclass
+class SegmentIndex:
+    """Sidecar contents for one segment"""
+    blocks: List[IndexBlock] = field(default_factory=list)
+    complete: bool = False  # Segment was rotated; nothing follows the last block
+    size: Optional[int] = None  # Uncompressed size of a complete segment
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': INDEX_VERSION,
+            'complete': self.complete,
+            'size': self.size,
+            'blocks': [block.to_dict() for block in self.blocks],
+        }
+
+    def save(self, path: Path):
+        """Write the sidecar atomically"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['SegmentIndex']:
+        """Read a sidecar; None if missing, unreadable or of another version"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_VERSION:
+                return None
+            return cls(
+                blocks=[IndexBlock.from_dict(block) for block in data['blocks']],
+                complete=data['complete'],
+                size=data['size'],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+class SegmentIndexer:
+    """Builds the sidecar of a live log file while records are written
+
+    A block is closed and the sidecar saved every ``block_records``
+    records; the open block is written out on rollover and close.
+    """
+
+    def __init__(self, log_file: Path, block_records: int = DEFAULT_BLOCK_RECORDS):
+        """Initialize indexer, continuing a valid existing sidecar
+
+        Args:
+            log_file: Live log file
+            block_records: Records per block
+        """
+        self.log_file = Path(log_file)
+        self.path = sidecar_path(self.log_file)
+        self.block_records = block_records
+        self.index = SegmentIndex()
+        self._block: Optional[IndexBlock] = None
+
+        existing = SegmentIndex.load(self.path)
+        if existing is not None and not existing.complete:
+            try:
+                size = os.path.getsize(self.log_file)
+            except OSError:
+                size = 0
+            # A sidecar pointing past the end belongs to a replaced file
+            if all(block.end <= size for block in existing.blocks):
+                self.index = existing
+
+    def add(self, record: logging.LogRecord, start: int, end: int,
+            agent_id: Optional[str], epic_id: Optional[str]):
+        """Account for a record written at [start, end) of the live file
+
+        Args:
+            record: Record written
+            start: Byte offset where the record starts
+            end: Byte offset after the record
+            agent_id: Agent the record belongs to, if known
+            epic_id: Epic the record belongs to, if known
+        """
+        if self._block is None:
+            self._block = IndexBlock(offset=start)
+        self._block.add(record, agent_id, epic_id)
+        self._block.end = end
+        if self._block.count >= self.block_records:
+            self.index.blocks.append(self._block)
+            self._block = None
+            self.save()
+
+    def finish_block(self) -> bool:
+        """Close the open block
+
+        Returns:
+            Whether there was an open block
+        """
+        if self._block is None:
+            return False
+        self.index.blocks.append(self._block)
+        self._block = None
+        return True
+
+    def save(self):
+        """Write the sidecar of the live file"""
+        try:
+            self.index.save(self.path)
+        except OSError:
+            pass  # The index is an optimization; queries scan what it misses
+
+    def rotate(self, backup_count: int):
+        """Shift backup sidecars like the segments and start a new index
+
+        Called after the live file was renamed to <name>.1; the finished
+        index becomes <name>.1.idx.
+        """
+        base = str(self.log_file)
+        try:
+            for i in range(backup_count - 1, 0, -1):
+                source = Path(f"{base}.{i}{INDEX_SUFFIX}")
+                if source.exists():
+                    os.replace(source, f"{base}.{i + 1}{INDEX_SUFFIX}")
+            if backup_count > 0:
+                self.index.complete = True
+                self.index.size = self.index.blocks[-1].end if self.index.blocks else 0
+                self.index.save(Path(f"{base}.1{INDEX_SUFFIX}"))
+            if self.path.exists():
+                self.path.unlink()
+        except OSError:
+            pass
+        self.index = SegmentIndex()
+        self._block = None
+
+
+class IndexedRotatingFileHandler(CompressingRotatingFileHandler):
+    """Rotating file handler that maintains sidecar indexes of its segments
+
+    Agent and epic ids come from the record (``extra={'agent_id': ...}``),
+    then from the context of a record received by a LogSink, the handler's
+    own ``context`` (set by AEDTLogger for epic logs, whatever the format)
+    or the formatter's bound context (JSONLinesFormatter), then, for the
+    epic, from the logger name (aedt.<project>.epic.<id>).
+    """
+
+    def __init__(self, filename: Union[str, Path], index_records: int = DEFAULT_BLOCK_RECORDS,
+                 **kwargs):
+        """Initialize handler
+
+        Args:
+            filename: Log file path
+            index_records: Records per index block (0 disables indexing)
+            **kwargs: CompressingRotatingFileHandler arguments
+        """
+        super().__init__(filename, **kwargs)
+        self.indexer = (
+            SegmentIndexer(Path(self.baseFilename), index_records) if index_records > 0 else None
+        )
+        self._position: Optional[int] = None  # End of the last record written
+        self.metrics: Optional[LogCounters] = None  # Set by AEDTLogger
+        self.context: Dict[str, Any] = {}  # Epic context, set by AEDTLogger
+
+    def _ids(self, record: logging.LogRecord) -> Tuple[Optional[str], Optional[str]]:
+        context = (getattr(record, 'aedt_context', None) or self.context
+                   or getattr(self.formatter, 'context', None) or {})
+        agent_id = getattr(record, 'agent_id', None) or context.get('agent_id')
+        epic_id = getattr(record, 'epic_id', None) or context.get('epic_id')
+        if epic_id is None:
+            match = _EPIC_LOGGER.search(record.name)
+            if match:
+                epic_id = match.group(1)
+        return (
+            None if agent_id is None else str(agent_id),
+            None if epic_id is None else str(epic_id),
+        )
+
+    def emit(self, record: logging.LogRecord):
+        if self.indexer is None and self.metrics is None:
+            super().emit(record)
+            return
+        if self._position is None:
+            try:
+                self._position = os.path.getsize(self.baseFilename)
+            except OSError:
+                self._position = 0
+        super().emit(record)
+        if self.stream is None:
+            return
+        # A rollover during emit resets _position to the new file's start
+        start, self._position = self._position, self.stream.tell()
+        if self.metrics is not None:
+            self.metrics.written(record.levelname, self._position - start)
+        if self.indexer is not None:
+            agent_id, epic_id = self._ids(record)
+            self.indexer.add(record, start, self._position, agent_id, epic_id)
+
+    def doRollover(self):
+        if self.indexer is not None:
+            self.indexer.finish_block()
+        super().doRollover()
+        self._position = 0
+        if self.indexer is not None:
+            self.indexer.rotate(self.backupCount)
+        if self.metrics is not None:
+            self.metrics.rotated()
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.indexer is not None and self.indexer.finish_block():
+                self.indexer.save()
+        finally:
+            self.release()
+        super().close()
+
+
+@dataclass(frozen=True)
+class LogEntry:
+    """A log record read back from a file"""
+    path: Path  # Segment it was read from
+    text: str  # Full record, continuation lines included
+    level: str
+    logger: str
+    ts: Optional[float]
+    epic_id: Optional[str] = None
+    agent_id: Optional[str] = None
+
+
+@dataclass
+class QueryStats:
+    """What a query had to read"""
+    segments: int = 0
+    segments_skipped: int = 0
+    blocks_skipped: int = 0
+    bytes_read: int = 0
+
+
+@dataclass
+class LogQuery:
+    """Filters of a log query; None means no restriction"""
+    min_level: int = logging.NOTSET
+    agent_id: Optional[str] = None
+    epic_id: Optional[str] = None
+    since: Optional[float] = None  # Unix time
+    until: Optional[float] = None
+    pattern: Optional['re.Pattern[str]'] = None
+
+    def block_may_match(self, block: IndexBlock) -> bool:
+        """Whether any record of an indexed block can match"""
+        if self.since is not None and block.last_ts < self.since:
+            return False
+        if self.until is not None and block.first_ts > self.until:
+            return False
+        if self.min_level > logging.NOTSET and not any(
+            _level_number(level) >= self.min_level for level in block.levels
+        ):
+            return False
+        if self.agent_id is not None and self.agent_id not in block.agents:
+            return False
+        if self.epic_id is not None and self.epic_id not in block.epics:
+            return False
+        return True
+
+    def matches(self, entry: LogEntry, block: Optional[IndexBlock]) -> bool:
+        """Whether a record matches
+
+        Text lines carry no agent id; for them the agent filter is satisfied
+        only inside an indexed block whose records all belong to that agent.
+        """
+        if self.min_level > logging.NOTSET and _level_number(entry.level) < self.min_level:
+            return False
+        if self.since is not None and (entry.ts is None or entry.ts < self.since):
+            return False
+        # Text timestamps have whole seconds
+        if self.until is not None and (entry.ts is None or entry.ts > self.until):
+            return False
+        if self.agent_id is not None and entry.agent_id != self.agent_id:
+            if entry.agent_id is not None or block is None or block.agents != {self.agent_id}:
+                return False
+        if self.epic_id is not None and entry.epic_id != self.epic_id:
+            return False
+        if self.pattern is not None and not self.pattern.search(entry.text):
+            return False
+        return True
+
+
+def _level_number(level: str) -> int:
+    number = logging.getLevelName(level)
+    return number if isinstance(number, int) else logging.NOTSET
+
+
+_text_ts_cache: Dict[str, float] = {}
+
+
+def _text_timestamp(text: str) -> float:
+    """Unix time of a '%Y-%m-%d %H:%M:%S' local timestamp (cached per second)"""
+    ts = _text_ts_cache.get(text)
+    if ts is None:
+        if len(_text_ts_cache) > 4096:
+            _text_ts_cache.clear()
+        ts = _text_ts_cache[text] = time.mktime(time.strptime(text, "%Y-%m-%d %H:%M:%S"))
+    return ts
+
+
+def parse_entries(path: Path, lines: Iterable[str]) -> Iterator[LogEntry]:
+    """Group log lines into records
+
+    JSON lines are one record each; a text record continues until the next
+    line starting with a [time] [level] [logger] header.
+    """
+    pending: Optional[Dict[str, Any]] = None
+
+    def emit_pending() -> LogEntry:
+        return LogEntry(path=path, **pending)
+
+    for line in lines:
+        if line.startswith("{"):
+            try:
+                data = json.loads(line)
+            except ValueError:
+                data = None
+            if isinstance(data, dict):
+                if pending is not None:
+                    yield emit_pending()
+                    pending = None
+                ts = data.get('ts')
+                try:
+                    ts = datetime.fromisoformat(ts).timestamp() if ts else None
+                except (TypeError, ValueError):
+                    ts = None
+                extra = data.get('extra') or {}
+                agent_id = data.get('agent_id', extra.get('agent_id'))
+                epic_id = data.get('epic_id', extra.get('epic_id'))
+                logger_name = str(data.get('logger', ""))
+                if epic_id is None:
+                    match = _EPIC_LOGGER.search(logger_name)
+                    epic_id = match.group(1) if match else None
+                yield LogEntry(
+                    path=path,
+                    text=line,
+                    level=str(data.get('level', "")),
+                    logger=logger_name,
+                    ts=ts,
+                    epic_id=None if epic_id is None else str(epic_id),
+                    agent_id=None if agent_id is None else str(agent_id),
+                )
+                continue
+
+        match = _TEXT_HEADER.match(line)
+        if match:
+            if pending is not None:
+                yield emit_pending()
+            logger_name = match.group(3)
+            epic = _EPIC_LOGGER.search(logger_name)
+            pending = {
+                'text': line,
+                'level': match.group(2),
+                'logger': logger_name,
+                'ts': _text_timestamp(match.group(1)),
+                'epic_id': epic.group(1) if epic else None,
+            }
+        elif pending is not None:
+            pending['text'] += "\n" + line
+
+    if pending is not None:
+        yield emit_pending()
+
+
+def _read_ranges(
+    segment: Path,
+    ranges: List[Tuple[int, Optional[int], Optional[IndexBlock]]],
+    stats: QueryStats
+) -> Iterator[Tuple[List[str], Optional[IndexBlock]]]:
+    """Read byte ranges of a segment in ascending order"""
+    try:
+        stream = open_segment_binary(segment)
+    except FileNotFoundError:
+        return
+    with stream:
+        position = 0
+        for start, end, block in ranges:
+            if start != position:
+                stream.seek(start)
+            data = stream.read() if end is None else stream.read(end - start)
+            position = start + len(data)
+            stats.bytes_read += len(data)
+            yield data.decode('utf-8', errors='replace').splitlines(), block
+
+
+def query_segment(segment: Path, query: LogQuery, stats: Optional[QueryStats] = None,
+                  use_index: bool = True) -> Iterator[LogEntry]:
+    """Yield the matching records of one segment
+
+    Args:
+        segment: Plain or compressed log segment
+        query: Filters
+        stats: Collects what had to be read
+        use_index: Use the sidecar (False scans the whole segment)
+
+    Yields:
+        Matching records in file order
+    """
+    stats = stats if stats is not None else QueryStats()
+    stats.segments += 1
+    index = SegmentIndex.load(sidecar_path(segment)) if use_index else None
+    blocks = sorted(index.blocks, key=lambda block: block.offset) if index else []
+
+    # Indexed blocks that may match, plus every byte range the index misses
+    ranges: List[Tuple[int, Optional[int], Optional[IndexBlock]]] = []
+    position = 0
+    for block in blocks:
+        if block.offset > position:
+            ranges.append((position, block.offset, None))
+        if query.block_may_match(block):
+            ranges.append((block.offset, block.end, block))
+        else:
+            stats.blocks_skipped += 1
+        position = max(position, block.end)
+
+    if index is not None and index.complete:
+        if index.size is not None and index.size > position:
+            ranges.append((position, index.size, None))
+    elif not segment.name.endswith(tuple(COMPRESSION_SUFFIXES.values())):
+        try:
+            size = os.path.getsize(segment)
+        except OSError:
+            size = position
+        if size > position:
+            ranges.append((position, None, None))
+    else:
+        ranges.append((position, None, None))
+
+    if not ranges:
+        stats.segments_skipped += 1
+        return
+
+    for lines, block in _read_ranges(segment, ranges, stats):
+        for entry in parse_entries(segment, lines):
+            if query.matches(entry, block):
+                yield entry
+
+
+def query_log(log_file: Path, query: LogQuery, stats: Optional[QueryStats] = None,
+              use_index: bool = True) -> Iterator[LogEntry]:
+    """Yield the matching records of a log across its segments, oldest first
+
+    Args:
+        log_file: Live log file
+        query: Filters
+        stats: Collects what had to be read
+        use_index: Use the sidecars (False scans everything)
+    """
+    for segment in log_segments(log_file):
+        yield from query_segment(segment, query, stats, use_index)
+
+
+def find_log_files(
+    aedt_dir: Path,
+    project_name: Optional[str] = None,
+    epic_id: Optional[str] = None,
+    include_global: bool = True
+) -> List[Path]:
+    """Find the live log files under an .aedt directory
+
+    Args:
+        aedt_dir: .aedt directory
+        project_name: Only this project's epic logs (the global log is skipped)
+        epic_id: Only this epic's logs (the global log is skipped)
+        include_global: Include logs/aedt.log when neither filter is given
+
+    Returns:
+        Live log files (segments are found by query_log)
+    """
+    aedt_dir = Path(aedt_dir)
+    files: List[Path] = []
+    global_log = aedt_dir / "logs" / "aedt.log"
+    unfiltered = project_name is None and epic_id is None
+    if include_global and unfiltered and log_segments(global_log):
+        files.append(global_log)
+
+    projects_dir = aedt_dir / "projects"
+    project_dirs = (
+        [projects_dir / project_name] if project_name is not None
+        else sorted(path for path in projects_dir.glob("*") if path.is_dir())
+    )
+    pattern = re.compile(
+        rf"^epic-{re.escape(str(epic_id)) if epic_id is not None else '[^.]+'}\.log$"
+    )
+    for project_dir in project_dirs:
+        epics_dir = project_dir / "epics"
+        if not epics_dir.is_dir():
+            continue
+        names = {
+            path.name.split(".log", 1)[0] + ".log"
+            for path in epics_dir.glob("epic-*.log*")
+        }
+        files.extend(epics_dir / name for name in sorted(names) if pattern.match(name))
+    return files
@@ -0,0 +1,190 @@
+"""Metrics from the AEDT logging path
+
+Counters are updated where the logging path already serializes: each
+log's LogCounters by its file handler (under the handler lock it holds
+anyway) and the queue lag by the single listener thread, so recording a
+metric takes no extra lock. Readers copy the values when exporting.
+
+Metrics are exported in the Prometheus text format, written to a file
+(e.g. for the node_exporter textfile collector) or served over HTTP on a
+local port by MetricsServer. http.server is only imported once a server
+starts, so loading the logging modules stays cheap.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import os
+import tempfile
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class LogCounters:
+    """Counters of one log file
+
+    Updated only by the file handler owning the log, while it holds its
+    handler lock, so the increments need no lock of their own.
+    """
+
+    __slots__ = ("labels", "records", "bytes_written", "rotations")
+
+    def __init__(self, labels: Dict[str, str]):
+        """Initialize counters
+
+        Args:
+            labels: Labels identifying the log (log, project, epic)
+        """
+        self.labels = labels
+        self.records: Dict[str, int] = {}  # Per level name
+        self.bytes_written = 0
+        self.rotations = 0
+
+    def written(self, levelname: str, size: int):
+        """Count one record of size bytes"""
+        self.records[levelname] = self.records.get(levelname, 0) + 1
+        self.bytes_written += size
+
+    def rotated(self):
+        """Count one rollover"""
+        self.rotations += 1
+
+
+@dataclass
+class MetricFamily:
+    """One metric and its samples"""
+    name: str
+    type: str  # counter/gauge/summary
+    help: str
+    samples: List[Tuple[str, Dict[str, str], Union[int, float]]] = field(default_factory=list)
+
+    def add(self, value: Union[int, float], suffix: str = "", **labels: str):
+        """Add a sample; suffix is appended to the name (e.g. _sum)"""
+        self.samples.append((self.name + suffix, labels, value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: Union[int, float]) -> str:
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def render_prometheus(families: List[MetricFamily]) -> str:
+    """Render metric families in the Prometheus text exposition format"""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        for name, labels, value in family.samples:
+            if labels:
+                label_text = ",".join(
+                    f'{key}="{_escape(str(label))}"' for key, label in sorted(labels.items())
+                )
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: Union[str, Path], text: str):
+    """Write exported metrics to a file atomically
+
+    Scrapers reading the file never see a partial export.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _create_http_server(host: str, port: int, render: Callable[[], str]):
+    """Create a ThreadingHTTPServer serving GET /metrics
+
+    Imports http.server on first use.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        """Serves GET /metrics"""
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            try:
+                body = render().encode('utf-8')
+            except Exception as e:
+                self.send_error(500, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            """Scrapes are not logged"""
+
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    return server
+
+
+class MetricsServer:
+    """Serves metrics on http://host:port/metrics from a daemon thread"""
+
+    def __init__(self, render: Callable[[], str], host: str = "127.0.0.1", port: int = 0):
+        """Initialize server
+
+        Args:
+            render: Returns the Prometheus text for each scrape
+            host: Interface to bind (default: loopback only)
+            port: Port to bind (0: any free port, see address)
+        """
+        self.render = render
+        self.host = host
+        self.port = port
+        self._server: Optional[Any] = None  # http.server.ThreadingHTTPServer
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port) the server listens on"""
+        if self._server is None:
+            raise RuntimeError("指标服务尚未启动")
+        return self._server.server_address[:2]
+
+    def start(self):
+        """Bind and start serving"""
+        self._server = _create_http_server(self.host, self.port, self.render)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="aedt-log-metrics",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and release the port"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,346 @@
+"""Compressed log rotation for AEDT
+
+Rotated log backups are compressed (gzip, or zstd when the zstandard
+package is installed) by a background thread, so the logging call that
+triggers a rollover only renames files. Readers iterate the backups and the
+live file as one stream, opening compressed segments transparently.
+
+Backup layout for aedt.log with compression:
+    aedt.log          live file
+    aedt.log.1.gz     newest backup
+    ...
+    aedt.log.5.gz     oldest backup
+A backup whose compression is still pending is briefly present as
+aedt.log.1 and is read as plain text.
+"""
+
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple, Union
+import glob
+import gzip
+import importlib.util
+import io
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+
+COMPRESSIONS = ("auto", "gzip", "zstd", "none")
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def resolve_compression(compression: Optional[str]) -> Optional[str]:
+    """Resolve a compression setting to a codec name
+
+    Args:
+        compression: auto (zstd if installed, else gzip), gzip, zstd,
+            none or None
+
+    Returns:
+        "gzip", "zstd" or None for no compression
+
+    Raises:
+        ValueError: If the setting is unknown or zstd is not installed
+    """
+    if compression is None or compression == "none":
+        return None
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"未知的日志压缩方式: {compression}，可选: {', '.join(COMPRESSIONS)}")
+
+    has_zstd = importlib.util.find_spec("zstandard") is not None
+    if compression == "auto":
+        return "zstd" if has_zstd else "gzip"
+    if compression == "zstd" and not has_zstd:
+        raise ValueError("日志压缩方式 zstd 需要安装 zstandard")
+    return compression
+
+
+def compress_file(source: Path, target: Path, codec: str):
+    """Compress source into target atomically, then remove source
+
+    Args:
+        source: Plain file
+        target: Compressed file to create
+        codec: "gzip" or "zstd"
+    """
+    tmp_path = target.with_name(target.name + ".tmp")
+    try:
+        with open(source, 'rb') as src:
+            if codec == "zstd":
+                import zstandard
+                with open(tmp_path, 'wb') as dst:
+                    zstandard.ZstdCompressor().copy_stream(src, dst)
+            else:
+                with gzip.open(tmp_path, 'wb', compresslevel=6) as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    os.unlink(source)
+
+
+class LogCompressor:
+    """Compresses rotated log files on a background thread
+
+    The worker thread starts with the first job and exits when idle, so a
+    logger that never rotates does not keep a thread around.
+    """
+
+    IDLE_TIMEOUT = 5.0  # Seconds the worker waits for new jobs before exiting
+
+    def __init__(self, codec: str):
+        """Initialize compressor
+
+        Args:
+            codec: "gzip" or "zstd"
+        """
+        self.codec = codec
+        self.suffix = COMPRESSION_SUFFIXES[codec]
+        self.failures = 0
+        self._jobs: queue.Queue = queue.Queue()
+        self._pending: Dict[str, int] = {}  # Source path -> queued jobs
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, source: Path, target: Path):
+        """Queue source for compression into target
+
+        Args:
+            source: Rotated plain file
+            target: Compressed file to create
+        """
+        with self._condition:
+            key = str(source)
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self._jobs.put((source, target))
+            self._condition.notify_all()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="aedt-log-compressor", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        """Compress queued files until idle"""
+        while True:
+            with self._condition:
+                try:
+                    source, target = self._jobs.get_nowait()
+                except queue.Empty:
+                    source = None
+                if source is None:
+                    # Exit only when no job was queued meanwhile
+                    self._condition.wait(self.IDLE_TIMEOUT)
+                    if self._jobs.empty():
+                        self._thread = None
+                        return
+                    continue
+
+            try:
+                compress_file(source, target, self.codec)
+            except Exception as e:
+                # Keep the plain backup; logging from here could rotate again
+                self.failures += 1
+                print(f"Warning: 压缩日志失败 {source}: {e}", file=sys.stderr)
+
+            with self._condition:
+                key = str(source)
+                self._pending[key] -= 1
+                if not self._pending[key]:
+                    del self._pending[key]
+                self._condition.notify_all()
+
+    def pending(self, prefix: str = "") -> int:
+        """Number of queued jobs whose source path starts with prefix"""
+        with self._condition:
+            return sum(count for key, count in self._pending.items() if key.startswith(prefix))
+
+    def wait(self, prefix: str = "", timeout: Optional[float] = None) -> bool:
+        """Wait until no job whose source path starts with prefix is pending
+
+        Args:
+            prefix: Source path prefix, e.g. a handler's base file name
+            timeout: Maximum seconds to wait (None: no limit)
+
+        Returns:
+            True if nothing matching is pending anymore
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not any(key.startswith(prefix) for key in self._pending),
+                timeout
+            )
+
+    def close(self):
+        """Wait for every pending job"""
+        self.wait()
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler whose backups are compressed in the background
+
+    On rollover the live file is renamed to <name>.1 and handed to the
+    compressor, which writes <name>.1.gz (or .zst). Shifting backups waits
+    only for pending compression of this handler's own files, which happens
+    just when rollovers come faster than compression. Without a compressor
+    it behaves exactly like RotatingFileHandler.
+    """
+
+    def __init__(self, filename: Union[str, Path], compressor: Optional[LogCompressor] = None,
+                 **kwargs):
+        """Initialize handler
+
+        Args:
+            filename: Log file path
+            compressor: Compresses rotated files (None: keep them plain)
+            **kwargs: RotatingFileHandler arguments (maxBytes, backupCount, ...)
+        """
+        super().__init__(filename, **kwargs)
+        self.compressor = compressor
+        if compressor is not None:
+            self.namer = self._compressed_name
+            self.rotator = self._rotate_and_compress
+
+    def _compressed_name(self, name: str) -> str:
+        return name + self.compressor.suffix
+
+    def _rotate_and_compress(self, source: str, dest: str):
+        """Move the live file aside and queue its compression into dest"""
+        plain = dest[:-len(self.compressor.suffix)]
+        if os.path.exists(source):
+            os.replace(source, plain)
+            self.compressor.submit(Path(plain), Path(dest))
+
+    def doRollover(self):
+        if self.compressor is not None:
+            # Backups are shifted by name; a pending <name>.1 must be done first
+            self.compressor.wait(self.baseFilename + ".")
+        super().doRollover()
+
+
+_BACKUP_SUFFIX = re.compile(r"^\.(\d+)(\.gz|\.zst)?$")
+
+
+def log_segments(log_file: Path) -> List[Path]:
+    """List the segments of a log, oldest first
+
+    Args:
+        log_file: Live log file, e.g. .aedt/logs/aedt.log
+
+    Returns:
+        Backups from oldest to newest (compressed or plain), then the live
+        file if it exists
+    """
+    log_file = Path(log_file)
+    backups: Dict[int, Tuple[bool, Path]] = {}
+    try:
+        candidates = list(log_file.parent.glob(glob.escape(log_file.name) + ".*"))
+    except OSError:
+        candidates = []
+
+    for path in candidates:
+        match = _BACKUP_SUFFIX.match(path.name[len(log_file.name):])
+        if match is None:
+            continue
+        number = int(match.group(1))
+        compressed = match.group(2) is not None
+        # Mid-compression both files exist with the same content
+        if number not in backups or compressed:
+            backups[number] = (compressed, path)
+
+    segments = [backups[number][1] for number in sorted(backups, reverse=True)]
+    if log_file.exists():
+        segments.append(log_file)
+    return segments
+
+
+def open_segment_binary(path: Path) -> IO[bytes]:
+    """Open a log segment as bytes, decompressing by suffix
+
+    Offsets of the returned stream are offsets into the uncompressed log,
+    so sidecar index offsets apply to compressed segments too (seeking in
+    a compressed segment decompresses up to the target).
+
+    Args:
+        path: Plain, .gz or .zst log file
+
+    Returns:
+        Binary stream of the uncompressed content
+    """
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, 'rb')
+    if path.suffix == ".zst":
+        import zstandard
+        raw = open(path, 'rb')
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return open(path, 'rb')
+
+
+def open_segment(path: Path) -> IO[str]:
+    """Open a log segment as text, decompressing by suffix
+
+    Args:
+        path: Plain, .gz or .zst log file
+
+    Returns:
+        Text stream (UTF-8, undecodable bytes replaced)
+    """
+    return io.TextIOWrapper(open_segment_binary(path), encoding='utf-8', errors='replace')
+
+
+def _segment_lines(segment: Path) -> Iterator[str]:
+    """Yield the lines of one segment without trailing newlines"""
+    try:
+        stream = open_segment(segment)
+    except FileNotFoundError:
+        return  # Rotated or compressed since it was listed
+    with stream:
+        for line in stream:
+            yield line.rstrip("\n")
+
+
+def read_log_lines(log_file: Path) -> Iterator[str]:
+    """Yield the lines of a log across all its segments, oldest first
+
+    Args:
+        log_file: Live log file
+
+    Yields:
+        Lines without the trailing newline
+    """
+    for segment in log_segments(log_file):
+        yield from _segment_lines(segment)
+
+
+def search_logs(
+    log_file: Path,
+    pattern: Union[str, "re.Pattern[str]"],
+    predicate: Optional[Callable[[str], bool]] = None
+) -> Iterator[Tuple[Path, str]]:
+    """Search a log and its rotated backups
+
+    Args:
+        log_file: Live log file
+        pattern: Regular expression searched in each line
+        predicate: Extra filter applied to matching lines
+
+    Yields:
+        (segment, line) for every matching line, oldest first
+    """
+    regex = re.compile(pattern) if isinstance(pattern, str) else pattern
+    for segment in log_segments(log_file):
+        for line in _segment_lines(segment):
+            if regex.search(line) and (predicate is None or predicate(line)):
+                yield segment, line
@@ -0,0 +1,348 @@
+"""Central log sink for multi-process AEDT runs
+
+RotatingFileHandler is not safe when several processes write and rotate
+the same file. In multi-process runs one process (the orchestrator) owns
+the log files and runs a LogSink; worker processes create their AEDTLogger
+with the sink address, and their loggers ship records to the sink in
+batches over a multiprocessing connection (Unix socket, or named pipe on
+Windows) instead of opening the files themselves.
+
+If the sink cannot be reached, workers append to the log files directly
+(no rotation, no index) and retry the sink periodically.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+import logging
+import os
+import sys
+import threading
+import time
+
+# Environment variables passing the sink to worker processes
+SINK_ADDRESS_ENV = "AEDT_LOG_SINK"
+SINK_AUTHKEY_ENV = "AEDT_LOG_SINK_KEY"
+
+# Types sent as-is; other record attributes are sent as repr()
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+
+
+def sink_from_environment(environ: Optional[Dict[str, str]] = None) -> Optional[Tuple[str, bytes]]:
+    """Read the sink address and authkey set by LogSink.environment()
+
+    Args:
+        environ: Environment to read (default: os.environ)
+
+    Returns:
+        (address, authkey), or None when no sink is configured
+    """
+    environ = os.environ if environ is None else environ
+    address = environ.get(SINK_ADDRESS_ENV)
+    if not address:
+        return None
+    return address, bytes.fromhex(environ.get(SINK_AUTHKEY_ENV, ""))
+
+
+def _encode(record: logging.LogRecord, target: str,
+            context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn a prepared record into a picklable dict"""
+    data = {}
+    for key, value in record.__dict__.items():
+        data[key] = value if isinstance(value, _PLAIN_TYPES) else repr(value)
+    data['args'] = None
+    data['exc_info'] = None
+    data['aedt_target'] = target
+    if context is not None:
+        data['aedt_context'] = dict(context)
+    return data
+
+
+class SinkClient:
+    """Worker side: batches records and sends them to a LogSink
+
+    Records are sent when ``batch_size`` are pending or every
+    ``flush_interval`` seconds, whichever comes first. Records that cannot
+    be sent go to the fallback handler of their logger; the connection is
+    retried after ``retry_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: Optional[bytes],
+        fallback: Callable[[str], logging.Handler],
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+        retry_interval: float = 5.0
+    ):
+        """Initialize client
+
+        Args:
+            address: Sink address (LogSink.address)
+            authkey: Sink authentication key
+            fallback: Returns the local handler for a logger name
+            batch_size: Records per send
+            flush_interval: Maximum seconds a record waits in the batch
+            retry_interval: Seconds before reconnecting after a failure
+        """
+        self.address = address
+        self.authkey = authkey
+        self.fallback = fallback
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.batches_sent = 0
+        self.records_sent = 0
+        self.records_fallback = 0
+        self._batch: List[Tuple[logging.LogRecord, str, Optional[Dict[str, Any]]]] = []
+        self._conn = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the client counters"""
+        with self._lock:
+            return {
+                'batches_sent': self.batches_sent,
+                'records_sent': self.records_sent,
+                'records_fallback': self.records_fallback,
+                'pending': len(self._batch),
+            }
+
+    def put(self, record: logging.LogRecord, target: str, context: Optional[Dict[str, Any]]):
+        """Add a prepared record to the batch"""
+        with self._lock:
+            if self._closed.is_set():
+                self._write_fallback([(record, target, context)])
+                return
+            self._batch.append((record, target, context))
+            if len(self._batch) >= self.batch_size:
+                self._send_batch()
+            elif self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, name="aedt-log-sink-client",
+                                                 daemon=True)
+                self._flusher.start()
+
+    def _run(self):
+        """Send partial batches every flush_interval"""
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Send the pending records now"""
+        with self._lock:
+            self._send_batch()
+
+    def _connect(self) -> bool:
+        """Connect unless connected or waiting to retry"""
+        if self._conn is not None:
+            return True
+        if time.monotonic() < self._retry_at:
+            return False
+        try:
+            self._conn = Client(self.address, authkey=self.authkey)
+            return True
+        except (OSError, EOFError, ValueError, AuthenticationError) as e:
+            self._retry_at = time.monotonic() + self.retry_interval
+            print(f"Warning: 无法连接日志汇聚进程 {self.address}: {e}，暂时直接写入日志文件",
+                  file=sys.stderr)
+            return False
+
+    def _send_batch(self):
+        """Send the batch, or write it to the fallback handlers (lock held)"""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        if self._connect():
+            try:
+                self._conn.send([_encode(*item) for item in batch])
+                self.batches_sent += 1
+                self.records_sent += len(batch)
+                return
+            except (OSError, EOFError, ValueError) as e:
+                print(f"Warning: 发送日志到汇聚进程失败: {e}，暂时直接写入日志文件",
+                      file=sys.stderr)
+                self._disconnect()
+                self._retry_at = time.monotonic() + self.retry_interval
+        self._write_fallback(batch)
+
+    def _write_fallback(self, batch):
+        for record, target, _ in batch:
+            self.fallback(target).handle(record)
+        self.records_fallback += len(batch)
+
+    def _disconnect(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+    def close(self):
+        """Send what is pending and close the connection"""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._send_batch()
+            self._disconnect()
+
+
+class SinkHandler(logging.Handler):
+    """Worker-side handler that ships a logger's records to the sink"""
+
+    def __init__(self, client: SinkClient, target: str,
+                 context: Optional[Dict[str, Any]] = None):
+        """Initialize handler
+
+        Args:
+            client: Shared client of this process
+            target: Name of the logger whose files receive the records
+            context: Epic context (project, epic_id, agent_id) for epic loggers
+        """
+        super().__init__()
+        self.client = client
+        self.target = target
+        self.context = context
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge args and exception text into the record (like QueueHandler)"""
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.client.put(self.prepare(record), self.target, self.context)
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.client.flush()
+
+
+class LogSink:
+    """Writer side: receives worker records and writes them through an AEDTLogger
+
+    Each connection is read by its own thread; records of an epic logger
+    go to that epic's logger (created on first use), all others to the
+    global logger, so one process does all file writes and rotations.
+    """
+
+    def __init__(self, aedt_logger, address: Optional[str] = None,
+                 authkey: Optional[bytes] = None):
+        """Initialize sink
+
+        Args:
+            aedt_logger: AEDTLogger owning the log files
+            address: Listener address (default: a fresh Unix socket or pipe)
+            authkey: Key workers must present (default: random)
+        """
+        self.aedt_logger = aedt_logger
+        self.authkey = authkey if authkey is not None else os.urandom(32)
+        self.records_received = 0
+        self._requested_address = address
+        self._listener: Optional[Listener] = None
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+        self._connections = []
+        self._lock = threading.Lock()
+
+    @property
+    def address(self) -> str:
+        """Address workers connect to"""
+        if self._listener is None:
+            raise RuntimeError("日志汇聚进程尚未启动")
+        return self._listener.address
+
+    def environment(self) -> Dict[str, str]:
+        """Environment variables for worker processes (see sink_from_environment)"""
+        return {SINK_ADDRESS_ENV: self.address, SINK_AUTHKEY_ENV: self.authkey.hex()}
+
+    def start(self):
+        """Listen for workers"""
+        self._listener = Listener(self._requested_address, authkey=self.authkey)
+        thread = threading.Thread(target=self._accept, name="aedt-log-sink", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                return  # Listener closed
+            except Exception as e:
+                # e.g. AuthenticationError from a client with the wrong key
+                print(f"Warning: 拒绝日志连接: {e}", file=sys.stderr)
+                continue
+            if self._stopping:
+                conn.close()
+                return
+            with self._lock:
+                self._connections.append(conn)
+            thread = threading.Thread(target=self._receive, args=(conn,),
+                                      name="aedt-log-sink-conn", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _receive(self, conn):
+        try:
+            while True:
+                try:
+                    batch = conn.recv()
+                except (EOFError, OSError):
+                    return
+                for data in batch:
+                    self._dispatch(data)
+        finally:
+            conn.close()
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+
+    def _dispatch(self, data: Dict[str, Any]):
+        """Write one received record through the owning logger"""
+        data.pop('aedt_target', None)
+        # The worker's context stays on the record (formatters and the index
+        # read it) so concurrent workers do not rebind each other's agent_id
+        context = data.get('aedt_context')
+        record = logging.makeLogRecord(data)
+        if context is not None:
+            logger = self.aedt_logger.get_epic_logger(context['project'], context['epic_id'])
+        else:
+            logger = self.aedt_logger.global_logger
+        logger.handle(record)
+        self.records_received += 1
+
+    def stop(self, timeout: float = 5.0):
+        """Stop listening and wait for connected workers to disconnect
+
+        Args:
+            timeout: Maximum seconds to wait for each connection thread
+        """
+        if self._listener is not None:
+            # Closing the listener does not interrupt accept(); wake it up
+            self._stopping = True
+            try:
+                Client(self._listener.address, authkey=self.authkey).close()
+            except (OSError, EOFError):
+                pass
+            self._listener.close()
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join(timeout)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._threads.clear()
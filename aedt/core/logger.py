@@ -4,10 +4,500 @@ This module provides structured logging with rotation, level filtering, and
 separation between global and epic-specific logs.
 """
 
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from itertools import islice
+from json.encoder import encode_basestring
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, Iterator, List, Tuple, Union
+
+from aedt.core.log_filters import DECISION_ATTR, SUMMARY_ATTR, RateLimit, RateLimitFilter
+from aedt.core.log_follow import DEFAULT_POLL_INTERVAL, follow_logs
+from aedt.core.log_index import (
+    DEFAULT_BLOCK_RECORDS,
+    IndexedRotatingFileHandler,
+    LogEntry,
+    LogQuery,
+    find_log_files
+)
+from aedt.core.log_metrics import (
+    LogCounters,
+    MetricFamily,
+    MetricsServer,
+    render_prometheus,
+    write_prometheus
+)
+from aedt.core.log_rotation import LogCompressor, resolve_compression
+from aedt.core.log_sink import SinkClient, SinkHandler
+
+# What a full log queue does with a new record (queued mode)
+OVERFLOW_POLICIES = ("block", "drop-debug", "drop-oldest")
+
+LOG_FORMATS = ("text", "json")
+
+TEXT_FORMAT = '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s'
+TEXT_DATEFMT = '%Y-%m-%d %H:%M:%S'
+
+# LogRecord attributes that are not user-supplied extras
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None))
+) | {"message", "asctime", "aedt_target", "aedt_context", "taskName",
+   DECISION_ATTR, SUMMARY_ATTR}
+
+
+# Renders the tracebacks of queued records, like the formatters do in direct mode
+_exception_formatter = logging.Formatter()
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line
+
+    Fields, in order: ts, level, logger, the bound context (e.g. project,
+    epic_id, agent_id), message, and extra (attributes passed through
+    ``extra=``) or exc_info when present. The context is serialized once
+    when bound, not on every record; records received from other processes
+    (see log_sink) bring their own context.
+    """
+
+    def __init__(self, **context: Any):
+        """Initialize formatter
+
+        Args:
+            **context: Fields added to every record, e.g. project, epic_id
+        """
+        super().__init__()
+        self.context: Dict[str, Any] = {}
+        self._context_json = ""
+        self._second = None
+        self._second_text = ""
+        self.bind(**context)
+
+    def bind(self, **context: Any):
+        """Add or replace context fields
+
+        Args:
+            **context: Fields added to every record
+        """
+        self.context.update(context)
+        self._context_json = self._encode_context(self.context)
+
+    @staticmethod
+    def _encode_context(context: Dict[str, Any]) -> str:
+        return "".join(
+            f",{json.dumps(key)}:{json.dumps(value, ensure_ascii=False, default=str)}"
+            for key, value in context.items()
+        )
+
+    def _timestamp(self, created: float) -> str:
+        """ISO 8601 local time with milliseconds; the seconds part is cached"""
+        second = int(created)
+        if second != self._second:
+            self._second = second
+            self._second_text = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        return f"{self._second_text}.{int((created - second) * 1000):03d}"
+
+    def format(self, record: logging.LogRecord) -> str:
+        # Records received by a LogSink carry their worker's context
+        remote_context = getattr(record, 'aedt_context', None)
+        parts = [
+            '{"ts":"', self._timestamp(record.created),
+            '","level":"', record.levelname,
+            '","logger":', encode_basestring(record.name),
+            self._context_json if remote_context is None else self._encode_context(remote_context),
+            ',"message":', encode_basestring(record.getMessage()),
+        ]
+
+        extra_keys = record.__dict__.keys() - _RECORD_ATTRS
+        if extra_keys:
+            extra = {key: record.__dict__[key] for key in sorted(extra_keys)}
+            parts.append(',"extra":')
+            parts.append(json.dumps(extra, ensure_ascii=False, separators=(",", ":"),
+                                    default=str))
+
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            parts.append(',"exc_info":')
+            parts.append(encode_basestring(record.exc_text))
+
+        parts.append("}")
+        return "".join(parts)
+
+
+class _QueueRouter(logging.Handler):
+    """Listener-side handler that routes records to their logger's handlers
+
+    Module loggers propagate into the global logger's queue handler, so the
+    destination is the logger that enqueued the record (record.aedt_target),
+    not record.name.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.targets: Dict[str, List[logging.Handler]] = {}
+        # Seconds between logging and writing; only the listener thread updates them
+        self.lag_sum = 0.0
+        self.lag_count = 0
+        self.last_lag = 0.0
+
+    def handle(self, record: logging.LogRecord):
+        lag = time.time() - record.created
+        self.last_lag = lag
+        self.lag_sum += lag
+        self.lag_count += 1
+        for handler in self.targets.get(record.aedt_target, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def emit(self, record: logging.LogRecord):
+        self.handle(record)
+
+
+class _DrainingListener(QueueListener):
+    """QueueListener whose stop sentinel waits for room in a full queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LogQueue:
+    """Bounded record queue shared by all loggers of an AEDTLogger
+
+    A single listener thread performs the file I/O (writes and rotation
+    renames). When the queue is full, the overflow policy decides:
+    - block: the logging thread waits for room
+    - drop-debug: DEBUG records are dropped, others wait for room
+    - drop-oldest: the oldest queued record is dropped to make room
+    Dropped records are counted per level name.
+    """
+
+    def __init__(self, maxsize: int = 10000, overflow: str = "block"):
+        """Initialize queue
+
+        Args:
+            maxsize: Maximum number of queued records
+            overflow: Overflow policy (block/drop-debug/drop-oldest)
+
+        Raises:
+            ValueError: If overflow is not a known policy
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"未知的日志溢出策略: {overflow}，可选: {', '.join(OVERFLOW_POLICIES)}"
+            )
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.overflow = overflow
+        self.router = _QueueRouter()
+        self.listener = _DrainingListener(self.queue, self.router)
+        self.dropped: Dict[str, int] = {}
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the listener thread"""
+        self.listener.start()
+
+    def put(self, record: logging.LogRecord):
+        """Enqueue a record, applying the overflow policy if the queue is full"""
+        if self.closed:
+            self._count_drop(record)
+            return
+
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == "drop-debug":
+            if record.levelno <= logging.DEBUG:
+                self._count_drop(record)
+            else:
+                self.queue.put(record)
+            return
+
+        # drop-oldest
+        while True:
+            try:
+                oldest = self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                self.queue.task_done()
+                self._count_drop(oldest)
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                continue
+
+    def _count_drop(self, record: logging.LogRecord):
+        with self._lock:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+    def drain(self):
+        """Block until every queued record has been handled"""
+        if not self.closed:
+            self.queue.join()
+
+    def close(self):
+        """Stop accepting records, then handle everything still queued"""
+        if self.closed:
+            return
+        self.closed = True
+        self.listener.stop()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Logger-side handler that enqueues records onto a LogQueue"""
+
+    def __init__(self, log_queue: LogQueue, target: str):
+        """Initialize handler
+
+        Args:
+            log_queue: Shared queue
+            target: Name of the logger whose file handlers receive the records
+        """
+        super().__init__(log_queue.queue)
+        self.log_queue = log_queue
+        self.target = target
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Copy the record with its message merged and its traceback rendered
+
+        Unlike QueueHandler.prepare, the traceback stays in exc_text instead
+        of being folded into the message, so the target formatters see the
+        same fields as in direct mode.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        record.aedt_target = self.target
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        self.log_queue.put(record)
+
+    def flush(self):
+        """Wait until the listener has written all queued records"""
+        self.log_queue.drain()
+
+
+class HandlerPool:
+    """Keeps at most max_open epic log files open
+
+    Pooled handlers open their file lazily when a record arrives. The pool
+    tracks open handlers in least-recently-used order; when a handler that
+    is not open is used and the limit is reached, the least recently used
+    files are closed. A closed handler reopens its file in append mode on
+    its next record.
+    """
+
+    def __init__(self, max_open: int = 128):
+        """Initialize pool
+
+        Args:
+            max_open: Maximum number of simultaneously open files
+
+        Raises:
+            ValueError: If max_open is less than 1
+        """
+        if max_open < 1:
+            raise ValueError(f"max_open 必须大于 0，当前值: {max_open}")
+        self.max_open = max_open
+        self.hits = 0  # Records written to an already open file
+        self.misses = 0  # Records that had to (re)open their file
+        self.evictions = 0  # Files closed to stay within max_open
+        self._open: 'OrderedDict[PooledFileHandler, None]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def open_count(self) -> int:
+        """Number of files currently counted as open"""
+        return len(self._open)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the pool metrics"""
+        with self._lock:
+            return {
+                'max_open': self.max_open,
+                'open': len(self._open),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def acquire(self, handler: 'PooledFileHandler'):
+        """Mark a handler as most recently used, closing files over the limit
+
+        Called before the handler takes its own lock, so victims are closed
+        without holding two handler locks at once.
+        """
+        victims = []
+        with self._lock:
+            if handler in self._open:
+                self._open.move_to_end(handler)
+                self.hits += 1
+                return
+            self.misses += 1
+            self._open[handler] = None
+            while len(self._open) > self.max_open:
+                victim, _ = self._open.popitem(last=False)
+                victims.append(victim)
+            self.evictions += len(victims)
+
+        for victim in victims:
+            victim.close_stream()
+
+    def discard(self, handler: 'PooledFileHandler'):
+        """Forget a handler (on close)"""
+        with self._lock:
+            self._open.pop(handler, None)
+
+
+class PooledFileHandler(IndexedRotatingFileHandler):
+    """Rotating file handler whose file is opened on demand through a HandlerPool"""
+
+    def __init__(self, filename: Path, pool: HandlerPool, **kwargs: Any):
+        """Initialize handler
+
+        Args:
+            filename: Log file path
+            pool: Pool limiting the open files
+            **kwargs: IndexedRotatingFileHandler arguments (compressor,
+                index_records, maxBytes, backupCount, ...)
+        """
+        super().__init__(filename, delay=True, **kwargs)
+        self.pool = pool
+
+    def handle(self, record: logging.LogRecord):
+        if self.filter(record):
+            self.pool.acquire(self)
+        return super().handle(record)
+
+    def close_stream(self):
+        """Close the file; the next record reopens it in append mode"""
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.flush()
+                self.stream.close()
+                self.stream = None
+        finally:
+            self.release()
+
+    def close(self):
+        self.pool.discard(self)
+        super().close()
+
+
+@dataclass(frozen=True)
+class RecentRecord:
+    """A formatted log record kept in a RingBufferHandler"""
+    seq: int  # Position in the buffer's stream, increasing from 1
+    created: float
+    levelno: int
+    levelname: str
+    text: str
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last ``capacity`` records of a logger, already formatted
+
+    Every record gets a sequence number, so readers can ask for what was
+    added after the last record they saw (since()) instead of re-reading
+    the whole buffer.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """Initialize handler
+
+        Args:
+            capacity: Number of records retained
+        """
+        super().__init__()
+        self.capacity = capacity
+        self.last_seq = 0
+        self._records: deque = deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord):
+        # Called with the handler lock held
+        try:
+            text = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self.last_seq += 1
+        self._records.append(RecentRecord(
+            self.last_seq, record.created, record.levelno, record.levelname, text
+        ))
+
+    def recent(self, n: int = 50, min_level: int = logging.NOTSET) -> List[RecentRecord]:
+        """Return up to the last n records at or above min_level, oldest first"""
+        result = []
+        if n <= 0:
+            return result
+        self.acquire()
+        try:
+            for entry in reversed(self._records):
+                if entry.levelno >= min_level:
+                    result.append(entry)
+                    if len(result) == n:
+                        break
+        finally:
+            self.release()
+        result.reverse()
+        return result
+
+    def since(self, cursor: int = 0, min_level: int = logging.NOTSET) -> Tuple[List[RecentRecord], int]:
+        """Return the records added after cursor and the new cursor
+
+        Args:
+            cursor: Cursor returned by a previous call (0: everything retained)
+            min_level: Minimum level of the returned records
+
+        Returns:
+            (records oldest first, cursor for the next call). Records that
+            were already evicted from the buffer are skipped; a gap in seq
+            shows that.
+        """
+        self.acquire()
+        try:
+            last_seq = self.last_seq
+            if cursor >= last_seq:
+                return [], last_seq
+            first_seq = last_seq - len(self._records) + 1
+            new_records = list(islice(self._records, max(0, cursor + 1 - first_seq), None))
+        finally:
+            self.release()
+        if min_level > logging.NOTSET:
+            new_records = [entry for entry in new_records if entry.levelno >= min_level]
+        return new_records, last_seq
+
+    def clear(self):
+        """Drop all retained records (sequence numbers keep increasing)"""
+        self.acquire()
+        try:
+            self._records.clear()
+        finally:
+            self.release()
 
 
 class AEDTLogger:
@@ -18,15 +508,74 @@ class AEDTLogger:
     - Epic-specific loggers for individual epic tracking
     - Log rotation (10MB max, 5 backups)
     - Level-based filtering (DEBUG/INFO/WARNING/ERROR)
+    - Optional queued mode: loggers only enqueue records and one listener
+      thread does the file I/O
+    - Text or JSON-lines output
+    - At most max_open_files epic log files open at once (HandlerPool)
+    - Rotated backups compressed on a background thread (see log_rotation)
+    - In-memory ring buffer of recent formatted records per logger, read
+      through recent() and since()
+    - Sidecar index per log segment for fast queries (see log_index)
+    - Optional central sink: worker processes ship records to the one
+      process that owns the files (see log_sink)
+    - Optional rate limiting of repeated messages and DEBUG sampling
+      (see log_filters)
+    - Following the log files across rotations (see log_follow)
+    - Metrics (records per level, bytes, rotations, queue lag) exported in
+      the Prometheus text format (see log_metrics)
     """
 
-    def __init__(self, log_dir: Path, log_level: str = "INFO"):
+    def __init__(
+        self,
+        log_dir: Path,
+        log_level: str = "INFO",
+        queued: bool = False,
+        queue_size: int = 10000,
+        overflow: str = "block",
+        log_format: str = "text",
+        max_open_files: int = 128,
+        compression: Optional[str] = "auto",
+        ring_size: int = 1000,
+        index_records: int = DEFAULT_BLOCK_RECORDS,
+        sink_address: Optional[str] = None,
+        sink_authkey: Optional[bytes] = None,
+        rate_limit: Optional[RateLimit] = None
+    ):
         """Initialize AEDT logger
 
         Args:
             log_dir: Directory for log files (.aedt/logs/)
             log_level: Default log level (DEBUG/INFO/WARNING/ERROR)
+            queued: Put all file handlers behind a bounded queue and listener
+            queue_size: Maximum queued records (queued mode)
+            overflow: Full-queue policy: block, drop-debug or drop-oldest
+            log_format: "text" for the [time] [level] [logger] template or
+                "json" for JSON lines (see JSONLinesFormatter)
+            max_open_files: Epic log files kept open; idle ones are closed
+                and reopened on their next record
+            compression: Compression of rotated backups: auto (zstd if
+                installed, else gzip), gzip, zstd, or none/None
+            ring_size: Records kept in memory per logger for recent() and
+                since() (0 disables the ring buffers)
+            index_records: Records per sidecar index block (0 disables
+                indexing)
+            sink_address: Address of a LogSink to send records to instead
+                of writing the files (worker processes)
+            sink_authkey: Authentication key of the sink
+            rate_limit: Limit identical (logger, message template) records
+                per window and sample DEBUG records (None: no limit)
+
+        Raises:
+            ValueError: If overflow, log_format or compression is not known,
+                or max_open_files is less than 1
         """
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"未知的日志格式: {log_format}，可选: {', '.join(LOG_FORMATS)}")
+        self.log_format = log_format
+
+        codec = resolve_compression(compression)
+        self._compressor = LogCompressor(codec) if codec else None
+
         self.log_dir = log_dir
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
@@ -39,6 +588,42 @@ class AEDTLogger:
 
         # Cache for loggers to avoid duplicates
         self._loggers: Dict[str, logging.Logger] = {}
+        # Serializes creating epic loggers from several threads
+        self._setup_lock = threading.Lock()
+        # Handlers this instance attached, per logger name
+        self._handlers: Dict[str, List[logging.Handler]] = {}
+        # File handlers, per logger name (behind the queue in queued mode)
+        self._file_handlers: Dict[str, logging.Handler] = {}
+        # Recent records, per logger name and per (project, epic_id)
+        self.ring_size = ring_size
+        self._ring_buffers: Dict[str, RingBufferHandler] = {}
+        self._epic_buffers: Dict[Tuple[str, str], RingBufferHandler] = {}
+
+        self.index_records = index_records
+
+        # Write counters per logger name and running metrics servers
+        self._log_counters: Dict[str, LogCounters] = {}
+        self._metrics_servers: List[MetricsServer] = []
+
+        # Rate limiting filter, per logger name
+        self.rate_limit = rate_limit
+        self._rate_filters: Dict[str, RateLimitFilter] = {}
+
+        # Central sink (worker processes) and its local fallback files
+        self._sink_client: Optional[SinkClient] = None
+        if sink_address is not None:
+            self._sink_client = SinkClient(sink_address, sink_authkey, self._fallback_handler)
+        self._log_files: Dict[str, Path] = {}
+        self._fallback_handlers: Dict[str, logging.Handler] = {}
+        self._fallback_lock = threading.Lock()
+
+        # Open file limit for epic logs
+        self.handler_pool = HandlerPool(max_open_files)
+
+        self._queue: Optional[LogQueue] = None
+        if queued:
+            self._queue = LogQueue(queue_size, overflow)
+            self._queue.start()
 
         # Setup global logger
         self.global_logger = self._setup_logger(
@@ -46,12 +631,127 @@ class AEDTLogger:
             self.log_dir / "aedt.log"
         )
 
+    @property
+    def dropped_records(self) -> Dict[str, int]:
+        """Records dropped by the overflow policy, per level name"""
+        if self._queue is None:
+            return {}
+        return dict(self._queue.dropped)
+
+    @property
+    def handler_pool_stats(self) -> Dict[str, int]:
+        """Open epic log files and pool hit/miss/eviction counts"""
+        return self.handler_pool.stats()
+
+    @property
+    def sink_stats(self) -> Dict[str, int]:
+        """Records sent to the sink and written locally instead (worker mode)"""
+        if self._sink_client is None:
+            return {}
+        return self._sink_client.stats()
+
+    @property
+    def rate_limit_stats(self) -> Dict[str, int]:
+        """Records suppressed or sampled out, summed over all loggers"""
+        totals: Dict[str, int] = {}
+        for rate_filter in list(self._rate_filters.values()):
+            for key, value in rate_filter.stats().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Snapshot the logging metrics
+
+        Returns:
+            Metric families, ready for render_prometheus()
+        """
+        records = MetricFamily("aedt_log_records_total", "counter",
+                               "Records written, per log and level")
+        written = MetricFamily("aedt_log_bytes_written_total", "counter",
+                               "Bytes written, per log")
+        rotations = MetricFamily("aedt_log_rotations_total", "counter",
+                                 "Log file rollovers, per log")
+        for counters in list(self._log_counters.values()):
+            for level, count in sorted(dict(counters.records).items()):
+                records.add(count, level=level, **counters.labels)
+            written.add(counters.bytes_written, **counters.labels)
+            rotations.add(counters.rotations, **counters.labels)
+        families = [records, written, rotations]
+
+        if self._queue is not None:
+            router = self._queue.router
+            depth = MetricFamily("aedt_log_queue_depth", "gauge", "Records waiting in the queue")
+            depth.add(self._queue.queue.qsize())
+            lag = MetricFamily("aedt_log_queue_lag_seconds", "summary",
+                               "Seconds between logging a record and writing it")
+            lag.add(router.lag_sum, "_sum")
+            lag.add(router.lag_count, "_count")
+            last_lag = MetricFamily("aedt_log_queue_last_lag_seconds", "gauge",
+                                    "Lag of the most recently written record")
+            last_lag.add(router.last_lag)
+            dropped = MetricFamily("aedt_log_queue_dropped_total", "counter",
+                                   "Records dropped by the overflow policy, per level")
+            for level, count in sorted(self.dropped_records.items()):
+                dropped.add(count, level=level)
+            families.extend([depth, lag, last_lag, dropped])
+
+        if self._rate_filters:
+            stats = self.rate_limit_stats
+            limited = MetricFamily("aedt_log_rate_limited_total", "counter",
+                                   "Records not written because of rate limiting")
+            limited.add(stats.get('suppressed', 0), reason="suppressed")
+            limited.add(stats.get('sampled_out', 0), reason="sampled_out")
+            families.append(limited)
+
+        if self._sink_client is not None:
+            stats = self.sink_stats
+            sink = MetricFamily("aedt_log_sink_records_total", "counter",
+                                "Records sent to the log sink or written locally instead")
+            sink.add(stats['records_sent'], result="sent")
+            sink.add(stats['records_fallback'], result="fallback")
+            families.append(sink)
+
+        pool = self.handler_pool_stats
+        open_files = MetricFamily("aedt_log_open_files", "gauge", "Epic log files open")
+        open_files.add(pool['open'])
+        families.append(open_files)
+        return families
+
+    def metrics_text(self) -> str:
+        """Logging metrics in the Prometheus text format"""
+        return render_prometheus(self.collect_metrics())
+
+    def write_metrics(self, path: Union[str, Path]):
+        """Write the logging metrics to a file atomically
+
+        Args:
+            path: Target file, e.g. for the node_exporter textfile collector
+        """
+        write_prometheus(path, self.metrics_text())
+
+    def serve_metrics(self, host: str = "127.0.0.1", port: int = 0) -> MetricsServer:
+        """Serve the logging metrics on http://host:port/metrics until close()
+
+        Args:
+            host: Interface to bind (default: loopback only)
+            port: Port to bind (0: any free port, see MetricsServer.address)
+
+        Returns:
+            Started server
+        """
+        server = MetricsServer(self.metrics_text, host, port)
+        server.start()
+        self._metrics_servers.append(server)
+        return server
+
     def _setup_logger(
         self,
         name: str,
         log_file: Path,
         max_bytes: int = 10 * 1024 * 1024,  # 10MB
-        backup_count: int = 5
+        backup_count: int = 5,
+        context: Optional[Dict[str, Any]] = None,
+        pooled: bool = False
     ) -> logging.Logger:
         """Setup a logger with file handler and rotation
 
@@ -60,6 +760,8 @@ class AEDTLogger:
             log_file: Log file path
             max_bytes: Maximum bytes per log file (default: 10MB)
             backup_count: Number of backup files to keep (default: 5)
+            context: Fields bound into every JSON record of this logger
+            pooled: Open the file through the handler pool (epic loggers)
 
         Returns:
             Configured logger instance
@@ -72,8 +774,9 @@ class AEDTLogger:
         logger = logging.getLogger(name)
         logger.setLevel(self.log_level)
 
-        # Avoid adding duplicate handlers
-        if logger.handlers:
+        # Avoid adding duplicate handlers; only AEDT handlers count, test
+        # runners and applications may attach their own
+        if any(getattr(handler, 'aedt_owned', False) for handler in logger.handlers):
             self._loggers[name] = logger
             return logger
 
@@ -83,30 +786,97 @@ class AEDTLogger:
         # Ensure parent directory exists
         log_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Create rotating file handler
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=max_bytes,
-            backupCount=backup_count,
-            encoding='utf-8'
-        )
-        file_handler.setLevel(self.log_level)
-
         # Setup formatter
-        formatter = logging.Formatter(
-            '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        if self.log_format == "json":
+            formatter = JSONLinesFormatter(**(context or {}))
+        else:
+            formatter = logging.Formatter(TEXT_FORMAT, datefmt=TEXT_DATEFMT)
+        self._log_files[name] = log_file
+
+        # Create rotating file handler, or ship records to the sink
+        if self._sink_client is not None:
+            file_handler = SinkHandler(self._sink_client, name,
+                                       dict(context) if context else None)
+        elif pooled:
+            file_handler = PooledFileHandler(
+                log_file,
+                self.handler_pool,
+                compressor=self._compressor,
+                index_records=self.index_records,
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                encoding='utf-8'
+            )
+        else:
+            file_handler = IndexedRotatingFileHandler(
+                log_file,
+                compressor=self._compressor,
+                index_records=self.index_records,
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                encoding='utf-8'
+            )
+        file_handler.setLevel(self.log_level)
         file_handler.setFormatter(formatter)
+        self._file_handlers[name] = file_handler
+        if isinstance(file_handler, IndexedRotatingFileHandler):
+            counters = LogCounters({
+                'log': name,
+                'project': str((context or {}).get('project', "")),
+                'epic': str((context or {}).get('epic_id', "")),
+            })
+            file_handler.metrics = counters
+            file_handler.context = dict(context or {})
+            self._log_counters[name] = counters
+
+        outputs: List[logging.Handler] = [file_handler]
+        if self.ring_size > 0:
+            ring_buffer = RingBufferHandler(self.ring_size)
+            ring_buffer.setLevel(self.log_level)
+            ring_buffer.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt=TEXT_DATEFMT))
+            self._ring_buffers[name] = ring_buffer
+            outputs.append(ring_buffer)
 
-        # Add handler to logger
-        logger.addHandler(file_handler)
+        # Add handlers to logger, directly or behind the queue
+        if self._queue is not None:
+            self._queue.router.targets[name] = outputs
+            handler = BoundedQueueHandler(self._queue, name)
+            handler.setLevel(self.log_level)
+            handlers = [handler]
+        else:
+            handlers = outputs
+        # One filter per logger, before the queue/sink so dropped records cost little
+        rate_filter = None
+        if self.rate_limit is not None:
+            rate_filter = RateLimitFilter(logger, self.rate_limit)
+            self._rate_filters[name] = rate_filter
+        for handler in handlers:
+            handler.aedt_owned = True
+            if rate_filter is not None:
+                handler.addFilter(rate_filter)
+            logger.addHandler(handler)
+        self._handlers[name] = handlers
 
         # Cache logger
         self._loggers[name] = logger
 
         return logger
 
+    def _fallback_handler(self, name: str) -> logging.Handler:
+        """Local handler for records the sink could not take (worker mode)
+
+        Appends to the logger's file without rotating or indexing it, since
+        other processes may be writing it too.
+        """
+        with self._fallback_lock:
+            handler = self._fallback_handlers.get(name)
+            if handler is None:
+                handler = logging.FileHandler(self._log_files[name], encoding='utf-8')
+                handler.setLevel(self.log_level)
+                handler.setFormatter(self._file_handlers[name].formatter)
+                self._fallback_handlers[name] = handler
+            return handler
+
     def get_logger(self, name: str) -> logging.Logger:
         """Get module logger
 
@@ -134,15 +904,26 @@ class AEDTLogger:
 
         return logger
 
-    def get_epic_logger(self, project_name: str, epic_id: str) -> logging.Logger:
+    def get_epic_logger(
+        self,
+        project_name: str,
+        epic_id: str,
+        agent_id: Optional[str] = None
+    ) -> logging.Logger:
         """Get epic-specific logger
 
         Creates a logger that writes to a separate file for the epic.
         Epic logs are stored in: .aedt/projects/{project}/epics/epic-{id}.log
+        The file is opened through the handler pool, so only the most
+        recently used max_open_files epic logs hold a file descriptor.
+        In JSON format, project, epic_id and agent_id are bound to the
+        logger's formatter here once instead of being formatted per record.
 
         Args:
             project_name: Project name
             epic_id: Epic identifier
+            agent_id: Agent working on the epic; rebinds the context of an
+                existing epic logger when given
 
         Returns:
             Logger instance for the epic
@@ -151,15 +932,154 @@ class AEDTLogger:
 
         # Check if already exists
         if logger_name in self._loggers:
+            if agent_id is not None:
+                handler = self._file_handlers.get(logger_name)
+                if isinstance(getattr(handler, 'context', None), dict):
+                    # SinkHandler, or the file handler indexing the agent
+                    handler.context['agent_id'] = agent_id
+                formatter = getattr(handler, 'formatter', None)
+                if isinstance(formatter, JSONLinesFormatter):
+                    formatter.bind(agent_id=agent_id)
             return self._loggers[logger_name]
 
-        # Determine epic log directory
-        epic_log_dir = self.log_dir.parent / "projects" / project_name / "epics"
-        epic_log_dir.mkdir(parents=True, exist_ok=True)
+        with self._setup_lock:
+            # Another thread may have created it meanwhile
+            if logger_name in self._loggers:
+                return self._loggers[logger_name]
+
+            # Determine epic log directory
+            epic_log_dir = self.log_dir.parent / "projects" / project_name / "epics"
+            epic_log_dir.mkdir(parents=True, exist_ok=True)
 
-        # Setup epic-specific logger
-        log_file = epic_log_dir / f"epic-{epic_id}.log"
-        return self._setup_logger(logger_name, log_file)
+            # Setup epic-specific logger
+            log_file = epic_log_dir / f"epic-{epic_id}.log"
+            context = {'project': project_name, 'epic_id': epic_id}
+            if agent_id is not None:
+                context['agent_id'] = agent_id
+            logger = self._setup_logger(logger_name, log_file, context=context, pooled=True)
+            if logger_name in self._ring_buffers:
+                self._epic_buffers[(project_name, str(epic_id))] = self._ring_buffers[logger_name]
+            return logger
+
+    def _ring_buffer(
+        self,
+        epic_id: Optional[str],
+        project_name: Optional[str]
+    ) -> Optional[RingBufferHandler]:
+        """Find the ring buffer of the global logger (epic_id None) or an epic"""
+        if epic_id is None:
+            return self._ring_buffers.get("aedt")
+        epic_id = str(epic_id)
+        if project_name is not None:
+            return self._epic_buffers.get((project_name, epic_id))
+        found = [buffer for (_, key), buffer in self._epic_buffers.items() if key == epic_id]
+        if len(found) > 1:
+            raise ValueError(f"多个项目存在 Epic {epic_id}，请指定 project_name")
+        return found[0] if found else None
+
+    @staticmethod
+    def _level_number(level: Union[int, str]) -> int:
+        if isinstance(level, int):
+            return level
+        number = logging.getLevelName(level.upper())
+        if not isinstance(number, int):
+            raise ValueError(f"无效的日志级别: {level}")
+        return number
+
+    def recent(
+        self,
+        epic_id: Optional[str] = None,
+        n: int = 50,
+        min_level: Union[int, str] = logging.NOTSET,
+        project_name: Optional[str] = None
+    ) -> List[RecentRecord]:
+        """Get the most recent formatted records of a logger from memory
+
+        Args:
+            epic_id: Epic whose records to return (None: global log, which
+                includes module loggers)
+            n: Maximum number of records
+            min_level: Minimum level, e.g. "WARNING" or logging.WARNING
+            project_name: Project of the epic; needed only when several
+                projects have an epic with this id
+
+        Returns:
+            Up to n records, oldest first (empty if the logger is unknown)
+
+        Raises:
+            ValueError: If min_level is invalid or epic_id is ambiguous
+        """
+        ring_buffer = self._ring_buffer(epic_id, project_name)
+        if ring_buffer is None:
+            return []
+        return ring_buffer.recent(n, self._level_number(min_level))
+
+    def since(
+        self,
+        cursor: int = 0,
+        epic_id: Optional[str] = None,
+        min_level: Union[int, str] = logging.NOTSET,
+        project_name: Optional[str] = None
+    ) -> Tuple[List[RecentRecord], int]:
+        """Get the records added since a cursor, for incremental rendering
+
+        Args:
+            cursor: Cursor from the previous call (0 on the first call)
+            epic_id: Epic whose records to return (None: global log)
+            min_level: Minimum level, e.g. "WARNING" or logging.WARNING
+            project_name: Project of the epic (see recent())
+
+        Returns:
+            (new records oldest first, cursor for the next call)
+
+        Raises:
+            ValueError: If min_level is invalid or epic_id is ambiguous
+        """
+        ring_buffer = self._ring_buffer(epic_id, project_name)
+        if ring_buffer is None:
+            return [], cursor
+        return ring_buffer.since(cursor, self._level_number(min_level))
+
+    def follow(
+        self,
+        project_name: Optional[str] = None,
+        epic_id: Optional[str] = None,
+        min_level: Union[int, str] = logging.NOTSET,
+        backlog: int = 0,
+        stop: Optional[threading.Event] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ) -> Iterator[LogEntry]:
+        """Stream records as they are written to the log files, across rotations
+
+        Reads the files, so records written by other processes (or through
+        a LogSink) are seen too. Several logs are merged by timestamp, and
+        epic logs created while following are picked up.
+
+        Args:
+            project_name: Only this project's epic logs
+            epic_id: Only this epic's logs (both None: global log and all epics)
+            min_level: Minimum level, e.g. "WARNING" or logging.WARNING
+            backlog: First yield the last this many records already written
+            stop: Event ending the stream (otherwise close the generator)
+            poll_interval: Maximum seconds between checks of every file
+
+        Returns:
+            Generator of LogEntry, oldest first
+
+        Raises:
+            ValueError: If min_level is invalid
+        """
+        query = LogQuery(min_level=self._level_number(min_level))
+        aedt_dir = self.log_dir.parent
+
+        def discover() -> List[Path]:
+            return find_log_files(aedt_dir, project_name=project_name, epic_id=epic_id)
+
+        log_files = discover()
+        if project_name is not None and epic_id is not None and not log_files:
+            log_files = [aedt_dir / "projects" / project_name / "epics" / f"epic-{epic_id}.log"]
+        return follow_logs(log_files, query=query, backlog=backlog, stop=stop,
+                           poll_interval=poll_interval, discover=discover)
 
     def set_level(self, level: str):
         """Change log level for all loggers
@@ -178,17 +1098,58 @@ class AEDTLogger:
         # Update all existing loggers
         for logger in self._loggers.values():
             logger.setLevel(new_level)
-            for handler in logger.handlers:
+        for handlers in self._handlers.values():
+            for handler in handlers:
                 handler.setLevel(new_level)
+        for handler in self._file_handlers.values():
+            handler.setLevel(new_level)
+        for handler in self._ring_buffers.values():
+            handler.setLevel(new_level)
+
+    def flush(self):
+        """Write out all pending records
+
+        In queued mode this waits until the listener has handled everything
+        enqueued so far.
+        """
+        if self._queue is not None:
+            self._queue.drain()
+        for handler in self._file_handlers.values():
+            handler.flush()
 
     def close(self):
         """Close all loggers and handlers
 
         Should be called on application shutdown to ensure all logs are flushed.
+        In queued mode every record enqueued before close() is written first,
+        and pending compression of rotated backups is finished.
         """
-        for logger in self._loggers.values():
-            for handler in logger.handlers:
-                handler.close()
+        for rate_filter in self._rate_filters.values():
+            rate_filter.flush()
+        for server in self._metrics_servers:
+            server.stop()
+        self._metrics_servers.clear()
+        if self._queue is not None:
+            self._queue.close()
+        if self._sink_client is not None:
+            self._sink_client.close()
+
+        for name, handlers in self._handlers.items():
+            logger = logging.getLogger(name)
+            for handler in handlers:
                 logger.removeHandler(handler)
+                handler.close()
+        for handler in self._file_handlers.values():
+            handler.close()
+        for handler in self._fallback_handlers.values():
+            handler.close()
+        if self._compressor is not None:
+            self._compressor.close()
 
+        self._handlers.clear()
+        self._file_handlers.clear()
+        self._ring_buffers.clear()
+        self._epic_buffers.clear()
+        self._fallback_handlers.clear()
+        self._rate_filters.clear()
         self._loggers.clear()
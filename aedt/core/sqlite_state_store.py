@@ -0,0 +1,431 @@
+"""SQLite State Store for AEDT
+
+This module provides a SQLite-backed alternative to the per-project
+status.yaml layout, for deployments with thousands of projects.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import sqlite3
+import threading
+import logging
+
+from aedt.core.data_store import DataStore
+from aedt.core.state_manager import (
+    EpicState,
+    ProjectState,
+    project_state_to_dict,
+)
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id   TEXT PRIMARY KEY,
+    project_name TEXT NOT NULL,
+    last_updated TEXT,
+    version      INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS epics (
+    project_id        TEXT NOT NULL REFERENCES projects(project_id) ON DELETE CASCADE,
+    epic_id           TEXT NOT NULL,
+    status            TEXT NOT NULL,
+    progress          REAL NOT NULL,
+    agent_id          TEXT,
+    worktree_path     TEXT,
+    completed_stories TEXT NOT NULL DEFAULT '[]',
+    last_updated      TEXT,
+    PRIMARY KEY (project_id, epic_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_epics_status ON epics(status);
+CREATE INDEX IF NOT EXISTS idx_epics_agent_id ON epics(agent_id);
+CREATE INDEX IF NOT EXISTS idx_projects_name ON projects(project_name);
+"""
+
+
+class SQLiteStateStore:
+    """SQLite-backed project/epic state storage
+
+    Stores project and epic states in a single database running in WAL mode,
+    so readers never block the writer and cross-project queries (e.g. all
+    epics assigned to an agent) hit an index instead of scanning every
+    status.yaml.
+    """
+
+    UPSERT_PROJECT_SQL = (
+        "INSERT INTO projects (project_id, project_name, last_updated, version) "
+        "VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(project_id) DO UPDATE SET "
+        "project_name = excluded.project_name, "
+        "last_updated = excluded.last_updated, "
+        "version = excluded.version"
+    )
+    INSERT_EPIC_SQL = (
+        "INSERT INTO epics (project_id, epic_id, status, progress, "
+        "agent_id, worktree_path, completed_stories, last_updated) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+
+    EPIC_COLUMNS = (
+        'epic_id', 'status', 'progress', 'agent_id', 'worktree_path',
+        'completed_stories', 'last_updated'
+    )
+
+    def __init__(self, db_path: Path):
+        """Initialize SQLiteStateStore
+
+        Args:
+            db_path: Path to the SQLite database file (e.g. .aedt/state.db)
+        """
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def upsert_projects(self, projects: Iterable[ProjectState]) -> int:
+        """Insert or update project states in a single transaction
+
+        Epics that no longer exist in a project state are removed so the
+        database mirrors what a status.yaml rewrite would produce.
+
+        Args:
+            projects: Project states to write
+
+        Returns:
+            Number of projects written
+
+        Raises:
+            RuntimeError: If the transaction fails
+        """
+        project_rows = []
+        epic_rows = []
+        project_ids = []
+
+        for project_state in projects:
+            project_ids.append((project_state.project_id,))
+            project_rows.append((
+                project_state.project_id,
+                project_state.project_name,
+                project_state.last_updated,
+                project_state.version,
+            ))
+            for epic_state in project_state.epics.values():
+                epic_rows.append(self._epic_to_row(project_state.project_id, epic_state))
+
+        if not project_rows:
+            return 0
+
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        self.UPSERT_PROJECT_SQL,
+                        project_rows
+                    )
+                    self._conn.executemany(
+                        "DELETE FROM epics WHERE project_id = ?", project_ids
+                    )
+                    self._conn.executemany(
+                        self.INSERT_EPIC_SQL,
+                        epic_rows
+                    )
+            except sqlite3.Error as e:
+                raise RuntimeError(f"写入状态数据库失败 {self.db_path}: {e}")
+
+        logger.debug(f"批量写入 {len(project_rows)} 个项目, {len(epic_rows)} 个 Epic")
+        return len(project_rows)
+
+    def upsert_project(self, project_state: ProjectState) -> bool:
+        """Insert or update a single project state
+
+        Args:
+            project_state: Project state to write
+
+        Returns:
+            True if write successful
+        """
+        return self.upsert_projects([project_state]) == 1
+
+    def load_projects(self) -> Dict[str, ProjectState]:
+        """Load all project states
+
+        Returns:
+            Dictionary mapping project_id to ProjectState
+        """
+        with self._lock:
+            project_rows = self._conn.execute(
+                "SELECT project_id, project_name, last_updated, version FROM projects"
+            ).fetchall()
+            epic_rows = self._conn.execute(
+                "SELECT project_id, " + ", ".join(self.EPIC_COLUMNS) +
+                " FROM epics ORDER BY project_id, rowid"
+            ).fetchall()
+
+        projects = {
+            row['project_id']: ProjectState(
+                project_id=row['project_id'],
+                project_name=row['project_name'],
+                epics={},
+                last_updated=row['last_updated'],
+                version=row['version']
+            )
+            for row in project_rows
+        }
+        for row in epic_rows:
+            project_state = projects.get(row['project_id'])
+            if project_state is not None:
+                epic_state = self._row_to_epic(row)
+                project_state.epics[epic_state.epic_id] = epic_state
+
+        return projects
+
+    def load_project(self, project_id: str) -> Optional[ProjectState]:
+        """Load a single project state
+
+        Args:
+            project_id: Project identifier
+
+        Returns:
+            ProjectState if found, None otherwise
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT project_id, project_name, last_updated, version FROM projects "
+                "WHERE project_id = ?", (project_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            epic_rows = self._conn.execute(
+                "SELECT " + ", ".join(self.EPIC_COLUMNS) +
+                " FROM epics WHERE project_id = ? ORDER BY rowid", (project_id,)
+            ).fetchall()
+
+        project_state = ProjectState(
+            project_id=row['project_id'],
+            project_name=row['project_name'],
+            epics={},
+            last_updated=row['last_updated'],
+            version=row['version']
+        )
+        for epic_row in epic_rows:
+            epic_state = self._row_to_epic(epic_row)
+            project_state.epics[epic_state.epic_id] = epic_state
+        return project_state
+
+    def query_epics(
+        self,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> List[Tuple[str, EpicState]]:
+        """Query epics across all projects
+
+        Uses the status/agent indexes so no project has to be loaded.
+
+        Args:
+            status: Filter by epic status
+            agent_id: Filter by assigned agent
+            project_id: Filter by project
+
+        Returns:
+            List of (project_id, EpicState) tuples
+        """
+        clauses = []
+        params = []
+        for column, value in (('status', status), ('agent_id', agent_id),
+                              ('project_id', project_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        sql = "SELECT project_id, " + ", ".join(self.EPIC_COLUMNS) + " FROM epics"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY project_id, rowid"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [(row['project_id'], self._row_to_epic(row)) for row in rows]
+
+    def delete_project(self, project_id: str) -> bool:
+        """Delete a project and its epics
+
+        Args:
+            project_id: Project identifier
+
+        Returns:
+            True if the project existed
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM epics WHERE project_id = ?", (project_id,))
+                cursor = self._conn.execute(
+                    "DELETE FROM projects WHERE project_id = ?", (project_id,)
+                )
+        return cursor.rowcount > 0
+
+    def export_to_yaml(self, projects_dir: Path, data_store: DataStore) -> int:
+        """Export all projects to the status.yaml layout
+
+        Writes .aedt/projects/{project_name}/status.yaml for each project,
+        matching what the file backend produces.
+
+        Args:
+            projects_dir: Target projects directory (.aedt/projects/)
+            data_store: DataStore used for atomic writes
+
+        Returns:
+            Number of projects exported
+        """
+        count = 0
+        for project_state in self.load_projects().values():
+            state_file = projects_dir / project_state.project_name / "status.yaml"
+            data_store.atomic_write(state_file, project_state_to_dict(project_state))
+            count += 1
+
+        logger.info(f"导出 {count} 个项目状态到: {projects_dir}")
+        return count
+
+    def import_from_yaml(
+        self,
+        projects_dir: Path,
+        data_store: DataStore,
+        batch_size: int = 500
+    ) -> int:
+        """Import all status.yaml files from the file layout
+
+        Args:
+            projects_dir: Source projects directory (.aedt/projects/)
+            data_store: DataStore used for reading
+            batch_size: Number of epics per insert batch
+
+        Returns:
+            Number of projects imported
+        """
+        if not projects_dir.exists():
+            return 0
+
+        count = 0
+        for state_file in sorted(projects_dir.glob("*/status.yaml")):
+            try:
+                self.import_state_file(state_file, data_store, batch_size)
+                count += 1
+            except Exception as e:
+                logger.error(f"导入状态文件失败: {state_file}: {e}")
+
+        logger.info(f"从 {projects_dir} 导入 {count} 个项目状态")
+        return count
+
+    def import_state_file(
+        self,
+        state_file: Path,
+        data_store: DataStore,
+        batch_size: int = 500
+    ) -> str:
+        """Import one status.yaml, streaming its epics
+
+        Epics are read one at a time and inserted in batches inside a single
+        transaction, so a huge state file never has to be held in memory.
+
+        Args:
+            state_file: status.yaml to import
+            data_store: DataStore used for streaming reads
+            batch_size: Number of epics per insert batch
+
+        Returns:
+            Imported project_id
+
+        Raises:
+            ValueError: If the file is malformed or lacks required fields
+        """
+        project = {}
+        pending_epics: List[EpicState] = []
+        flushed = False
+
+        def flush():
+            # The project row must exist before its epics (foreign key)
+            nonlocal pending_epics, flushed
+            self._upsert_project_row(project)
+            if not flushed:
+                self._conn.execute(
+                    "DELETE FROM epics WHERE project_id = ?", (project['project_id'],)
+                )
+                flushed = True
+            self._conn.executemany(
+                self.INSERT_EPIC_SQL,
+                [self._epic_to_row(project['project_id'], e) for e in pending_epics]
+            )
+            pending_epics = []
+
+        with self._lock:
+            try:
+                with self._conn:
+                    for parent, key, value in data_store.iter_entries(
+                            state_file, expand=('epics',)):
+                        if parent is None:
+                            project[key] = value
+                            continue
+
+                        pending_epics.append(EpicState(**value))
+                        if (len(pending_epics) >= batch_size and
+                                'project_id' in project and 'project_name' in project):
+                            flush()
+
+                    for field_name in ('project_id', 'project_name'):
+                        if field_name not in project:
+                            raise ValueError(f"缺少必需字段: {field_name}")
+                    flush()
+            except sqlite3.Error as e:
+                raise RuntimeError(f"写入状态数据库失败 {self.db_path}: {e}")
+
+        return project['project_id']
+
+    def _upsert_project_row(self, project: dict):
+        """Insert or update a projects row from raw status.yaml fields"""
+        self._conn.execute(
+            self.UPSERT_PROJECT_SQL,
+            (project['project_id'], project['project_name'],
+             project.get('last_updated'), project.get('version', 0))
+        )
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _epic_to_row(self, project_id: str, epic_state: EpicState) -> tuple:
+        """Convert EpicState to an epics table row"""
+        return (
+            project_id,
+            epic_state.epic_id,
+            epic_state.status,
+            epic_state.progress,
+            epic_state.agent_id,
+            epic_state.worktree_path,
+            json.dumps(list(epic_state.completed_stories or []), ensure_ascii=False),
+            epic_state.last_updated,
+        )
+
+    def _row_to_epic(self, row: sqlite3.Row) -> EpicState:
+        """Convert an epics table row to EpicState"""
+        return EpicState(
+            epic_id=row['epic_id'],
+            status=row['status'],
+            progress=row['progress'],
+            agent_id=row['agent_id'],
+            worktree_path=row['worktree_path'],
+            completed_stories=json.loads(row['completed_stories']),
+            last_updated=row['last_updated']
+        )
@@ -6,10 +6,15 @@ This module manages project and epic states with crash recovery and validation.
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import threading
+import time
 import logging
 
+from aedt.core.config_manager import StateConfig
 from aedt.core.data_store import DataStore
+from aedt.core.file_watcher import WatchSubscription, get_watcher_service
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +52,7 @@ class ProjectState:
     project_name: str
     epics: Dict[str, EpicState] = field(default_factory=dict)
     last_updated: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    version: int = 0  # Incremented on every save, used to order concurrent writers
 
     def __post_init__(self):
         """Initialize default values for mutable fields"""
@@ -56,6 +62,78 @@ class ProjectState:
             self.last_updated = datetime.utcnow().isoformat()
 
 
+@dataclass
+class RecoveryReport:
+    """Outcome of a backup recovery attempt for one state file"""
+    state_file: str
+    recovered_from: Optional[str] = None
+    candidates_checked: int = 0
+    corrupt_backups: List[str] = field(default_factory=list)
+    latency_ms: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether a valid backup was found"""
+        return self.recovered_from is not None
+
+
+def parse_project_state(data: dict) -> ProjectState:
+    """Parse project state from dictionary
+
+    Args:
+        data: Raw project state data
+
+    Returns:
+        Parsed ProjectState object
+
+    Raises:
+        ValueError: If required fields are missing
+    """
+    if not data:
+        raise ValueError("项目状态数据为空")
+
+    required_fields = ['project_id', 'project_name']
+    for field_name in required_fields:
+        if field_name not in data:
+            raise ValueError(f"缺少必需字段: {field_name}")
+
+    # Parse epics
+    epics = {}
+    for epic_id, epic_data in data.get('epics', {}).items():
+        epics[epic_id] = EpicState(**epic_data)
+
+    return ProjectState(
+        project_id=data['project_id'],
+        project_name=data['project_name'],
+        epics=epics,
+        last_updated=data.get('last_updated'),
+        version=data.get('version', 0)
+    )
+
+
+def project_state_to_dict(project_state: ProjectState) -> dict:
+    """Convert ProjectState to dictionary
+
+    Handles nested EpicState dataclasses.
+
+    Args:
+        project_state: ProjectState to convert
+
+    Returns:
+        Dictionary representation
+    """
+    return {
+        'project_id': project_state.project_id,
+        'project_name': project_state.project_name,
+        'last_updated': project_state.last_updated,
+        'version': project_state.version,
+        'epics': {
+            epic_id: asdict(epic_state)
+            for epic_id, epic_state in project_state.epics.items()
+        }
+    }
+
+
 class StateManager:
     """State manager for AEDT projects
 
@@ -63,22 +141,90 @@ class StateManager:
     crash recovery and worktree validation.
     """
 
-    def __init__(self, base_dir: Path, data_store: DataStore):
+    BACKENDS = ("file", "sqlite")
+
+    # Backups at least this large are verified concurrently
+    PARALLEL_VERIFY_THRESHOLD = 1024 * 1024
+    MAX_VERIFY_WORKERS = 4
+
+    def __init__(
+        self,
+        base_dir: Path,
+        data_store: DataStore,
+        backend: str = "file",
+        sqlite_path: Optional[Path] = None
+    ):
         """Initialize StateManager
 
         Args:
             base_dir: Base directory for AEDT data (.aedt/)
             data_store: DataStore instance for file operations
+            backend: State backend, "file" (status.yaml per project) or "sqlite"
+            sqlite_path: SQLite database path (default: {base_dir}/state.db)
+
+        Raises:
+            ValueError: If backend is unknown
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(
+                f"未知的状态后端: {backend} (可选: {', '.join(self.BACKENDS)})"
+            )
+
         self.base_dir = base_dir
         self.data_store = data_store
+        self.backend = backend
         self.projects: Dict[str, ProjectState] = {}
+        self._listeners: List[Callable[[str, ProjectState], None]] = []
+        self._merge_lock = threading.RLock()
+        self._subscription: Optional[WatchSubscription] = None
+        self.recovery_reports: List[RecoveryReport] = []  # Of the last load_all_states()
+
+        # status.yaml path -> (content digest, project_id) of the last state
+        # that passed _validate_state
+        self._validated_digests: Dict[Path, Tuple[str, str]] = {}
+
+        self.sqlite_store = None
+        if backend == "sqlite":
+            # Imported lazily so the file backend never touches sqlite3
+            from aedt.core.sqlite_state_store import SQLiteStateStore
+            self.sqlite_store = SQLiteStateStore(sqlite_path or base_dir / "state.db")
+
+    @classmethod
+    def from_config(
+        cls,
+        base_dir: Path,
+        data_store: DataStore,
+        state_config: StateConfig
+    ) -> 'StateManager':
+        """Create a StateManager from the state section of the configuration
+
+        A relative sqlite_path is resolved against the project root, the
+        parent of base_dir, so the default ".aedt/state.db" is
+        {base_dir}/state.db regardless of the working directory.
+
+        Args:
+            base_dir: Base directory for AEDT data (.aedt/)
+            data_store: DataStore instance for file operations
+            state_config: Configured backend and SQLite path
+
+        Returns:
+            StateManager using the configured backend
+
+        Raises:
+            ValueError: If the backend is unknown
+        """
+        sqlite_path = Path(state_config.sqlite_path).expanduser()
+        if not sqlite_path.is_absolute():
+            sqlite_path = Path(base_dir).parent / sqlite_path
+        return cls(base_dir, data_store, backend=state_config.backend, sqlite_path=sqlite_path)
 
     def load_all_states(self) -> Dict[str, ProjectState]:
         """Load all project states from disk
 
         Scans .aedt/projects/ directory and loads all status.yaml files.
         Validates each state and attempts recovery from backups if needed.
+        Files whose content digest matches the last validated load are not
+        parsed or validated again.
 
         Returns:
             Dictionary mapping project_id to ProjectState
@@ -87,7 +233,12 @@ class StateManager:
             - Populates self.projects with loaded states
             - May trigger crash recovery for 'developing' epics
             - May mark epics as 'requires_cleanup' if worktree invalid
+            - Replaces self.recovery_reports with this load's recoveries
         """
+        self.recovery_reports = []
+        if self.sqlite_store is not None:
+            return self._load_all_states_sqlite()
+
         projects_dir = self.base_dir / "projects"
         if not projects_dir.exists():
             logger.info("项目目录不存在，返回空状态")
@@ -106,13 +257,22 @@ class StateManager:
                 continue
 
             try:
-                # Try loading main state file
-                data = self.data_store.read(state_file)
+                # Unchanged since last validated load: keep the in-memory state
+                known = self._validated_digests.get(state_file)
+                known_digest = known[0] if known and known[1] in self.projects else None
+                data, digest = self.data_store.read_with_digest(state_file, known_digest)
+                if data is None:
+                    loaded_count += 1
+                    logger.debug(f"状态文件未变化，跳过校验: {state_file}")
+                    continue
+
+                # Parse and validate the main state file
                 project_state = self._parse_project_state(data)
 
                 # Validate and possibly fix state
                 validated_state = self._validate_state(project_state)
                 self.projects[project_state.project_id] = validated_state
+                self._validated_digests[state_file] = (digest, project_state.project_id)
                 loaded_count += 1
 
                 logger.info(f"加载项目状态: {project_state.project_name} "
@@ -123,27 +283,101 @@ class StateManager:
                 logger.error(f"加载状态文件失败: {state_file}: {e}")
 
                 # Try recovering from backup
-                backup_files = sorted(
-                    state_file.parent.glob(f"{state_file.stem}{state_file.suffix}.backup.*"),
-                    key=lambda p: p.stat().st_mtime,
-                    reverse=True
-                )
-
-                if backup_files:
-                    logger.info(f"尝试从备份恢复: {backup_files[0]}")
-                    try:
-                        data = self.data_store.read(backup_files[0])
-                        project_state = self._parse_project_state(data)
-                        self.projects[project_state.project_id] = project_state
-                        logger.info(f"从备份恢复成功: {project_state.project_name}")
-                        loaded_count += 1
-                        error_count -= 1
-                    except Exception as backup_error:
-                        logger.error(f"备份恢复失败: {backup_error}")
+                project_state = self._recover_from_backups(state_file)
+                if project_state is not None:
+                    self.projects[project_state.project_id] = project_state
+                    loaded_count += 1
+                    error_count -= 1
 
         logger.info(f"状态加载完成: {loaded_count} 个项目成功, {error_count} 个失败")
         return self.projects
 
+    def _recover_from_backups(self, state_file: Path) -> Optional[ProjectState]:
+        """Recover a project state from the newest intact backup
+
+        Candidates are checked newest-first against the digest recorded at
+        backup time, which is much cheaper than parsing. Large backups are
+        verified concurrently. The chosen backup is parsed and validated like
+        a regular state file; if it still fails, the next candidate is tried.
+
+        Args:
+            state_file: Corrupted status.yaml
+
+        Returns:
+            Recovered and validated ProjectState, or None if no backup is usable
+        """
+        start = time.perf_counter()
+        report = RecoveryReport(state_file=str(state_file))
+        candidates = self.data_store.list_backups(state_file)
+
+        parallel = (
+            len(candidates) > 1 and
+            max(map(self._file_size, candidates)) >= self.PARALLEL_VERIFY_THRESHOLD
+        )
+        if parallel:
+            workers = min(len(candidates), self.MAX_VERIFY_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                verdicts = list(executor.map(self.data_store.verify_backup, candidates))
+            report.candidates_checked = len(candidates)
+        else:
+            # Lazily verified: small files stop at the first intact candidate
+            verdicts = (self.data_store.verify_backup(p) for p in candidates)
+
+        project_state = None
+        for candidate, intact in zip(candidates, verdicts):
+            if not parallel:
+                report.candidates_checked += 1
+            if intact is False:
+                logger.warning(f"备份校验失败，跳过: {candidate}")
+                report.corrupt_backups.append(str(candidate))
+                continue
+
+            # intact is None for legacy backups without digest: parsing decides
+            logger.info(f"尝试从备份恢复: {candidate}")
+            try:
+                data = self.data_store.read(candidate)
+                project_state = self._validate_state(self._parse_project_state(data))
+                report.recovered_from = str(candidate)
+                break
+            except Exception as backup_error:
+                logger.error(f"备份恢复失败: {candidate}: {backup_error}")
+                report.corrupt_backups.append(str(candidate))
+
+        report.latency_ms = (time.perf_counter() - start) * 1000
+        self.recovery_reports.append(report)
+
+        if project_state is not None:
+            logger.info(
+                f"从备份恢复成功: {project_state.project_name} "
+                f"(检查 {report.candidates_checked} 个备份, 耗时 {report.latency_ms:.1f}ms)"
+            )
+        else:
+            logger.error(
+                f"无可用备份: {state_file} "
+                f"(检查 {report.candidates_checked} 个备份, 耗时 {report.latency_ms:.1f}ms)"
+            )
+        return project_state
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        """Size of a file, 0 if it was removed (e.g. a backup pruned meanwhile)"""
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _load_all_states_sqlite(self) -> Dict[str, ProjectState]:
+        """Load all project states from the SQLite backend
+
+        Returns:
+            Dictionary mapping project_id to ProjectState
+        """
+        for project_id, project_state in self.sqlite_store.load_projects().items():
+            self.projects[project_id] = self._validate_state(project_state)
+
+        logger.info(f"状态加载完成: {len(self.projects)} 个项目 (sqlite)")
+        return self.projects
+
     def save_project_state(self, project_state: ProjectState) -> bool:
         """Save project state to disk
 
@@ -158,31 +392,43 @@ class StateManager:
         Raises:
             RuntimeError: If save fails
         """
-        project_dir = self.base_dir / "projects" / project_state.project_name
-        project_dir.mkdir(parents=True, exist_ok=True)
+        # Serialized with reload_project, so a concurrent reload cannot
+        # replace the state being saved with an older one
+        with self._merge_lock:
+            if self.sqlite_store is not None:
+                project_state.last_updated = datetime.utcnow().isoformat()
+                project_state.version += 1
+                self.sqlite_store.upsert_project(project_state)
+                self.projects[project_state.project_id] = project_state
+                logger.info(f"保存项目状态: {project_state.project_name} (sqlite)")
+                return True
+
+            project_dir = self.base_dir / "projects" / project_state.project_name
+            project_dir.mkdir(parents=True, exist_ok=True)
 
-        state_file = project_dir / "status.yaml"
+            state_file = project_dir / "status.yaml"
 
-        # Backup old state if exists
-        if state_file.exists():
-            self.data_store.backup(state_file)
+            # Backup old state if exists
+            if state_file.exists():
+                self.data_store.backup(state_file)
 
-        # Update timestamp
-        project_state.last_updated = datetime.utcnow().isoformat()
+            # Update timestamp and version
+            project_state.last_updated = datetime.utcnow().isoformat()
+            project_state.version += 1
 
-        # Convert to dict (handle nested dataclasses)
-        data = self._project_state_to_dict(project_state)
+            # Convert to dict (handle nested dataclasses)
+            data = self._project_state_to_dict(project_state)
 
-        # Atomic write
-        try:
-            self.data_store.atomic_write(state_file, data)
-            # Update in-memory state
-            self.projects[project_state.project_id] = project_state
-            logger.info(f"保存项目状态: {project_state.project_name}")
-            return True
-        except Exception as e:
-            logger.error(f"保存项目状态失败: {e}")
-            raise
+            # Atomic write
+            try:
+                self.data_store.atomic_write(state_file, data)
+                # Update in-memory state
+                self.projects[project_state.project_id] = project_state
+                logger.info(f"保存项目状态: {project_state.project_name}")
+                return True
+            except Exception as e:
+                logger.error(f"保存项目状态失败: {e}")
+                raise
 
     def get_project_state(self, project_id: str) -> Optional[ProjectState]:
         """Get project state by ID
@@ -195,6 +441,178 @@ class StateManager:
         """
         return self.projects.get(project_id)
 
+    def iter_epic_states(self, state_file: Path) -> Iterator[EpicState]:
+        """Stream the epics of a status.yaml one at a time
+
+        Unlike load_all_states, the file is never loaded as a whole, so very
+        large state files can be processed with bounded memory. No validation
+        or crash recovery is applied.
+
+        Args:
+            state_file: Path to a status.yaml
+
+        Yields:
+            EpicState for each entry under 'epics:'
+
+        Raises:
+            ValueError: If the file is malformed
+        """
+        for parent, _, epic_data in self.data_store.iter_entries(state_file, expand=('epics',)):
+            if parent == 'epics':
+                yield EpicState(**epic_data)
+
+    def query_epics(
+        self,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None
+    ) -> List[Tuple[str, EpicState]]:
+        """Query epics across all projects
+
+        The SQLite backend answers from its status/agent indexes; the file
+        backend scans the in-memory states loaded by load_all_states().
+
+        Args:
+            status: Filter by epic status
+            agent_id: Filter by assigned agent
+
+        Returns:
+            List of (project_id, EpicState) tuples
+        """
+        if self.sqlite_store is not None:
+            return self.sqlite_store.query_epics(status=status, agent_id=agent_id)
+
+        return [
+            (project_id, epic_state)
+            for project_id, project_state in self.projects.items()
+            for epic_state in project_state.epics.values()
+            if (status is None or epic_state.status == status)
+            and (agent_id is None or epic_state.agent_id == agent_id)
+        ]
+
+    def add_change_listener(self, callback: Callable[[str, ProjectState], None]):
+        """Register a callback for project state changes picked up from disk
+
+        Args:
+            callback: Called as callback(project_id, project_state)
+        """
+        self._listeners.append(callback)
+
+    def remove_change_listener(self, callback: Callable[[str, ProjectState], None]):
+        """Unregister a change callback
+
+        Args:
+            callback: Previously registered callback
+        """
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def reload_project(self, state_file: Path) -> Optional[ProjectState]:
+        """Re-read a single status.yaml and merge it into memory
+
+        The on-disk state wins only if it is newer than the in-memory one
+        (higher version, or same version with a later last_updated), so our
+        own writes and stale events are ignored. Crash recovery is not applied:
+        the file was just written by a live process.
+
+        Args:
+            state_file: Path to the project's status.yaml
+
+        Returns:
+            The merged ProjectState if it changed, None otherwise
+        """
+        if not state_file.exists():
+            return None
+
+        try:
+            incoming = self._parse_project_state(self.data_store.read(state_file))
+        except Exception as e:
+            logger.warning(f"忽略无法解析的状态文件: {state_file}: {e}")
+            return None
+
+        with self._merge_lock:
+            current = self.projects.get(incoming.project_id)
+            if current is None:
+                self.projects[incoming.project_id] = incoming
+                merged = incoming
+            elif self._is_newer(incoming, current):
+                # Update in place so references held by callers stay valid
+                current.project_name = incoming.project_name
+                current.epics = incoming.epics
+                current.last_updated = incoming.last_updated
+                current.version = incoming.version
+                merged = current
+            else:
+                return None
+
+        logger.info(f"增量加载项目状态: {merged.project_name} (版本 {merged.version})")
+        self._emit_change(merged.project_id, merged)
+        return merged
+
+    def enable_auto_reload(self, debounce: float = 0.2):
+        """Watch status.yaml files and reload projects as they change
+
+        Subscribes to the shared file watcher service; events are debounced
+        per file so a burst of writes to one status.yaml triggers a single
+        reload.
+
+        Args:
+            debounce: Quiet period in seconds before reloading a file
+        """
+        if self._subscription is not None:
+            logger.warning("状态自动加载已经启用")
+            return
+
+        projects_dir = self.base_dir / "projects"
+        projects_dir.mkdir(parents=True, exist_ok=True)
+
+        self._subscription = get_watcher_service().subscribe(
+            projects_dir, "status.yaml", self._on_state_file_changed,
+            recursive=True, debounce=debounce
+        )
+        logger.info(f"已启用状态自动加载，监听: {projects_dir}")
+
+    def _on_state_file_changed(self, state_file: Path):
+        """Watcher callback: merge a changed status.yaml"""
+        try:
+            self.reload_project(state_file)
+        except Exception as e:
+            logger.error(f"增量加载状态失败: {state_file}: {e}")
+
+    def disable_auto_reload(self):
+        """Stop watching status.yaml files"""
+        if self._subscription is not None:
+            get_watcher_service().unsubscribe(self._subscription)
+            self._subscription = None
+            logger.info("已停止状态自动加载")
+
+    def close(self):
+        """Release backend resources"""
+        self.disable_auto_reload()
+        if self.sqlite_store is not None:
+            self.sqlite_store.close()
+
+    def _is_newer(self, incoming: ProjectState, current: ProjectState) -> bool:
+        """Check whether incoming state supersedes current state"""
+        if incoming.version != current.version:
+            return incoming.version > current.version
+        return self._timestamp(incoming.last_updated) > self._timestamp(current.last_updated)
+
+    @staticmethod
+    def _timestamp(value: Optional[str]) -> datetime:
+        """Parse an ISO timestamp, treating missing/invalid values as oldest"""
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return datetime.min
+
+    def _emit_change(self, project_id: str, project_state: ProjectState):
+        """Notify change listeners"""
+        for callback in list(self._listeners):
+            try:
+                callback(project_id, project_state)
+            except Exception as e:
+                logger.error(f"状态变更回调失败: {e}")
+
     def update_epic_state(
         self,
         project_id: str,
@@ -247,25 +665,7 @@ class StateManager:
         Raises:
             ValueError: If required fields are missing
         """
-        if not data:
-            raise ValueError("项目状态数据为空")
-
-        required_fields = ['project_id', 'project_name']
-        for field_name in required_fields:
-            if field_name not in data:
-                raise ValueError(f"缺少必需字段: {field_name}")
-
-        # Parse epics
-        epics = {}
-        for epic_id, epic_data in data.get('epics', {}).items():
-            epics[epic_id] = EpicState(**epic_data)
-
-        return ProjectState(
-            project_id=data['project_id'],
-            project_name=data['project_name'],
-            epics=epics,
-            last_updated=data.get('last_updated')
-        )
+        return parse_project_state(data)
 
     def _validate_state(self, project_state: ProjectState) -> ProjectState:
         """Validate and fix project state
@@ -320,20 +720,10 @@ class StateManager:
     def _project_state_to_dict(self, project_state: ProjectState) -> dict:
         """Convert ProjectState to dictionary
 
-        Handles nested EpicState dataclasses.
-
         Args:
             project_state: ProjectState to convert
 
         Returns:
             Dictionary representation
         """
-        return {
-            'project_id': project_state.project_id,
-            'project_name': project_state.project_name,
-            'last_updated': project_state.last_updated,
-            'epics': {
-                epic_id: asdict(epic_state)
-                for epic_id, epic_state in project_state.epics.items()
-            }
-        }
+        return project_state_to_dict(project_state)
@@ -0,0 +1,27 @@
+"""Shared fixtures for AEDT benchmarks"""
+
+import pytest
+import sys
+
+
+def _count_calls(func):
+    """Number of Python and builtin function calls made by func()"""
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event in ("call", "c_call"):
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        func()
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+@pytest.fixture
+def count_calls():
+    """Function counting the calls made by a callable"""
+    return _count_calls
@@ -0,0 +1,66 @@
+"""Benchmark: ConfigManager.get lookup table vs attribute walk
+
+Run with output visible:
+    pytest tests/benchmarks/test_config_get_benchmark.py -s
+"""
+
+import pytest
+import timeit
+
+from aedt.core.config_manager import ConfigManager
+
+pytestmark = pytest.mark.slow
+
+ITERATIONS = 200_000
+KEYS = ['subagent.max_concurrent', 'git.branch_prefix', 'state.backend', 'version']
+
+
+def walk_get(config, key, default=None):
+    """Previous implementation: split the key and walk getattr on every call"""
+    value = config
+    for k in key.split('.'):
+        if hasattr(value, k):
+            value = getattr(value, k)
+        else:
+            return default
+    return value
+
+
+def test_config_get_benchmark(tmp_path, count_calls):
+    """Compare per-call cost of dot-path lookups
+
+    Asserts a lookup makes the same, smaller number of calls for any key depth.
+    """
+    config_path = tmp_path / ".aedt" / "config.yaml"
+    config_mgr = ConfigManager(config_path=config_path)
+    config_mgr.initialize(force=False, is_global=False)
+    config_mgr.load()
+    config = config_mgr.config
+
+    for key in KEYS:
+        assert config_mgr.get(key) == walk_get(config, key)
+
+    def run_walk():
+        for key in KEYS:
+            walk_get(config, key)
+
+    def run_lookup():
+        for key in KEYS:
+            config_mgr.get(key)
+
+    calls = ITERATIONS // len(KEYS)
+    walk_time = min(timeit.repeat(run_walk, number=calls, repeat=3))
+    lookup_time = min(timeit.repeat(run_lookup, number=calls, repeat=3))
+
+    per_walk = walk_time / ITERATIONS * 1e9
+    per_lookup = lookup_time / ITERATIONS * 1e9
+    print(f"\n{ITERATIONS} lookups")
+    print(f"attribute walk: {per_walk:8.1f} ns/call")
+    print(f"lookup table:   {per_lookup:8.1f} ns/call ({walk_time / lookup_time:.1f}x)")
+
+    # A lookup makes the same calls whatever the key depth, and fewer than any walk
+    lookup_calls = {count_calls(lambda: config_mgr.get(key)) for key in KEYS}
+    walk_calls = {count_calls(lambda: walk_get(config, key)) for key in KEYS}
+    print(f"calls per lookup: walk {sorted(walk_calls)}, table {sorted(lookup_calls)}")
+    assert len(lookup_calls) == 1
+    assert max(lookup_calls) < min(walk_calls)
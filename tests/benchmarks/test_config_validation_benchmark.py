@@ -0,0 +1,101 @@
+"""Benchmark: compiled config schema vs interpreting the schema per call
+
+Run with output visible:
+    pytest tests/benchmarks/test_config_validation_benchmark.py -s
+"""
+
+import pytest
+import timeit
+
+from aedt.core.config_manager import AEDT_CONFIG_SCHEMA, AEDTConfig
+from aedt.core.config_schema import MISSING, ObjectSchema
+
+pytestmark = pytest.mark.slow
+
+GATE_COUNT = 2_000
+REPEAT = 20
+
+
+def interpret(schema, value, path="", errors=None):
+    """Baseline: walk the schema definition on every validation"""
+    errors = [] if errors is None else errors
+    if not isinstance(value, dict):
+        errors.append(path)
+        return None
+    result = {}
+    for name, spec in schema.fields.items():
+        field_path = f"{path}.{name}" if path else name
+        item = value.get(name, MISSING)
+        if item is None and spec.nullable:
+            item = MISSING
+        if item is MISSING:
+            if spec.required:
+                errors.append(field_path)
+            elif spec.default_factory is not None:
+                result[name] = spec.default_factory()
+            elif spec.default is not MISSING:
+                result[name] = spec.default
+            continue
+        if isinstance(spec.type, ObjectSchema):
+            result[name] = interpret(spec.type, item, field_path, errors)
+            continue
+        if spec.type is not object and not isinstance(item, spec.type):
+            errors.append(field_path)
+        elif spec.choices is not None and item not in spec.choices:
+            errors.append(field_path)
+        elif spec.gt is not None and item <= spec.gt:
+            errors.append(field_path)
+        elif spec.items is not None:
+            for index, element in enumerate(item):
+                if not isinstance(element, spec.items.type):
+                    errors.append(f"{field_path}[{index}]")
+        result[name] = item
+    for key in value:
+        if key not in schema.fields and schema.unknown == "error":
+            errors.append(f"{path}.{key}")
+    if schema.factory is not None and not errors:
+        return schema.factory(**result)
+    return result
+
+
+def large_config():
+    """Config with long quality gate lists"""
+    gates = [f"gate_{i}" for i in range(GATE_COUNT)]
+    return {
+        'version': "1.0",
+        'subagent': {'max_concurrent': 8, 'timeout': 1800, 'model': "claude-sonnet-4"},
+        'quality_gates': {'pre_commit': gates, 'epic_complete': gates, 'pre_merge': gates},
+        'git': {'worktree_base': ".aedt/worktrees", 'branch_prefix': "epic", 'auto_cleanup': True},
+        'state': {'backend': "sqlite", 'sqlite_path': ".aedt/state.db"},
+    }
+
+
+def test_config_validation_benchmark(count_calls):
+    """Compare per-document validation cost for a large config
+
+    Asserts the compiled validator makes no call per gate entry.
+    """
+    data = large_config()
+    validator = AEDT_CONFIG_SCHEMA.compile()
+
+    assert isinstance(validator.validate(data), AEDTConfig)
+    assert isinstance(interpret(AEDT_CONFIG_SCHEMA, data), AEDTConfig)
+
+    compile_time = min(timeit.repeat(AEDT_CONFIG_SCHEMA.compile, number=100, repeat=3)) / 100
+    compiled_time = min(timeit.repeat(lambda: validator.validate(data), number=REPEAT, repeat=3))
+    interpreted_time = min(timeit.repeat(lambda: interpret(AEDT_CONFIG_SCHEMA, data),
+                                         number=REPEAT, repeat=3))
+
+    per_compiled = compiled_time / REPEAT * 1e3
+    per_interpreted = interpreted_time / REPEAT * 1e3
+    print(f"\nconfig with {3 * GATE_COUNT} gate entries")
+    print(f"compile once:       {compile_time * 1e6:8.1f} us")
+    print(f"interpreted schema: {per_interpreted:8.3f} ms/validation")
+    print(f"compiled schema:    {per_compiled:8.3f} ms/validation "
+          f"({interpreted_time / compiled_time:.1f}x)")
+
+    # Gate lists are checked without a call per element
+    compiled_calls = count_calls(lambda: validator.validate(data))
+    interpreted_calls = count_calls(lambda: interpret(AEDT_CONFIG_SCHEMA, data))
+    print(f"calls per validation: interpreted {interpreted_calls}, compiled {compiled_calls}")
+    assert compiled_calls < GATE_COUNT < interpreted_calls
@@ -0,0 +1,90 @@
+"""Benchmark: JSON-lines formatter vs text formatter throughput
+
+Run with output visible:
+    pytest tests/benchmarks/test_log_formatter_benchmark.py -s
+"""
+
+import json
+import logging
+import pytest
+import timeit
+
+from aedt.core.logger import TEXT_DATEFMT, TEXT_FORMAT, JSONLinesFormatter
+
+pytestmark = pytest.mark.slow
+
+RECORDS = 50_000
+
+
+class NaiveJSONFormatter(logging.Formatter):
+    """Baseline: build and serialize the whole dict, context included, per record"""
+
+    default_time_format = "%Y-%m-%dT%H:%M:%S"
+    default_msec_format = "%s.%03d"
+
+    def __init__(self, **context):
+        super().__init__()
+        self.context = context
+
+    def format(self, record):
+        payload = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            **self.context,
+            'message': record.getMessage(),
+        }
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def make_record(i):
+    return logging.LogRecord("aedt.Project.epic.7", logging.INFO, __file__, 0,
+                             "story %s finished in %.2fs", (f"7-{i % 9}", i / 1000), None)
+
+
+def records_per_sec(formatter, records):
+    def run():
+        for record in records:
+            formatter.format(record)
+
+    return len(records) / min(timeit.repeat(run, number=1, repeat=3))
+
+
+def test_log_formatter_benchmark():
+    """Compare records/sec of the text, naive JSON and JSON-lines formatters
+
+    Asserts the JSON-lines output matches the naive formatter's.
+    """
+    records = [make_record(i) for i in range(RECORDS)]
+    context = {'project': "Project", 'epic_id': "7", 'agent_id': "agent-3"}
+
+    json_formatter = JSONLinesFormatter(**context)
+    naive_formatter = NaiveJSONFormatter(**context)
+    assert json.loads(json_formatter.format(records[1])) == {
+        'ts': json.loads(json_formatter.format(records[1]))['ts'],
+        'level': "INFO",
+        'logger': "aedt.Project.epic.7",
+        **context,
+        'message': "story 7-1 finished in 0.00s",
+    }
+
+    text_rate = records_per_sec(logging.Formatter(TEXT_FORMAT, datefmt=TEXT_DATEFMT), records)
+    naive_rate = records_per_sec(naive_formatter, records)
+    json_rate = records_per_sec(json_formatter, records)
+
+    print(f"\n{RECORDS} records")
+    print(f"text formatter:       {text_rate:10.0f} records/sec")
+    print(f"naive JSON formatter: {naive_rate:10.0f} records/sec")
+    print(f"JSON-lines formatter: {json_rate:10.0f} records/sec "
+          f"({json_rate / text_rate:.2f}x text)")
+
+    # Same documents as serializing the whole dict per record, also across
+    # the seconds boundaries where the cached timestamp is rebuilt
+    start = records[0].created
+    for i, record in enumerate(records[:1000]):
+        record.created = start + i * 0.037
+        record.msecs = int((record.created - int(record.created)) * 1000) + 0.0
+        document = json_formatter.format(record)
+        assert json.loads(document)['ts'] == naive_formatter.formatTime(record)
+        assert document == json.dumps(json.loads(naive_formatter.format(record)),
+                                      ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,78 @@
+"""Benchmark: indexed log query vs full scan
+
+Generates JSON-lines epic logs (AEDT_LOG_BENCH_MB in total, default 16) and
+looks for one agent's ERROR records. For multi-GB log sets:
+    AEDT_LOG_BENCH_MB=4096 pytest tests/benchmarks/test_log_index_benchmark.py -s
+"""
+
+import logging
+import os
+import pytest
+import time
+
+from aedt.core.log_index import IndexedRotatingFileHandler, LogQuery, QueryStats, query_log
+from aedt.core.logger import JSONLinesFormatter
+
+pytestmark = pytest.mark.slow
+
+TOTAL_MB = int(os.environ.get("AEDT_LOG_BENCH_MB", "16"))
+EPICS = 8
+AGENTS = 8
+RECORDS_PER_AGENT_RUN = 5000  # Records an agent writes before the next one takes over
+RECORD_BYTES = 190  # Approximate size of one generated line
+
+
+def generate_logs(epics_dir):
+    """Write the epic logs through the indexing handler"""
+    records_per_epic = TOTAL_MB * 1024 * 1024 // RECORD_BYTES // EPICS
+    segment_bytes = max(1024 * 1024, TOTAL_MB * 1024 * 1024 // EPICS // 4)
+    log_files = []
+    for epic in range(EPICS):
+        log_file = epics_dir / f"epic-{epic}.log"
+        handler = IndexedRotatingFileHandler(
+            log_file, maxBytes=segment_bytes, backupCount=10, encoding='utf-8'
+        )
+        formatter = JSONLinesFormatter(project="bench", epic_id=str(epic))
+        handler.setFormatter(formatter)
+        name = f"aedt.bench.epic.{epic}"
+        for i in range(records_per_epic):
+            if i % RECORDS_PER_AGENT_RUN == 0:
+                formatter.bind(agent_id=f"agent-{(epic + i // RECORDS_PER_AGENT_RUN) % AGENTS}")
+            level = logging.ERROR if i % 97 == 0 else logging.INFO
+            record = logging.LogRecord(name, level, __file__, 0,
+                                       "story %s step %d finished with status %s",
+                                       (f"{epic}-{i % 13}", i, "ok"), None)
+            handler.handle(record)
+        handler.close()
+        log_files.append(log_file)
+    return log_files
+
+
+def run_query(log_files, query, use_index):
+    stats = QueryStats()
+    start = time.perf_counter()
+    count = sum(1 for log_file in log_files for _ in query_log(log_file, query, stats, use_index))
+    return count, time.perf_counter() - start, stats
+
+
+def test_log_index_benchmark(tmp_path):
+    """Indexed query must return the same records while reading less"""
+    log_files = generate_logs(tmp_path)
+    total_bytes = sum(path.stat().st_size for path in tmp_path.glob("epic-*.log*")
+                      if not path.name.endswith(".idx"))
+    query = LogQuery(min_level=logging.ERROR, agent_id="agent-3")
+
+    indexed_count, indexed_time, indexed_stats = run_query(log_files, query, use_index=True)
+    scan_count, scan_time, scan_stats = run_query(log_files, query, use_index=False)
+
+    print(f"\nLog index benchmark ({total_bytes / 1024 / 1024:.0f}MB, {EPICS} epics, "
+          f"{AGENTS} agents):")
+    print(f"  full scan : {scan_time * 1000:8.1f} ms, {scan_stats.bytes_read / 1024 / 1024:8.1f} MB read")
+    print(f"  indexed   : {indexed_time * 1000:8.1f} ms, "
+          f"{indexed_stats.bytes_read / 1024 / 1024:8.1f} MB read, "
+          f"{indexed_stats.blocks_skipped} blocks skipped")
+    print(f"  speedup   : {scan_time / indexed_time:.1f}x ({indexed_count} records)")
+
+    assert indexed_count == scan_count > 0
+    assert indexed_stats.blocks_skipped > 0
+    assert indexed_stats.bytes_read < scan_stats.bytes_read / 4
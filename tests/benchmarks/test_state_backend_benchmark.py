@@ -0,0 +1,120 @@
+"""Benchmark: SQLite state backend vs file backend
+
+Run with output visible:
+    pytest tests/benchmarks/test_state_backend_benchmark.py -s
+"""
+
+import pytest
+import tempfile
+import shutil
+import time
+from pathlib import Path
+
+from aedt.core.data_store import DataStore
+from aedt.core.state_manager import StateManager, EpicState, ProjectState
+
+pytestmark = pytest.mark.slow
+
+PROJECT_COUNT = 100
+EPICS_PER_PROJECT = 10
+
+
+@pytest.fixture
+def temp_dir():
+    """Create temporary directory for benchmarks"""
+    tmp_dir = Path(tempfile.mkdtemp())
+    yield tmp_dir
+    # Cleanup
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+
+
+def build_projects():
+    """Build benchmark project states"""
+    statuses = ["queued", "completed", "failed", "paused"]
+    return [
+        ProjectState(
+            project_id=f"proj-{p:05d}",
+            project_name=f"Project{p:05d}",
+            epics={
+                str(e): EpicState(
+                    epic_id=str(e),
+                    status=statuses[(p + e) % len(statuses)],
+                    progress=float(e * 10),
+                    agent_id=f"agent-{(p * EPICS_PER_PROJECT + e) % 50}",
+                    completed_stories=[f"{e}-{s}" for s in range(5)]
+                )
+                for e in range(EPICS_PER_PROJECT)
+            }
+        )
+        for p in range(PROJECT_COUNT)
+    ]
+
+
+def timed(func):
+    """Run func and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def test_state_backend_benchmark(temp_dir, monkeypatch):
+    """Compare write, full load and cross-project query for both backends
+
+    Asserts the cold query reads every status.yaml with the file backend and none with SQLite.
+    """
+    projects = build_projects()
+    results = {}
+    files_read = {}
+
+    reads = []
+    original_read_bytes = Path.read_bytes
+
+    def counting_read_bytes(path):
+        reads.append(path)
+        return original_read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", counting_read_bytes)
+
+    for backend in ("file", "sqlite"):
+        base_dir = temp_dir / backend
+        data_store = DataStore(base_dir)
+        manager = StateManager(base_dir, data_store, backend=backend)
+
+        if backend == "sqlite":
+            _, write_time = timed(lambda: manager.sqlite_store.upsert_projects(projects))
+        else:
+            _, write_time = timed(
+                lambda: [manager.save_project_state(p) for p in projects]
+            )
+
+        fresh = StateManager(base_dir, data_store, backend=backend)
+        loaded, load_time = timed(fresh.load_all_states)
+        assert len(loaded) == PROJECT_COUNT
+
+        # A cold cross-project query: the file backend must load everything first
+        cold = StateManager(base_dir, data_store, backend=backend)
+
+        def query():
+            if backend == "file":
+                cold.load_all_states()
+            return cold.query_epics(agent_id="agent-7")
+
+        reads.clear()
+        matches, query_time = timed(query)
+        files_read[backend] = len(reads)
+        assert len(matches) == PROJECT_COUNT * EPICS_PER_PROJECT // 50
+
+        results[backend] = (write_time, load_time, query_time)
+        for m in (manager, fresh, cold):
+            m.close()
+
+    print(f"\n{PROJECT_COUNT} projects x {EPICS_PER_PROJECT} epics")
+    print(f"{'backend':<8} {'write':>10} {'load':>10} {'query':>10} {'files read':>11}")
+    for backend, (write_time, load_time, query_time) in results.items():
+        print(f"{backend:<8} {write_time:>9.3f}s {load_time:>9.3f}s {query_time:>9.3f}s "
+              f"{files_read[backend]:>11}")
+
+    # The indexed query reads no status.yaml; the file backend reads them all
+    assert files_read["file"] >= PROJECT_COUNT
+    assert files_read["sqlite"] == 0
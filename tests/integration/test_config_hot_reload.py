@@ -1,8 +1,10 @@
 """Integration tests for ConfigManager hot reload functionality"""
 
 import pytest
+import os
 import time
 import yaml
+from dataclasses import replace
 from pathlib import Path
 from aedt.core.config_manager import ConfigManager
 
@@ -82,6 +84,39 @@ class TestConfigHotReload:
         # Cleanup
         config_mgr.stop_watching()
 
+    def test_hot_reload_atomic_save_and_burst(self, tmp_path, monkeypatch):
+        """Test atomic-save editors are picked up and bursts reload once"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config_mgr.load()
+
+        parsed = []
+        original_parse = config_mgr._parse_content
+        monkeypatch.setattr(config_mgr, "_parse_content",
+                            lambda content: parsed.append(1) or original_parse(content))
+        config_mgr.enable_hot_reload(debounce=0.2)
+
+        try:
+            # Act - editor writes a temp file, then renames it over config.yaml
+            content = config_path.read_text(encoding='utf-8')
+            tmp_file = config_path.parent / ".config.yaml.tmp"
+            for value in (6, 7, 8):
+                tmp_file.write_text(
+                    content.replace("max_concurrent: 5", f"max_concurrent: {value}"),
+                    encoding='utf-8'
+                )
+                os.replace(tmp_file, config_path)
+
+            time.sleep(0.8)
+
+            # Assert
+            assert config_mgr.config.subagent.max_concurrent == 8
+            assert len(parsed) == 1
+        finally:
+            config_mgr.stop_watching()
+
     def test_full_config_lifecycle(self, tmp_path):
         """Test complete configuration lifecycle: init -> load -> modify -> save -> reload"""
         # Step 1: Initialize
@@ -94,8 +129,11 @@ class TestConfigHotReload:
         assert config.subagent.max_concurrent == 5
 
         # Step 3: Modify
-        config.subagent.max_concurrent = 8
-        config.git.branch_prefix = "feature"
+        config = replace(
+            config,
+            subagent=replace(config.subagent, max_concurrent=8),
+            git=replace(config.git, branch_prefix="feature")
+        )
 
         # Step 4: Save
         config_mgr.save_config(config)
@@ -200,7 +238,7 @@ class TestConfigHotReload:
 
         config = config_mgr.load()
         assert config.subagent.max_concurrent == 5
-        assert config.quality_gates.pre_commit == ['lint']
+        assert config.quality_gates.pre_commit == ('lint',)
 
     def test_concurrent_access_safe(self, tmp_path):
         """Test that config manager is safe for concurrent access"""
@@ -217,3 +255,30 @@ class TestConfigHotReload:
 
         # Assert - All values should be consistent
         assert all(v == 5 for v in values)
+
+    def test_save_config_does_not_trigger_own_reload(self, tmp_path, monkeypatch):
+        """Test the watcher event of our own save does not re-parse the file"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config = config_mgr.load()
+        config_mgr.enable_hot_reload(debounce=0.05)
+
+        parsed = []
+        original_parse = config_mgr._parse_content
+        monkeypatch.setattr(config_mgr, "_parse_content",
+                            lambda content: parsed.append(1) or original_parse(content))
+
+        try:
+            # Act
+            config_mgr.save_config(
+                replace(config, subagent=replace(config.subagent, max_concurrent=9))
+            )
+            time.sleep(0.5)
+
+            # Assert
+            assert parsed == []
+            assert config_mgr.get('subagent.max_concurrent') == 9
+        finally:
+            config_mgr.stop_watching()
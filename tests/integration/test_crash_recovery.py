@@ -378,3 +378,103 @@ def test_no_state_loss_during_rapid_updates(temp_dir):
     recovered_epic = recovered_states["test-001"].epics["epic-1"]
     # Should have final or near-final progress (atomic writes guarantee integrity)
     assert recovered_epic.progress >= final_progress - 10.0
+
+
+def _save_versions(state_manager, count):
+    """Save a project several times, creating one backup per save"""
+    project = ProjectState(
+        project_id="proj-001",
+        project_name="Project1",
+        epics={"1": EpicState(epic_id="1", status="developing", progress=0.0)}
+    )
+    state_manager.save_project_state(project)
+    for i in range(1, count + 1):
+        time.sleep(0.01)
+        state_manager.update_epic_state("proj-001", "1", progress=float(i * 10))
+
+
+def test_recovery_skips_corrupt_backups(temp_dir):
+    """Test recovery picks the newest backup whose digest still matches"""
+    data_store = DataStore(temp_dir)
+    _save_versions(StateManager(temp_dir, data_store), 3)
+
+    state_file = temp_dir / "projects" / "Project1" / "status.yaml"
+    state_file.write_text("corrupted: [", encoding='utf-8')
+
+    # Corrupt the newest backup in a way that still parses
+    backups = data_store.list_backups(state_file)
+    assert len(backups) == 3
+    newest = backups[0]
+    newest.write_text(newest.read_text(encoding='utf-8').replace("20.0", "99.0"),
+                      encoding='utf-8')
+
+    manager = StateManager(temp_dir, data_store)
+    projects = manager.load_all_states()
+
+    # Second newest backup holds progress 10.0; crash recovery applied to it
+    epic = projects["proj-001"].epics["1"]
+    assert epic.progress == 10.0
+    assert epic.status == "paused"
+
+    report = manager.recovery_reports[-1]
+    assert report.succeeded
+    assert report.recovered_from == str(backups[1])
+    assert report.corrupt_backups == [str(newest)]
+    assert report.latency_ms >= 0
+
+
+def test_recovery_verifies_large_backups_concurrently(temp_dir, monkeypatch):
+    """Test concurrent verification path picks the same candidate"""
+    monkeypatch.setattr(StateManager, "PARALLEL_VERIFY_THRESHOLD", 0)
+    data_store = DataStore(temp_dir)
+    _save_versions(StateManager(temp_dir, data_store), 3)
+
+    state_file = temp_dir / "projects" / "Project1" / "status.yaml"
+    state_file.write_text("corrupted: [", encoding='utf-8')
+    backups = data_store.list_backups(state_file)
+    backups[0].write_bytes(b"")
+
+    manager = StateManager(temp_dir, data_store)
+    projects = manager.load_all_states()
+
+    assert projects["proj-001"].epics["1"].progress == 10.0
+    report = manager.recovery_reports[-1]
+    assert report.candidates_checked == 3
+    assert report.recovered_from == str(backups[1])
+
+
+def test_recovery_reports_failure_when_no_backup_usable(temp_dir):
+    """Test recovery gives up when every backup is corrupt"""
+    data_store = DataStore(temp_dir)
+    _save_versions(StateManager(temp_dir, data_store), 2)
+
+    state_file = temp_dir / "projects" / "Project1" / "status.yaml"
+    state_file.write_text("corrupted: [", encoding='utf-8')
+    for backup in data_store.list_backups(state_file):
+        backup.write_text("garbage", encoding='utf-8')
+
+    manager = StateManager(temp_dir, data_store)
+
+    assert manager.load_all_states() == {}
+    assert not manager.recovery_reports[-1].succeeded
+
+
+def test_recovery_tolerates_backups_removed_meanwhile(temp_dir, monkeypatch):
+    """Test a backup pruned during recovery is skipped and reports do not pile up"""
+    monkeypatch.setattr(StateManager, "PARALLEL_VERIFY_THRESHOLD", 0)
+    data_store = DataStore(temp_dir)
+    _save_versions(StateManager(temp_dir, data_store), 3)
+
+    state_file = temp_dir / "projects" / "Project1" / "status.yaml"
+    state_file.write_text("corrupted: [", encoding='utf-8')
+    backups = data_store.list_backups(state_file)
+    pruned = backups[0]
+    pruned.unlink()
+    monkeypatch.setattr(data_store, "list_backups", lambda path: [pruned, *backups[1:]])
+
+    manager = StateManager(temp_dir, data_store)
+    for _ in range(3):
+        projects = manager.load_all_states()
+        assert projects["proj-001"].epics["1"].progress == 10.0
+    assert len(manager.recovery_reports) == 1
+    assert manager.recovery_reports[0].recovered_from == str(backups[1])
@@ -3,6 +3,7 @@
 import pytest
 import tempfile
 import shutil
+import time
 from pathlib import Path
 
 from aedt.core.data_store import DataStore
@@ -332,3 +333,35 @@ def test_multiple_projects_persistence(temp_dir):
     assert loaded_states["proj-a"].project_name == "ProjectA"
     assert len(loaded_states["proj-b"].epics) == 2
     assert loaded_states["proj-c"].epics["epic-1"].status == "failed"
+
+
+def test_auto_reload_debounces_burst_of_writes(temp_dir):
+    """Test watcher-driven reload coalesces a burst of writes into one event"""
+    data_store = DataStore(temp_dir)
+    watcher = StateManager(temp_dir, data_store)
+    writer = StateManager(temp_dir, data_store)
+
+    project = ProjectState(
+        project_id="proj-001",
+        project_name="Project1",
+        epics={"1": EpicState(epic_id="1", status="queued", progress=0.0)}
+    )
+    writer.save_project_state(project)
+    watcher.load_all_states()
+
+    events = []
+    watcher.add_change_listener(lambda pid, state: events.append(state.epics["1"].progress))
+    watcher.enable_auto_reload(debounce=0.2)
+
+    try:
+        # Burst of writes from another process
+        for progress in range(10, 60, 10):
+            writer.update_epic_state("proj-001", "1", status="developing",
+                                     progress=float(progress))
+
+        time.sleep(1.0)
+
+        assert events == [50.0]
+        assert watcher.get_project_state("proj-001").epics["1"].progress == 50.0
+    finally:
+        watcher.close()
@@ -1,9 +1,19 @@
 """Unit tests for CLI commands"""
 
 import pytest
+import subprocess
+import sys
 from click.testing import CliRunner
 from pathlib import Path
 from aedt.cli.main import cli
+from aedt.core.logger import AEDTLogger
+
+# Cumulative import time budget for aedt.cli.main (about 100 ms locally,
+# with headroom for slow CI); heavy imports are caught by the sys.modules checks
+STARTUP_BUDGET_MS = 250
+
+# Only needed by the commands or services that use them
+LAZY_MODULES = ["watchdog", "http.server", "multiprocessing.connection", "sqlite3", "pickle"]
 
 
 class TestCLI:
@@ -148,3 +158,127 @@ class TestCLI:
         finally:
             # Cleanup - restore permissions
             aedt_dir.chmod(0o755)
+
+
+class TestLogsCommand:
+    """Test suite for the logs command"""
+
+    @pytest.fixture
+    def log_tree(self, tmp_path, monkeypatch):
+        """Write global and epic logs under tmp_path/.aedt"""
+        monkeypatch.chdir(tmp_path)
+        aedt_logger = AEDTLogger(tmp_path / ".aedt" / "logs", log_format="json")
+        aedt_logger.global_logger.error("global failure")
+        epic1 = aedt_logger.get_epic_logger("demo", "1", agent_id="agent-1")
+        epic1.info("epic 1 progress")
+        epic1.error("epic 1 timeout")
+        epic2 = aedt_logger.get_epic_logger("demo", "2", agent_id="agent-2")
+        epic2.error("epic 2 timeout")
+        aedt_logger.close()
+        return tmp_path
+
+    def test_logs_filters_by_level(self, log_tree):
+        """Test --level shows only records at or above it"""
+        result = CliRunner().invoke(cli, ['logs', '--level', 'error'])
+
+        assert result.exit_code == 0
+        assert "global failure" in result.output
+        assert "epic 1 timeout" in result.output
+        assert "epic 2 timeout" in result.output
+        assert "epic 1 progress" not in result.output
+
+    def test_logs_filters_by_epic_agent_and_pattern(self, log_tree):
+        """Test --epic, --agent and --grep narrow the results"""
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ['logs', '--project', 'demo', '--epic', '1'])
+        assert "epic 1 progress" in result.output
+        assert "epic 2" not in result.output
+        assert "global failure" not in result.output
+
+        result = runner.invoke(cli, ['logs', '--agent', 'agent-2'])
+        assert result.output.strip().count("\n") == 0
+        assert "epic 2 timeout" in result.output
+
+        result = runner.invoke(cli, ['logs', '--grep', 'time.ut', '-n', '1'])
+        assert result.output.count("timeout") == 1
+
+    def test_logs_project_excludes_global_log(self, log_tree):
+        """Test --project shows only that project's epic logs"""
+        result = CliRunner().invoke(cli, ['logs', '--project', 'demo'])
+
+        assert result.exit_code == 0
+        assert "epic 1 timeout" in result.output
+        assert "epic 2 timeout" in result.output
+        assert "global failure" not in result.output
+        assert '"logger":"aedt",' not in result.output
+
+    def test_logs_rejects_invalid_time(self, log_tree):
+        """Test an unparsable --since is a usage error"""
+        result = CliRunner().invoke(cli, ['logs', '--since', 'yesterday'])
+
+        assert result.exit_code == 2
+        assert "无效的时间" in result.output
+
+    def test_logs_follow_prints_recent_records(self, log_tree, monkeypatch):
+        """Test -f starts with the latest matching records of all logs"""
+        import threading
+        from aedt.core import log_follow
+        from aedt.core.log_follow import follow_logs
+
+        stop = threading.Event()
+        stop.set()
+        monkeypatch.setattr(log_follow, 'follow_logs',
+                            lambda *args, **kwargs: follow_logs(*args, stop=stop, **kwargs))
+
+        result = CliRunner().invoke(cli, ['logs', '-f', '--level', 'ERROR', '-n', '2'])
+
+        assert result.exit_code == 0
+        assert "global failure" not in result.output
+        assert "epic 1 timeout" in result.output
+        assert "epic 2 timeout" in result.output
+
+    def test_logs_without_log_files(self, tmp_path, monkeypatch):
+        """Test a directory without logs reports it"""
+        monkeypatch.chdir(tmp_path)
+
+        result = CliRunner().invoke(cli, ['logs'])
+
+        assert result.exit_code == 0
+        assert "未找到日志文件" in result.output
+
+
+class TestStartup:
+    """Import-time regression tests for the CLI entry point"""
+
+    def run_python(self, code):
+        """Run code in a fresh interpreter and return (stdout, stderr)"""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parents[2]
+        )
+        return result.stdout, result.stderr
+
+    @pytest.mark.parametrize("module", LAZY_MODULES)
+    def test_cli_import_does_not_load_module(self, module):
+        """Test importing the CLI does not import modules only some commands need"""
+        stdout, _ = self.run_python(
+            f"import sys, aedt.cli.main; print({module!r} in sys.modules)"
+        )
+
+        assert stdout.strip() == "False"
+
+    def test_cli_import_within_budget(self):
+        """Test cumulative import time of aedt.cli.main stays within budget"""
+        _, stderr = self.run_python("import aedt.cli.main")
+
+        # -X importtime lines: "import time: self [us] | cumulative | name"
+        cumulative_us = None
+        for line in stderr.splitlines():
+            parts = [part.strip() for part in line.split("|")]
+            if len(parts) == 3 and parts[2] == "aedt.cli.main":
+                cumulative_us = int(parts[1])
+
+        assert cumulative_us is not None
+        assert cumulative_us / 1000 < STARTUP_BUDGET_MS
@@ -1,7 +1,13 @@
 """Unit tests for ConfigManager"""
 
+import aedt
+import dataclasses
+import hashlib
 import pytest
+import os
+import re
 import tempfile
+import threading
 import yaml
 import time
 from pathlib import Path
@@ -11,8 +17,21 @@ from aedt.core.config_manager import (
     SubagentConfig,
     QualityGatesConfig,
     GitConfig,
-    ConfigFileHandler
+    StateConfig,
+    flatten_config,
+    merge_config_layers,
+    env_config_layer,
+    ConfigChange,
+    diff_configs
 )
+from aedt.core.config_schema import SchemaValidationError
+from aedt.core.file_watcher import get_watcher_service
+
+
+def backdate(path, seconds=10):
+    """Move a file's mtime into the past (outside the cache racy window)"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1_000_000_000))
 
 
 class TestConfigManager:
@@ -208,6 +227,38 @@ class TestConfigManager:
         assert worktree_base == ".aedt/worktrees"
         assert nonexistent == 99
 
+    def test_get_section_and_missing_keys(self, tmp_path):
+        """Test get returns section objects and defaults for unknown keys"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+
+        # Act & Assert
+        assert isinstance(config_mgr.get('subagent'), SubagentConfig)
+        assert config_mgr.get('subagent.unknown', 'fallback') == 'fallback'
+        assert config_mgr.get('unknown.nested.key') is None
+
+    def test_get_lookup_rebuilt_on_reload(self, tmp_path):
+        """Test get reflects the new config after reload"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        assert config_mgr.get('subagent.max_concurrent') == 5
+
+        config_path.write_text(
+            config_path.read_text(encoding='utf-8').replace("max_concurrent: 5", "max_concurrent: 9"),
+            encoding='utf-8'
+        )
+
+        # Act
+        config_mgr.reload_config()
+
+        # Assert
+        assert config_mgr.get('subagent.max_concurrent') == 9
+        assert config_mgr.get('subagent') is config_mgr.config.subagent
+
     def test_save_config(self, tmp_path):
         """Test saving configuration to file"""
         # Arrange
@@ -217,8 +268,11 @@ class TestConfigManager:
         config = config_mgr.load()
 
         # Modify config
-        config.subagent.max_concurrent = 10
-        config.git.auto_cleanup = False
+        config = dataclasses.replace(
+            config,
+            subagent=dataclasses.replace(config.subagent, max_concurrent=10),
+            git=dataclasses.replace(config.git, auto_cleanup=False)
+        )
 
         # Act
         config_mgr.save_config(config)
@@ -259,6 +313,49 @@ class TestConfigManager:
         with pytest.raises(ValueError, match="没有配置可保存"):
             config_mgr.save_config()
 
+    def test_save_config_publishes_without_reparse(self, tmp_path, monkeypatch):
+        """Test save_config publishes the saved config and its file hash"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config = config_mgr.load()
+        changes = []
+        config_mgr.subscribe('subagent', changes.extend)
+        monkeypatch.setattr(config_mgr, "_parse_content",
+                            lambda content: pytest.fail("save_config must not re-parse"))
+
+        # Act
+        config_mgr.save_config(dataclasses.replace(
+            config, subagent=dataclasses.replace(config.subagent, max_concurrent=11)
+        ))
+
+        # Assert
+        assert config_mgr.get('subagent.max_concurrent') == 11
+        assert config_mgr.snapshot().content_hash == hashlib.sha256(
+            config_path.read_bytes()).hexdigest()
+        assert config_mgr.reload_config() is False
+        assert changes == [ConfigChange('subagent.max_concurrent', 5, 11)]
+        assert [p.name for p in config_path.parent.iterdir() if p.suffix == '.tmp'] == []
+
+    def test_save_config_rejects_invalid_config(self, tmp_path):
+        """Test an invalid config is neither written nor published"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config = config_mgr.load()
+        original = config_path.read_bytes()
+        before = config_mgr.snapshot()
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="max_concurrent 必须大于 0"):
+            config_mgr.save_config(dataclasses.replace(
+                config, subagent=dataclasses.replace(config.subagent, max_concurrent=0)
+            ))
+        assert config_path.read_bytes() == original
+        assert config_mgr.snapshot() is before
+
     def test_validate_empty_config(self, tmp_path):
         """Test validation fails for empty config file"""
         # Arrange
@@ -419,6 +516,94 @@ class TestConfigManager:
         with pytest.raises(ValueError, match="pre_commit 必须是列表类型"):
             config_mgr.load()
 
+    def test_state_backend_defaults_when_section_missing(self, tmp_path):
+        """Test that the optional state section falls back to the file backend"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        config_data = {
+            'version': '1.0',
+            'subagent': {},
+            'quality_gates': {},
+            'git': {}
+        }
+        with open(config_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config_data, f)
+
+        # Act
+        config = ConfigManager(config_path=config_path).load()
+
+        # Assert
+        assert config.state.backend == "file"
+
+    def test_state_backend_sqlite_selectable(self, tmp_path):
+        """Test selecting the sqlite state backend in config.yaml"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config = config_mgr.load()
+        config_mgr.save_config(dataclasses.replace(
+            config, state=dataclasses.replace(config.state, backend="sqlite")
+        ))
+
+        # Act
+        reloaded = ConfigManager(config_path=config_path).load()
+
+        # Assert
+        assert reloaded.state.backend == "sqlite"
+        assert reloaded.state.sqlite_path == ".aedt/state.db"
+
+    def test_validate_invalid_state_backend(self, tmp_path):
+        """Test validation fails for unknown state backend"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        config_data = {
+            'version': '1.0',
+            'subagent': {},
+            'quality_gates': {},
+            'git': {},
+            'state': {'backend': 'redis'}
+        }
+        with open(config_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config_data, f)
+
+        config_mgr = ConfigManager(config_path=config_path)
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="state.backend 必须是"):
+            config_mgr.load()
+
+    def test_validate_reports_all_errors(self, tmp_path):
+        """Test validation reports every invalid field at once"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        config_data = {
+            'version': '1.0',
+            'subagent': {'max_concurrent': 0, 'timeout': 'long'},
+            'quality_gates': {'pre_commit': 'lint'},
+            'git': {'auto_clean': True}
+        }
+        with open(config_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config_data, f)
+
+        config_mgr = ConfigManager(config_path=config_path)
+
+        # Act
+        with pytest.raises(SchemaValidationError) as exc_info:
+            config_mgr.load()
+
+        # Assert
+        assert [error.path for error in exc_info.value.errors] == [
+            'subagent.max_concurrent',
+            'subagent.timeout',
+            'quality_gates.pre_commit',
+            'git.auto_clean',
+        ]
+        assert str(config_path) in str(exc_info.value)
+
     def test_reload_config(self, tmp_path):
         """Test reloading configuration"""
         # Arrange
@@ -461,6 +646,171 @@ class TestConfigManager:
         # Assert - old config should be preserved
         assert config_mgr.config.subagent.max_concurrent == old_max_concurrent
 
+    def test_reload_config_skips_unchanged_content(self, tmp_path, monkeypatch):
+        """Test reload_config does not re-parse identical content"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config_mgr.load()
+
+        parsed = []
+        original_parse = config_mgr._parse_content
+        monkeypatch.setattr(config_mgr, "_parse_content",
+                            lambda content: parsed.append(1) or original_parse(content))
+
+        # Act - touch without changing content
+        config_path.write_text(config_path.read_text(encoding='utf-8'), encoding='utf-8')
+        reloaded = config_mgr.reload_config()
+
+        # Assert
+        assert reloaded is False
+        assert parsed == []
+
+    def test_reload_config_reports_latency(self, tmp_path):
+        """Test reload_config records reload latency"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config_mgr.load()
+        config_path.write_text(
+            config_path.read_text(encoding='utf-8').replace("max_concurrent: 5", "max_concurrent: 7"),
+            encoding='utf-8'
+        )
+
+        # Act
+        reloaded = config_mgr.reload_config()
+
+        # Assert
+        assert reloaded is True
+        assert config_mgr.config.subagent.max_concurrent == 7
+        assert config_mgr.last_reload_latency_ms is not None
+        assert config_mgr.last_reload_latency_ms >= 0
+
+    def test_snapshot_is_replaced_not_mutated(self, tmp_path):
+        """Test reload publishes a new snapshot and leaves the old one intact"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config_mgr.load()
+        before = config_mgr.snapshot()
+        config_path.write_text(
+            config_path.read_text(encoding='utf-8').replace("max_concurrent: 5", "max_concurrent: 7"),
+            encoding='utf-8'
+        )
+
+        # Act
+        config_mgr.reload_config()
+        after = config_mgr.snapshot()
+
+        # Assert
+        assert after is not before
+        assert after.generation == before.generation + 1
+        assert before.get('subagent.max_concurrent') == 5
+        assert after.get('subagent.max_concurrent') == 7
+        assert after.config is config_mgr.config
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            after.config = None
+        with pytest.raises(TypeError):
+            after.values['subagent.max_concurrent'] = 1
+
+    def test_snapshot_unchanged_on_failed_reload(self, tmp_path):
+        """Test a failed reload never publishes anything"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config_mgr.load()
+        before = config_mgr.snapshot()
+        config_path.write_text("version: 1.0\n", encoding='utf-8')
+
+        # Act
+        reloaded = config_mgr.reload_config()
+
+        # Assert
+        assert reloaded is False
+        assert config_mgr.snapshot() is before
+
+    def test_snapshot_consistent_during_concurrent_reloads(self, tmp_path):
+        """Test readers always see a config matching its own lookup table"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config_mgr.load()
+        template = config_path.read_text(encoding='utf-8')
+        stop = threading.Event()
+
+        def writer():
+            value = 1
+            while not stop.is_set():
+                value = value % 50 + 1
+                config_path.write_text(
+                    template.replace("max_concurrent: 5", f"max_concurrent: {value}"),
+                    encoding='utf-8'
+                )
+                config_mgr.reload_config()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+
+        # Act & Assert
+        try:
+            for _ in range(2000):
+                snapshot = config_mgr.snapshot()
+                assert (snapshot.get('subagent.max_concurrent')
+                        == snapshot.config.subagent.max_concurrent)
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_config_setter_waits_for_reload_in_progress(self, tmp_path):
+        """Test assigning config publishes under the lock a reload holds"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config = config_mgr.load()
+        assigned = dataclasses.replace(
+            config, subagent=dataclasses.replace(config.subagent, max_concurrent=9)
+        )
+        setter = threading.Thread(target=lambda: setattr(config_mgr, 'config', assigned))
+
+        # Act
+        with config_mgr._publish_lock:
+            setter.start()
+            setter.join(0.2)
+            still_waiting = setter.is_alive()
+            generation = config_mgr.snapshot().generation
+        setter.join(5)
+
+        # Assert
+        assert still_waiting
+        assert config_mgr.snapshot().generation == generation + 1
+        assert config_mgr.get('subagent.max_concurrent') == 9
+
+    def test_hot_reload_subscribes_to_config_file_only(self, tmp_path):
+        """Test hot reload registers a debounced config.yaml subscription"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+
+        # Act
+        config_mgr.enable_hot_reload(debounce=0.05)
+        subscription = config_mgr._subscription
+
+        # Assert
+        try:
+            assert subscription.debounce == 0.05
+            assert subscription.matches(config_path.resolve())
+            assert not subscription.matches(config_path.parent.resolve() / "other.yaml")
+        finally:
+            config_mgr.stop_watching()
+        assert subscription.active is False
+
     def test_hot_reload_enable(self, tmp_path):
         """Test enabling hot reload"""
         # Arrange
@@ -472,8 +822,8 @@ class TestConfigManager:
         config_mgr.enable_hot_reload()
 
         # Assert
-        assert config_mgr._observer is not None
-        assert config_mgr._observer.is_alive()
+        assert config_mgr._subscription is not None
+        assert get_watcher_service().is_running
 
         # Cleanup
         config_mgr.stop_watching()
@@ -490,27 +840,377 @@ class TestConfigManager:
         config_mgr.stop_watching()
 
         # Assert
-        assert config_mgr._observer is None
+        assert config_mgr._subscription is None
+        assert not get_watcher_service().is_running
 
     def test_hot_reload_enable_twice(self, tmp_path):
-        """Test that enabling hot reload twice does not create multiple observers"""
+        """Test that enabling hot reload twice does not subscribe twice"""
         # Arrange
         config_path = tmp_path / ".aedt" / "config.yaml"
         config_mgr = ConfigManager(config_path=config_path)
         config_mgr.initialize(force=False, is_global=False)
         config_mgr.enable_hot_reload()
-        first_observer = config_mgr._observer
+        first_subscription = config_mgr._subscription
 
         # Act
         config_mgr.enable_hot_reload()
 
         # Assert
-        assert config_mgr._observer is first_observer
+        assert config_mgr._subscription is first_subscription
 
         # Cleanup
         config_mgr.stop_watching()
 
 
+class TestConfigCache:
+    """Test suite for the validated config cache"""
+
+    @pytest.fixture
+    def config_path(self, tmp_path):
+        """Initialized config.yaml with an mtime outside the racy window"""
+        path = tmp_path / ".aedt" / "config.yaml"
+        ConfigManager(config_path=path).initialize(force=False, is_global=False)
+        backdate(path)
+        return path
+
+    def test_load_writes_cache_and_reuses_it(self, config_path, monkeypatch):
+        """Test a second load skips YAML parsing"""
+        # Arrange
+        first = ConfigManager(config_path=config_path).load()
+        assert ConfigManager(config_path=config_path).cache_path.exists()
+
+        def fail_parse(self, content):
+            raise AssertionError("config.yaml should not be parsed")
+
+        monkeypatch.setattr(ConfigManager, "_parse_content", fail_parse)
+        config_mgr = ConfigManager(config_path=config_path)
+
+        # Act
+        config = config_mgr.load()
+
+        # Assert
+        assert config == first
+        assert config_mgr.get('subagent.max_concurrent') == 5
+        assert config_mgr.snapshot().content_hash is not None
+
+    def test_cache_invalidated_by_content_change(self, config_path):
+        """Test a modified config.yaml is parsed again"""
+        # Arrange
+        ConfigManager(config_path=config_path).load()
+        config_path.write_text(
+            config_path.read_text(encoding='utf-8').replace("max_concurrent: 5", "max_concurrent: 12"),
+            encoding='utf-8'
+        )
+        backdate(config_path)
+
+        # Act
+        config = ConfigManager(config_path=config_path).load()
+
+        # Assert
+        assert config.subagent.max_concurrent == 12
+
+    def test_cache_invalidated_by_aedt_version(self, config_path, monkeypatch):
+        """Test a cache written by another aedt version is ignored"""
+        # Arrange
+        ConfigManager(config_path=config_path).load()
+        monkeypatch.setattr(aedt, "__version__", "99.0.0")
+        parsed = []
+        original_parse = ConfigManager._parse_content
+        monkeypatch.setattr(ConfigManager, "_parse_content",
+                            lambda self, content: parsed.append(1) or original_parse(self, content))
+
+        # Act
+        ConfigManager(config_path=config_path).load()
+
+        # Assert
+        assert parsed == [1]
+
+    def test_corrupt_cache_is_ignored(self, config_path):
+        """Test an unreadable cache falls back to parsing config.yaml"""
+        # Arrange
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.cache_path.write_bytes(b"not a cache")
+
+        # Act
+        config = config_mgr.load()
+
+        # Assert
+        assert config.version == "1.0"
+
+    def test_pickled_cache_is_never_loaded(self, config_path, tmp_path):
+        """Test a planted pickle in place of the cache does not run code"""
+        # Arrange
+        import pickle
+
+        marker = tmp_path / "pwned"
+
+        class Payload:
+            def __reduce__(self):
+                return (Path.touch, (marker,))
+
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.cache_path.write_bytes(pickle.dumps(Payload()))
+
+        # Act
+        config = config_mgr.load()
+
+        # Assert
+        assert config.version == "1.0"
+        assert not marker.exists()
+
+    def test_cache_with_invalid_config_is_ignored(self, config_path):
+        """Test cached data is validated again before use"""
+        # Arrange
+        ConfigManager(config_path=config_path).load()
+        config_mgr = ConfigManager(config_path=config_path)
+        header, payload = config_mgr.cache_path.read_bytes().split(b"\n", 1)
+        payload = payload.replace(b'"max_concurrent": 5', b'"max_concurrent": -1')
+        config_mgr.cache_path.write_bytes(header + b"\n" + payload)
+
+        # Act
+        config = config_mgr.load()
+
+        # Assert
+        assert config.subagent.max_concurrent == 5
+
+    def test_recently_modified_file_not_cached(self, tmp_path):
+        """Test files inside the racy timestamp window are not cached"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+
+        # Act
+        config_mgr.load()
+
+        # Assert
+        assert not config_mgr.cache_path.exists()
+
+    def test_cache_disabled(self, config_path):
+        """Test use_cache=False neither reads nor writes the cache"""
+        # Arrange
+        config_mgr = ConfigManager(config_path=config_path, use_cache=False)
+
+        # Act
+        config_mgr.load()
+
+        # Assert
+        assert not config_mgr.cache_path.exists()
+
+
+class TestLayeredConfig:
+    """Test suite for layered (global + project + env) configuration"""
+
+    @pytest.fixture
+    def layered_mgr(self, tmp_path, monkeypatch):
+        """ConfigManager with a full global config and a partial project config"""
+        for name in list(os.environ):
+            if name.startswith("AEDT_"):
+                monkeypatch.delenv(name)
+
+        global_path = tmp_path / "home" / ".aedt" / "config.yaml"
+        global_mgr = ConfigManager(config_path=global_path)
+        global_mgr.initialize(force=False, is_global=True)
+
+        project_path = tmp_path / "project" / ".aedt" / "config.yaml"
+        project_path.parent.mkdir(parents=True)
+        project_path.write_text(
+            "subagent:\n  max_concurrent: 8\ngit:\n  branch_prefix: feature\n",
+            encoding='utf-8'
+        )
+        return ConfigManager(config_path=project_path, layered=True,
+                             global_config_path=global_path)
+
+    def test_merge_config_layers(self):
+        """Test deep merge with later layers winning"""
+        base = {'subagent': {'max_concurrent': 5, 'timeout': 3600}, 'tags': ['a']}
+        override = {'subagent': {'max_concurrent': 8}, 'tags': ['b']}
+
+        merged = merge_config_layers(base, override)
+
+        assert merged == {'subagent': {'max_concurrent': 8, 'timeout': 3600}, 'tags': ['b']}
+        assert base['subagent']['max_concurrent'] == 5
+
+    def test_env_config_layer(self):
+        """Test AEDT_<SECTION>__<KEY> variables become typed overrides"""
+        environ = {
+            'AEDT_SUBAGENT__MAX_CONCURRENT': '12',
+            'AEDT_GIT__AUTO_CLEANUP': 'false',
+            'AEDT_QUALITY_GATES__PRE_COMMIT': '[lint, mypy]',
+            'AEDT_HOME': '/somewhere',  # No section separator: ignored
+            'PATH': '/usr/bin',
+        }
+
+        layer = env_config_layer(environ)
+
+        assert layer == {
+            'subagent': {'max_concurrent': 12},
+            'git': {'auto_cleanup': False},
+            'quality_gates': {'pre_commit': ['lint', 'mypy']},
+        }
+
+    def test_load_layered_priority(self, layered_mgr, monkeypatch):
+        """Test project overrides global and env overrides project"""
+        monkeypatch.setenv("AEDT_SUBAGENT__TIMEOUT", "60")
+
+        config = layered_mgr.load()
+
+        assert config.subagent.max_concurrent == 8       # project
+        assert config.subagent.timeout == 60             # env
+        assert config.subagent.model == "claude-sonnet-4"  # global
+        assert config.git.branch_prefix == "feature"     # project
+        assert config.quality_gates.pre_commit == ("lint", "format_check")  # global
+
+    def test_load_layered_cached_until_a_layer_changes(self, layered_mgr, monkeypatch):
+        """Test unchanged layers are neither re-read nor re-merged"""
+        first = layered_mgr.load_layered()
+
+        parsed = []
+        original_read_text = Path.read_text
+        monkeypatch.setattr(Path, "read_text",
+                            lambda path, *a, **kw: parsed.append(path.name)
+                            or original_read_text(path, *a, **kw))
+
+        # Nothing changed: same merged object, no file read
+        assert layered_mgr.load_layered() is first
+        assert parsed == []
+
+        # Env change: re-merge without re-reading any file
+        monkeypatch.setenv("AEDT_SUBAGENT__MAX_CONCURRENT", "3")
+        second = layered_mgr.load_layered()
+        assert second is not first
+        assert second.subagent.max_concurrent == 3
+        assert parsed == []
+
+        # Project file change: only that layer is re-read
+        layered_mgr.config_path.write_text(
+            "subagent:\n  max_concurrent: 9\n  timeout: 120\n", encoding='utf-8'
+        )
+        parsed.clear()
+        third = layered_mgr.load_layered()
+        assert third.subagent.timeout == 120
+        assert parsed == ["config.yaml"]
+
+    def test_load_layered_requires_a_config_file(self, tmp_path):
+        """Test layered load fails if neither global nor project config exists"""
+        config_mgr = ConfigManager(
+            config_path=tmp_path / "project" / ".aedt" / "config.yaml",
+            layered=True,
+            global_config_path=tmp_path / "home" / ".aedt" / "config.yaml"
+        )
+
+        with pytest.raises(FileNotFoundError, match="配置文件不存在"):
+            config_mgr.load()
+
+    def test_reload_config_layered(self, layered_mgr):
+        """Test reload_config re-merges layers and preserves config on error"""
+        layered_mgr.load()
+        assert layered_mgr.reload_config() is False
+
+        layered_mgr.config_path.write_text("subagent: [broken", encoding='utf-8')
+        assert layered_mgr.reload_config() is False
+        assert layered_mgr.config.subagent.max_concurrent == 8
+
+    def test_save_config_layered_writes_project_layer_only(self, layered_mgr, monkeypatch):
+        """Test global and env values are not copied into the project file"""
+        monkeypatch.setenv("AEDT_SUBAGENT__MAX_CONCURRENT", "42")
+        config = layered_mgr.load()
+        assert config.subagent.max_concurrent == 42
+
+        layered_mgr.save_config(dataclasses.replace(
+            config, git=dataclasses.replace(config.git, auto_cleanup=False)
+        ))
+
+        saved = yaml.safe_load(layered_mgr.config_path.read_text(encoding='utf-8'))
+        assert saved == {
+            'subagent': {'max_concurrent': 8},
+            'git': {'branch_prefix': 'feature', 'auto_cleanup': False},
+        }
+        assert layered_mgr.config.git.auto_cleanup is False
+        assert layered_mgr.config.subagent.max_concurrent == 42
+
+        monkeypatch.delenv("AEDT_SUBAGENT__MAX_CONCURRENT")
+        assert layered_mgr.load().subagent.max_concurrent == 8
+
+
+class TestConfigChangeNotifications:
+    """Test suite for config diffing and per-key subscriptions"""
+
+    def _write_max_concurrent(self, config_path, value):
+        content = config_path.read_text(encoding='utf-8')
+        config_path.write_text(
+            re.sub(r"max_concurrent: \d+", f"max_concurrent: {value}", content),
+            encoding='utf-8'
+        )
+
+    def test_diff_configs_reports_changed_leaves(self):
+        """Test diff_configs lists only differing leaf values"""
+        old = AEDTConfig(version="1.0", subagent=SubagentConfig(),
+                         quality_gates=QualityGatesConfig(), git=GitConfig())
+        new = AEDTConfig(version="1.0", subagent=SubagentConfig(max_concurrent=10),
+                         quality_gates=QualityGatesConfig(pre_commit=["lint"]),
+                         git=GitConfig())
+
+        changes = diff_configs(old, new)
+
+        assert changes == [
+            ConfigChange('quality_gates.pre_commit', (), ("lint",)),
+            ConfigChange('subagent.max_concurrent', 5, 10),
+        ]
+        assert diff_configs(old, old) == []
+
+    def test_subscribers_receive_matching_changes_only(self, tmp_path):
+        """Test subscribers are notified only for their key prefix"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config_mgr.load()
+
+        pool_changes = []
+        git_changes = []
+        all_changes = []
+        config_mgr.subscribe('subagent.max_concurrent', pool_changes.append)
+        config_mgr.subscribe('git', git_changes.append)
+        config_mgr.subscribe('', all_changes.append)
+
+        # Act
+        self._write_max_concurrent(config_path, 12)
+        config_mgr.reload_config()
+
+        # Assert
+        assert pool_changes == [[ConfigChange('subagent.max_concurrent', 5, 12)]]
+        assert git_changes == []
+        assert len(all_changes) == 1
+
+    def test_unsubscribe_and_failing_callback(self, tmp_path):
+        """Test unsubscribe stops delivery and callback errors are contained"""
+        # Arrange
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config_mgr.load()
+
+        received = []
+
+        def failing(changes):
+            raise RuntimeError("boom")
+
+        config_mgr.subscribe('subagent', failing)
+        config_mgr.subscribe('subagent', received.append)
+
+        # Act
+        self._write_max_concurrent(config_path, 6)
+        config_mgr.reload_config()
+        config_mgr.unsubscribe(received.append)
+        self._write_max_concurrent(config_path, 7)
+        config_mgr.reload_config()
+
+        # Assert
+        assert len(received) == 1
+        assert config_mgr.config.subagent.max_concurrent == 7
+
+
 class TestDataClasses:
     """Test suite for configuration data classes"""
 
@@ -524,9 +1224,9 @@ class TestDataClasses:
     def test_quality_gates_config_defaults(self):
         """Test QualityGatesConfig default values and initialization"""
         config = QualityGatesConfig()
-        assert config.pre_commit == []
-        assert config.epic_complete == []
-        assert config.pre_merge == []
+        assert config.pre_commit == ()
+        assert config.epic_complete == ()
+        assert config.pre_merge == ()
 
     def test_quality_gates_config_with_values(self):
         """Test QualityGatesConfig with provided values"""
@@ -535,9 +1235,46 @@ class TestDataClasses:
             epic_complete=['test'],
             pre_merge=['integration']
         )
-        assert config.pre_commit == ['lint']
-        assert config.epic_complete == ['test']
-        assert config.pre_merge == ['integration']
+        assert config.pre_commit == ('lint',)
+        assert config.epic_complete == ('test',)
+        assert config.pre_merge == ('integration',)
+
+    def test_config_dataclasses_are_frozen(self, tmp_path):
+        """Test the published config cannot be changed in place"""
+        config_path = tmp_path / ".aedt" / "config.yaml"
+        config_mgr = ConfigManager(config_path=config_path)
+        config_mgr.initialize(force=False, is_global=False)
+        config = config_mgr.load()
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.subagent.max_concurrent = 7
+        with pytest.raises(AttributeError):
+            config.quality_gates.pre_commit.append("extra")
+        assert config_mgr.config.subagent.max_concurrent == 5
+        assert config_mgr.get('subagent.max_concurrent') == 5
+
+    def test_state_config_defaults(self):
+        """Test StateConfig default values"""
+        config = StateConfig()
+        assert config.backend == "file"
+        assert config.sqlite_path == ".aedt/state.db"
+
+    def test_flatten_config(self):
+        """Test flatten_config produces dot-path keys for sections and leaves"""
+        config = AEDTConfig(
+            version="1.0",
+            subagent=SubagentConfig(max_concurrent=3),
+            quality_gates=QualityGatesConfig(pre_commit=["lint"]),
+            git=GitConfig()
+        )
+
+        table = flatten_config(config)
+
+        assert table['version'] == "1.0"
+        assert table['subagent'] is config.subagent
+        assert table['subagent.max_concurrent'] == 3
+        assert table['quality_gates.pre_commit'] == ("lint",)
+        assert table['state.backend'] == "file"
 
     def test_git_config_defaults(self):
         """Test GitConfig default values"""
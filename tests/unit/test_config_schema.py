@@ -0,0 +1,117 @@
+"""Unit tests for declarative config schemas"""
+
+import pytest
+from dataclasses import dataclass
+
+from aedt.core.config_schema import (
+    Field,
+    ObjectSchema,
+    SchemaError,
+    SchemaValidationError
+)
+
+
+@dataclass
+class Retry:
+    attempts: int
+    backoff: float
+
+
+SCHEMA = ObjectSchema({
+    'name': Field(str, required=True),
+    'mode': Field(str, default="fast", choices=("fast", "safe")),
+    'workers': Field(int, default=4, gt=0),
+    'tags': Field(list, items=Field(str), nullable=True, default_factory=list),
+    'retry': Field(ObjectSchema({
+        'attempts': Field(int, default=3, gt=0),
+        'backoff': Field((int, float), default=0.5),
+    }, factory=Retry), default_factory=lambda: Retry(3, 0.5)),
+    'hooks': Field(list, items=Field(ObjectSchema({
+        'run': Field(str, required=True),
+    }))),
+}, unknown="error")
+
+
+def test_valid_document_gets_defaults():
+    """Test defaults fill absent and null fields, nested factories build objects"""
+    result = SCHEMA.compile().validate({'name': "x", 'tags': None, 'retry': {'attempts': 5}})
+
+    assert result == {
+        'name': "x",
+        'mode': "fast",
+        'workers': 4,
+        'tags': [],
+        'retry': Retry(5, 0.5),
+    }
+
+
+def test_all_errors_reported_with_paths():
+    """Test every error is collected, each with its dot-path"""
+    errors = SCHEMA.compile().errors({
+        'mode': "slow",
+        'workers': 0,
+        'tags': ["a", 1],
+        'retry': {'attempts': "3", 'extra': True},
+        'hooks': [{'run': "lint"}, {}],
+        'typo': 1,
+    })
+
+    assert [str(error) for error in errors] == [
+        "mode 必须是 'fast' 或 'safe'，当前值: slow",
+        "workers 必须大于 0，当前值: 0",
+        "tags[1] 必须是字符串类型，当前类型: int",
+        "retry.attempts 必须是整数类型，当前类型: str",
+        "retry.extra 是未知字段",
+        "缺少必需字段: hooks[1].run",
+        "缺少必需字段: name",
+        "typo 是未知字段",
+    ]
+
+
+def test_validate_raises_with_all_errors():
+    """Test validate raises one ValueError listing every error"""
+    with pytest.raises(SchemaValidationError) as exc_info:
+        SCHEMA.compile().validate({'workers': "many"}, source="demo.yaml")
+
+    error = exc_info.value
+    assert isinstance(error, ValueError)
+    assert error.errors == [
+        SchemaError("workers", "必须是整数类型，当前类型: str"),
+        SchemaError("", "缺少必需字段: name"),
+    ]
+    assert "发现 2 个配置错误" in str(error)
+    assert str(error).endswith("请检查 demo.yaml")
+
+
+def test_top_level_must_be_mapping():
+    """Test a non-mapping document is rejected"""
+    errors = SCHEMA.compile().errors(["name"])
+
+    assert [str(error) for error in errors] == ["配置文件顶层 必须是对象类型，当前类型: list"]
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("ignore", {'a': 1}),
+    ("keep", {'a': 1, 'b': 2}),
+])
+def test_unknown_key_policies(policy, expected):
+    """Test unknown keys can be ignored or kept instead of rejected"""
+    schema = ObjectSchema({'a': Field(int)}, unknown=policy)
+
+    assert schema.compile().validate({'a': 1, 'b': 2}) == expected
+
+
+def test_invalid_unknown_policy():
+    """Test unsupported unknown-key policies are rejected"""
+    with pytest.raises(ValueError, match="未知的 unknown 策略"):
+        ObjectSchema({}, unknown="warn")
+
+
+def test_partial_validates_present_keys_only():
+    """Test partial validators skip required fields, defaults and factories"""
+    validator = SCHEMA.compile(partial=True)
+
+    assert validator.validate({'retry': {'attempts': 2}}) == {'retry': {'attempts': 2}}
+    assert [str(e) for e in validator.errors({'workers': -1})] == [
+        "workers 必须大于 0，当前值: -1"
+    ]
@@ -1,5 +1,6 @@
 """Unit tests for DataStore"""
 
+import hashlib
 import pytest
 import tempfile
 import shutil
@@ -221,6 +222,45 @@ def test_backup_nonexistent_file(data_store, temp_dir):
     assert len(backup_files) == 0
 
 
+def test_backup_embeds_content_digest(data_store, temp_dir):
+    """Test backup name carries the SHA-256 digest of its content"""
+    import hashlib
+
+    file_path = temp_dir / "test.yaml"
+    data_store.atomic_write(file_path, {'key': 'value'})
+
+    data_store.backup(file_path)
+
+    backup_path = data_store.list_backups(file_path)[0]
+    expected = hashlib.sha256(file_path.read_bytes()).hexdigest()
+    assert data_store.backup_digest(backup_path) == expected
+    assert data_store.verify_backup(backup_path) is True
+
+
+def test_verify_backup_detects_corruption(data_store, temp_dir):
+    """Test verify_backup fails for a truncated backup"""
+    file_path = temp_dir / "test.yaml"
+    data_store.atomic_write(file_path, {'key': 'value', 'items': list(range(20))})
+    data_store.backup(file_path)
+    backup_path = data_store.list_backups(file_path)[0]
+
+    # Truncate: still parseable YAML, but not the bytes that were backed up
+    content = backup_path.read_text(encoding='utf-8')
+    backup_path.write_text(content[:len(content) // 2].rsplit('\n', 1)[0] + '\n',
+                           encoding='utf-8')
+
+    assert data_store.verify_backup(backup_path) is False
+
+
+def test_verify_legacy_backup_without_digest(data_store, temp_dir):
+    """Test verify_backup returns None for backups without a digest"""
+    legacy_backup = temp_dir / "test.yaml.backup.1700000000.123456"
+    legacy_backup.write_text("key: value\n", encoding='utf-8')
+
+    assert data_store.backup_digest(legacy_backup) is None
+    assert data_store.verify_backup(legacy_backup) is None
+
+
 def test_atomic_write_with_unicode(data_store, temp_dir):
     """Test atomic write with Unicode characters"""
     file_path = temp_dir / "unicode.yaml"
@@ -239,3 +279,174 @@ def test_atomic_write_with_unicode(data_store, temp_dir):
     # Verify content
     loaded_data = data_store.read(file_path)
     assert loaded_data == test_data
+
+
+@pytest.fixture
+def integrity_store(temp_dir):
+    """Create DataStore instance with integrity headers enabled"""
+    return DataStore(temp_dir, integrity=True)
+
+
+def test_integrity_header_written(integrity_store, temp_dir):
+    """Test atomic_write embeds hash and length header"""
+    file_path = temp_dir / "test.yaml"
+    test_data = {'project_id': 'test-001', 'items': [1, 2, 3]}
+
+    integrity_store.atomic_write(file_path, test_data)
+
+    first_line = file_path.read_text(encoding='utf-8').splitlines()[0]
+    assert first_line.startswith("# aedt-integrity: sha256=")
+    assert "length=" in first_line
+
+    # Header is a YAML comment: plain readers still work
+    with open(file_path, 'r') as f:
+        assert yaml.safe_load(f) == test_data
+    assert DataStore(temp_dir).read(file_path) == test_data
+
+
+def test_integrity_detects_truncation(integrity_store, temp_dir):
+    """Test truncated-but-parseable file is rejected"""
+    file_path = temp_dir / "test.yaml"
+    integrity_store.atomic_write(file_path, {'a': 1, 'b': 2, 'c': 3})
+
+    lines = file_path.read_text(encoding='utf-8').splitlines(keepends=True)
+    file_path.write_text("".join(lines[:-1]), encoding='utf-8')
+
+    with pytest.raises(ValueError, match="文件完整性校验失败"):
+        DataStore(temp_dir, integrity=True).read(file_path)
+
+
+def test_integrity_detects_modified_content(integrity_store, temp_dir):
+    """Test same-length modification is rejected by the hash check"""
+    file_path = temp_dir / "test.yaml"
+    integrity_store.atomic_write(file_path, {'status': 'queued'})
+
+    content = file_path.read_text(encoding='utf-8')
+    file_path.write_text(content.replace("queued", "failed"), encoding='utf-8')
+
+    with pytest.raises(ValueError, match="哈希不匹配"):
+        integrity_store.read(file_path)
+
+
+def test_integrity_reads_legacy_files(integrity_store, temp_dir):
+    """Test files without header are still readable"""
+    file_path = temp_dir / "legacy.yaml"
+    file_path.write_text("key: value\n", encoding='utf-8')
+
+    assert integrity_store.read(file_path) == {'key': 'value'}
+
+
+def test_integrity_cache_hit_skips_parse(integrity_store, temp_dir, monkeypatch):
+    """Test unchanged files are served from cache without YAML parsing"""
+    file_path = temp_dir / "test.yaml"
+    test_data = {'epics': {'1': {'status': 'queued'}}}
+    integrity_store.atomic_write(file_path, test_data)
+
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("YAML should not be parsed on cache hit")
+
+    monkeypatch.setattr(yaml, "safe_load", fail_parse)
+
+    data, digest = integrity_store.read_with_digest(file_path)
+    assert data == test_data
+    assert digest == integrity_store.content_digest(file_path)
+
+    # Returned data is a copy: mutations don't leak into the cache
+    data['epics']['1']['status'] = 'failed'
+    assert integrity_store.read(file_path) == test_data
+
+
+def test_integrity_cache_evicts_least_recently_used(integrity_store, temp_dir, monkeypatch):
+    """Test the parse cache holds at most CACHE_SIZE files"""
+    monkeypatch.setattr(DataStore, "CACHE_SIZE", 2)
+    paths = [temp_dir / f"file-{i}.yaml" for i in range(3)]
+    for i, path in enumerate(paths[:2]):
+        integrity_store.atomic_write(path, {'index': i})
+    integrity_store.read(paths[0])  # Now most recently used
+    integrity_store.atomic_write(paths[2], {'index': 2})
+
+    assert list(integrity_store._cache) == [paths[0], paths[2]]
+
+
+def test_read_without_integrity_skips_hashing(data_store, temp_dir, monkeypatch):
+    """Test plain reads and writes neither hash nor cache the content"""
+    file_path = temp_dir / "test.yaml"
+
+    def fail_hash(*args, **kwargs):
+        raise AssertionError("content should not be hashed")
+
+    monkeypatch.setattr(hashlib, "sha256", fail_hash)
+    data_store.atomic_write(file_path, {'status': 'queued'})
+    assert data_store.read(file_path) == {'status': 'queued'}
+    assert not data_store._cache
+
+    monkeypatch.undo()
+    data, digest = data_store.read_with_digest(file_path)
+    assert digest == data_store.content_digest(file_path)
+
+
+def test_iter_entries_streams_expanded_section(data_store, temp_dir):
+    """Test iter_entries yields top-level entries and expanded children"""
+    file_path = temp_dir / "status.yaml"
+    data_store.atomic_write(file_path, {
+        'project_id': 'test-001',
+        'epics': {
+            '1': {'status': 'queued'},
+            '2': {'status': 'completed'},
+        },
+        'tags': ['a', 'b'],
+    })
+
+    entries = list(data_store.iter_entries(file_path, expand=('epics', 'tags')))
+
+    assert entries == [
+        (None, 'project_id', 'test-001'),
+        ('epics', '1', {'status': 'queued'}),
+        ('epics', '2', {'status': 'completed'}),
+        ('tags', 0, 'a'),
+        ('tags', 1, 'b'),
+    ]
+
+
+def test_iter_entries_without_expand_matches_read(data_store, temp_dir):
+    """Test iter_entries without expand is equivalent to read()"""
+    file_path = temp_dir / "test.yaml"
+    test_data = {'a': 1, 'nested': {'b': [1, 2, {'c': 'd'}]}, '中文': '值'}
+    data_store.atomic_write(file_path, test_data)
+
+    streamed = {key: value for _, key, value in data_store.iter_entries(file_path)}
+
+    assert streamed == data_store.read(file_path) == test_data
+
+
+def test_iter_entries_empty_and_missing_files(data_store, temp_dir):
+    """Test iter_entries yields nothing for empty or missing files"""
+    empty_file = temp_dir / "empty.yaml"
+    empty_file.write_text("", encoding='utf-8')
+
+    assert list(data_store.iter_entries(empty_file)) == []
+    assert list(data_store.iter_entries(temp_dir / "missing.yaml")) == []
+
+
+def test_iter_entries_rejects_non_mapping(data_store, temp_dir):
+    """Test iter_entries requires a top-level mapping"""
+    file_path = temp_dir / "list.yaml"
+    file_path.write_text("- 1\n- 2\n", encoding='utf-8')
+
+    with pytest.raises(ValueError, match="文件顶层必须是映射"):
+        list(data_store.iter_entries(file_path))
+
+
+def test_iter_entries_verifies_integrity(integrity_store, temp_dir):
+    """Test iter_entries checks the integrity header after streaming"""
+    file_path = temp_dir / "status.yaml"
+    integrity_store.atomic_write(file_path, {'epics': {'1': {'progress': 10}}})
+    assert list(integrity_store.iter_entries(file_path, expand=('epics',))) == [
+        ('epics', '1', {'progress': 10})
+    ]
+
+    content = file_path.read_text(encoding='utf-8')
+    file_path.write_text(content.replace("10", "90"), encoding='utf-8')
+
+    with pytest.raises(ValueError, match="文件完整性校验失败"):
+        list(integrity_store.iter_entries(file_path, expand=('epics',)))
@@ -0,0 +1,218 @@
+"""Unit tests for the file watcher service"""
+
+import pytest
+import sys
+import time
+from pathlib import Path
+
+import aedt.core.file_watcher as file_watcher
+from aedt.core.config_manager import ConfigManager
+from aedt.core.file_watcher import (
+    FileEvent,
+    FileEventHandler,
+    FileWatcherService,
+    PollingObserver,
+    create_observer
+)
+
+
+class RecordingHandler(FileEventHandler):
+    """Handler that records dispatched events"""
+
+    def __init__(self):
+        self.events = []
+
+    def on_created(self, event):
+        self.events.append(('created', event.src_path))
+
+    def on_modified(self, event):
+        self.events.append(('modified', event.src_path))
+
+    def on_deleted(self, event):
+        self.events.append(('deleted', event.src_path))
+
+
+class FakeObserver:
+    """Observer stand-in that records scheduled watches"""
+
+    instances = []
+
+    def __init__(self):
+        self.watches = []
+        self.running = False
+        FakeObserver.instances.append(self)
+
+    def schedule(self, handler, path, recursive=False):
+        watch = (handler, path, recursive)
+        self.watches.append(watch)
+        return watch
+
+    def unschedule(self, watch):
+        self.watches.remove(watch)
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def join(self):
+        pass
+
+    def emit(self, event):
+        for handler, _, _ in list(self.watches):
+            handler.dispatch(event)
+
+
+@pytest.fixture
+def service():
+    """FileWatcherService driven by FakeObserver"""
+    FakeObserver.instances = []
+    return FileWatcherService(observer_factory=FakeObserver)
+
+
+def test_dispatch_routes_by_event_type():
+    """Test dispatch calls the matching on_* method and skips directories"""
+    handler = RecordingHandler()
+
+    handler.dispatch(FileEvent('modified', '/tmp/a.yaml'))
+    handler.dispatch(FileEvent('modified', '/tmp/dir', is_directory=True))
+    handler.dispatch(FileEvent('unknown', '/tmp/a.yaml'))
+
+    assert handler.events == [('modified', '/tmp/a.yaml')]
+
+
+def test_polling_observer_detects_changes(tmp_path):
+    """Test PollingObserver reports created, modified and deleted files"""
+    nested = tmp_path / "nested"
+    nested.mkdir()
+    existing = tmp_path / "existing.yaml"
+    existing.write_text("a: 1", encoding='utf-8')
+
+    handler = RecordingHandler()
+    observer = PollingObserver()
+    observer.schedule(handler, str(tmp_path), recursive=True)
+
+    new_file = nested / "status.yaml"
+    new_file.write_text("b: 2", encoding='utf-8')
+    existing.write_text("a: 10", encoding='utf-8')
+    observer.poll()
+    existing.unlink()
+    observer.poll()
+
+    assert sorted(handler.events) == [
+        ('created', str(new_file)),
+        ('deleted', str(existing)),
+        ('modified', str(existing)),
+    ]
+
+
+def test_create_observer_falls_back_without_watchdog(monkeypatch):
+    """Test create_observer uses polling when watchdog cannot be imported"""
+    monkeypatch.setitem(sys.modules, 'watchdog.observers', None)
+
+    assert isinstance(create_observer(), PollingObserver)
+
+
+def test_service_shares_one_observer(service, tmp_path):
+    """Test subscribers share one observer and one watch per directory"""
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+
+    first = service.subscribe(tmp_path, "config.yaml", lambda path: None)
+    second = service.subscribe(tmp_path, "*.md", lambda path: None)
+    third = service.subscribe(other_dir, "status.yaml", lambda path: None, recursive=True)
+
+    assert len(FakeObserver.instances) == 1
+    observer = FakeObserver.instances[0]
+    assert observer.running
+    assert len(observer.watches) == 2
+
+    service.unsubscribe(first)
+    assert len(observer.watches) == 2
+    service.unsubscribe(second)
+    service.unsubscribe(third)
+    assert observer.watches == []
+    assert not observer.running
+    assert not service.is_running
+
+
+def test_service_debounces_and_filters_per_path(service, tmp_path):
+    """Test a burst of events per file runs the callback once per file"""
+    calls = []
+    service.subscribe(tmp_path, "*.yaml", calls.append, debounce=0.05)
+    observer = FakeObserver.instances[0]
+    root = tmp_path.resolve()
+    config_file = str(root / "config.yaml")
+    other_file = str(root / "other.yaml")
+
+    # Modify x3, atomic-save rename, a second file, non-matching and nested files
+    observer.emit(FileEvent('modified', config_file))
+    observer.emit(FileEvent('modified', config_file))
+    observer.emit(FileEvent('created', config_file))
+    observer.emit(FileEvent('moved', str(root / ".config.yaml.swp"), config_file))
+    observer.emit(FileEvent('modified', other_file))
+    observer.emit(FileEvent('modified', str(root / "notes.txt")))
+    observer.emit(FileEvent('modified', str(root / "sub" / "nested.yaml")))
+    time.sleep(0.3)
+
+    assert sorted(calls) == [Path(config_file), Path(other_file)]
+
+
+def test_service_recursive_glob(service, tmp_path):
+    """Test recursive subscriptions match files in subdirectories"""
+    calls = []
+    service.subscribe(tmp_path, "status.yaml", calls.append, recursive=True, debounce=0.01)
+    observer = FakeObserver.instances[0]
+    nested = tmp_path.resolve() / "projects" / "P1" / "status.yaml"
+
+    observer.emit(FileEvent('modified', str(nested)))
+    observer.emit(FileEvent('modified', str(nested.parent / "status.yaml.backup.1")))
+    time.sleep(0.2)
+
+    assert calls == [nested]
+
+
+def test_unsubscribe_cancels_pending_callbacks(service, tmp_path):
+    """Test no callback runs after unsubscribe, and failing callbacks are contained"""
+    calls = []
+
+    def failing(path):
+        raise RuntimeError("boom")
+
+    subscription = service.subscribe(tmp_path, "*.yaml", calls.append, debounce=0.1)
+    service.subscribe(tmp_path, "*.yaml", failing, debounce=0.01)
+    observer = FakeObserver.instances[0]
+
+    observer.emit(FileEvent('modified', str(tmp_path.resolve() / "config.yaml")))
+    service.unsubscribe(subscription)
+    time.sleep(0.3)
+
+    assert calls == []
+
+
+def test_hot_reload_with_polling_fallback(tmp_path, monkeypatch):
+    """Test config hot reload works through the polling observer"""
+    monkeypatch.setitem(sys.modules, 'watchdog.observers', None)
+    monkeypatch.setattr(file_watcher, '_shared_service', FileWatcherService())
+    monkeypatch.setattr(PollingObserver, 'DEFAULT_INTERVAL', 0.05)
+    config_path = tmp_path / ".aedt" / "config.yaml"
+    config_mgr = ConfigManager(config_path=config_path)
+    config_mgr.initialize(force=False, is_global=False)
+    config_mgr.load()
+
+    config_mgr.enable_hot_reload(debounce=0.05)
+    try:
+        assert isinstance(file_watcher.get_watcher_service()._observer, PollingObserver)
+        time.sleep(0.02)
+        config_path.write_text(
+            config_path.read_text(encoding='utf-8').replace("max_concurrent: 5", "max_concurrent: 6"),
+            encoding='utf-8'
+        )
+        deadline = time.time() + 3
+        while config_mgr.get('subagent.max_concurrent') != 6 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        config_mgr.stop_watching()
+
+    assert config_mgr.get('subagent.max_concurrent') == 6
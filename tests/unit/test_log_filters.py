@@ -0,0 +1,134 @@
+"""Unit tests for log rate limiting and sampling"""
+
+import logging
+import random
+
+import pytest
+
+from aedt.core.log_filters import RateLimit, RateLimitFilter
+from aedt.core.logger import AEDTLogger
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_logger(name, settings, clock, rng=None):
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = ListHandler()
+    rate_filter = RateLimitFilter(logger, settings, clock=clock, rng=rng)
+    handler.addFilter(rate_filter)
+    logger.addHandler(handler)
+    return logger, handler, rate_filter
+
+
+def test_burst_then_summary_after_window():
+    """Test identical templates pass up to burst and are summarized later"""
+    clock = FakeClock()
+    logger, handler, rate_filter = make_logger(
+        "test.rate.burst", RateLimit(window=10.0, burst=3), clock
+    )
+    for i in range(10):
+        logger.warning("retrying %d", i)
+    logger.warning("different message")
+    assert handler.messages == ["retrying 0", "retrying 1", "retrying 2", "different message"]
+    assert rate_filter.stats()['suppressed'] == 7
+
+    clock.now += 10.0
+    logger.warning("retrying %d", 10)
+    assert handler.messages[-2:] == [
+        "已抑制 7 条重复日志 (10 秒内): retrying %d",
+        "retrying 10",
+    ]
+    assert rate_filter.stats()['summaries'] == 1
+
+
+def test_sweep_summarizes_quiet_pairs():
+    """Test a pair that stops logging is summarized by the periodic sweep"""
+    clock = FakeClock()
+    logger, handler, rate_filter = make_logger(
+        "test.rate.sweep", RateLimit(window=5.0, burst=1), clock
+    )
+    for _ in range(4):
+        logger.error("stuck")
+    clock.now += 6.0
+    logger.info("unrelated")
+    assert handler.messages == ["stuck", "已抑制 3 条重复日志 (5 秒内): stuck", "unrelated"]
+    assert rate_filter.stats()['tracked'] == 1
+
+
+def test_flush_summarizes_open_windows():
+    """Test flush() reports suppressed records of unfinished windows"""
+    clock = FakeClock()
+    logger, handler, rate_filter = make_logger(
+        "test.rate.flush", RateLimit(window=60.0, burst=2), clock
+    )
+    for _ in range(5):
+        logger.info("poll")
+    rate_filter.flush()
+    rate_filter.flush()
+    assert handler.messages == ["poll", "poll", "已抑制 3 条重复日志 (60 秒内): poll"]
+    assert rate_filter.stats()['tracked'] == 0
+
+
+def test_debug_sampling():
+    """Test DEBUG records are sampled while other levels are kept"""
+    logger, handler, rate_filter = make_logger(
+        "test.rate.sample",
+        RateLimit(window=10.0, burst=10_000, debug_sample_rate=0.1),
+        FakeClock(),
+        rng=random.Random(42)
+    )
+    for i in range(2000):
+        logger.debug("tick %d", i)
+    logger.info("kept")
+    kept = len(handler.messages) - 1
+    assert 120 < kept < 280
+    assert handler.messages[-1] == "kept"
+    assert rate_filter.stats()['sampled_out'] == 2000 - kept
+
+
+def test_invalid_settings():
+    """Test invalid rate limit settings are rejected"""
+    with pytest.raises(ValueError):
+        RateLimit(window=0)
+    with pytest.raises(ValueError):
+        RateLimit(burst=0)
+    with pytest.raises(ValueError):
+        RateLimit(debug_sample_rate=1.5)
+
+
+@pytest.mark.parametrize("queued", [False, True])
+def test_aedt_logger_rate_limit(tmp_path, queued):
+    """Test a record is counted once although the file and ring both see it"""
+    aedt_logger = AEDTLogger(tmp_path / "logs", queued=queued,
+                             rate_limit=RateLimit(window=60.0, burst=5))
+    epic_logger = aedt_logger.get_epic_logger("demo", "1")
+    for _ in range(50):
+        epic_logger.warning("agent not responding")
+    aedt_logger.flush()
+    assert aedt_logger.rate_limit_stats['suppressed'] == 45
+    assert len(aedt_logger.recent("1", n=100)) == 5
+    aedt_logger.close()
+
+    epic_log = tmp_path / "projects" / "demo" / "epics" / "epic-1.log"
+    lines = epic_log.read_text(encoding='utf-8').splitlines()
+    assert sum("agent not responding" in line for line in lines) == 6
+    assert "已抑制 45 条重复日志" in lines[-1]
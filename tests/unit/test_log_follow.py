@@ -0,0 +1,163 @@
+"""Unit tests for following logs across rotations"""
+
+import json
+import logging
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from aedt.core.log_follow import LogFollower, follow_logs
+from aedt.core.log_index import LogQuery, find_log_files
+from aedt.core.logger import AEDTLogger
+
+
+def epic_log_path(aedt_dir, project="demo", epic_id="1"):
+    return aedt_dir / "projects" / project / "epics" / f"epic-{epic_id}.log"
+
+
+def shrink_rotation(epic_logger, max_bytes=1024):
+    for handler in epic_logger.handlers:
+        if isinstance(handler, RotatingFileHandler):
+            handler.maxBytes = max_bytes
+            handler.backupCount = 50
+
+
+def test_follower_reads_across_compressed_rotations(tmp_path):
+    """Test nothing is lost or repeated when the file is rotated and compressed"""
+    aedt_dir = tmp_path / ".aedt"
+    aedt_logger = AEDTLogger(aedt_dir / "logs", log_format="json", compression="gzip")
+    epic_logger = aedt_logger.get_epic_logger("demo", "1")
+    epic_logger.info("before follow")
+    shrink_rotation(epic_logger)
+
+    follower = LogFollower(epic_log_path(aedt_dir))
+    messages = []
+    for i in range(200):
+        epic_logger.info("record %d %s", i, "x" * 40)
+        messages.extend(json.loads(line)['message'] for line in follower.read_lines())
+    aedt_logger.close()
+    messages.extend(json.loads(line)['message'] for line in follower.read_lines())
+    follower.close()
+
+    assert (epic_log_path(aedt_dir).parent / "epic-1.log.1.gz").exists()
+    assert messages == [f"record {i} {'x' * 40}" for i in range(200)]
+
+
+def test_follower_reads_backups_rotated_between_reads(tmp_path):
+    """Test several rotations between two reads are caught up from the backups"""
+    aedt_dir = tmp_path / ".aedt"
+    aedt_logger = AEDTLogger(aedt_dir / "logs", log_format="json", compression="none")
+    epic_logger = aedt_logger.get_epic_logger("demo", "1")
+    epic_logger.info("before follow")
+    shrink_rotation(epic_logger)
+
+    follower = LogFollower(epic_log_path(aedt_dir))
+    for i in range(100):
+        epic_logger.info("burst %d %s", i, "y" * 40)
+    aedt_logger.close()
+    messages = [json.loads(line)['message'] for line in follower.read_lines()]
+    follower.close()
+
+    assert len(list(epic_log_path(aedt_dir).parent.glob("epic-1.log.*[0-9]"))) > 2
+    assert messages == [f"burst {i} {'y' * 40}" for i in range(100)]
+
+
+def test_follower_holds_text_record_until_complete(tmp_path):
+    """Test traceback lines written later stay with their record"""
+    log_file = tmp_path / "aedt.log"
+    log_file.write_text("", encoding='utf-8')
+    follower = LogFollower(log_file)
+
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write("[2025-01-01 10:00:00] [ERROR] [aedt.scheduler] failed\n")
+        f.write("Traceback (most recent call last):\n")
+    assert follower.read_entries() == []
+
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write("RuntimeError: boom\n")
+    assert follower.read_entries() == []
+    entries = follower.read_entries()
+    assert len(entries) == 1
+    assert entries[0].text.endswith("RuntimeError: boom")
+
+    # A file truncated in place is read from its start
+    log_file.write_text("[2025-01-01 10:00:01] [INFO] [aedt.scheduler] again\n", encoding='utf-8')
+    assert follower.read_lines() == ["[2025-01-01 10:00:01] [INFO] [aedt.scheduler] again"]
+    follower.close()
+
+
+def test_follow_merges_epics_and_discovers_new_ones(tmp_path):
+    """Test several epic logs are merged by time and new epics are followed"""
+    aedt_dir = tmp_path / ".aedt"
+    aedt_logger = AEDTLogger(aedt_dir / "logs", log_format="json")
+    epic1 = aedt_logger.get_epic_logger("demo", "1")
+    epic1.info("old 1")
+    epic1.warning("old 2")
+
+    stop = threading.Event()
+    received = []
+    discover = lambda: find_log_files(aedt_dir, project_name="demo", include_global=False)
+    stream = follow_logs(discover(), query=LogQuery(min_level=logging.INFO), backlog=1,
+                         stop=stop, poll_interval=0.05, discover=discover)
+
+    def consume():
+        for entry in stream:
+            received.append(json.loads(entry.text)['message'])
+            if len(received) == 5:
+                stop.set()
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    time.sleep(0.2)
+    epic2 = aedt_logger.get_epic_logger("demo", "2")
+    epic1.info("a")
+    epic2.info("b")
+    epic2.debug("hidden")
+    epic1.info("c")
+    epic2.info("d")
+    consumer.join(10)
+    aedt_logger.close()
+
+    assert not consumer.is_alive()
+    assert received[0] == "old 2"
+    assert sorted(received[1:]) == ["a", "b", "c", "d"]
+    assert received.index("a") < received.index("c")
+    assert received.index("b") < received.index("d")
+
+
+def test_aedt_logger_follow_epic_created_later(tmp_path):
+    """Test following an epic whose log does not exist yet"""
+    aedt_logger = AEDTLogger(tmp_path / ".aedt" / "logs")
+    stop = threading.Event()
+    stream = aedt_logger.follow(project_name="demo", epic_id="7", min_level="WARNING",
+                                stop=stop, poll_interval=0.05)
+    epic_logger = aedt_logger.get_epic_logger("demo", "7")
+    epic_logger.info("quiet")
+    epic_logger.warning("loud")
+    epic_logger.error("louder")
+
+    texts = []
+    for entry in stream:
+        texts.append(entry.text.split("] ")[-1])
+        if len(texts) == 2:
+            stop.set()
+    aedt_logger.close()
+    assert texts == ["loud", "louder"]
+
+
+def test_follow_logs_backlog_merged_by_time(tmp_path):
+    """Test the backlog is the last records of all files by timestamp"""
+    first = tmp_path / "a.log"
+    second = tmp_path / "b.log"
+    first.write_text(
+        "[2025-01-01 10:00:00] [INFO] [aedt.a] a0\n"
+        "[2025-01-01 10:00:02] [INFO] [aedt.a] a2\n", encoding='utf-8'
+    )
+    second.write_text(
+        "[2025-01-01 10:00:01] [INFO] [aedt.b] b1\n"
+        "[2025-01-01 10:00:03] [INFO] [aedt.b] b3\n", encoding='utf-8'
+    )
+    stop = threading.Event()
+    stop.set()
+    entries = list(follow_logs([first, second], backlog=3, stop=stop))
+    assert [entry.text.split()[-1] for entry in entries] == ["b1", "a2", "b3"]
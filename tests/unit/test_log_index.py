@@ -0,0 +1,196 @@
+"""Unit tests for sidecar log indexes and log queries"""
+
+import json
+import logging
+from logging.handlers import RotatingFileHandler
+import re
+
+import pytest
+
+from aedt.core.log_index import (
+    LogQuery,
+    QueryStats,
+    SegmentIndex,
+    find_log_files,
+    parse_entries,
+    query_log,
+    sidecar_path
+)
+from aedt.core.log_rotation import log_segments
+from aedt.core.logger import AEDTLogger
+
+
+def epic_log_path(aedt_dir, project="TestProject", epic_id="1"):
+    return aedt_dir / "projects" / project / "epics" / f"epic-{epic_id}.log"
+
+
+def test_sidecar_path():
+    """Test sidecar names drop the compression suffix"""
+    assert sidecar_path("logs/aedt.log").name == "aedt.log.idx"
+    assert sidecar_path("logs/aedt.log.1.gz").name == "aedt.log.1.idx"
+    assert sidecar_path("logs/aedt.log.2").name == "aedt.log.2.idx"
+
+
+def test_index_blocks_and_agent_query(tmp_path):
+    """Test blocks record agents and a query skips the other agents' blocks"""
+    aedt_dir = tmp_path / ".aedt"
+    aedt_logger = AEDTLogger(aedt_dir / "logs", log_format="json", index_records=10)
+    for agent in ("agent-1", "agent-2", "agent-1"):
+        epic_logger = aedt_logger.get_epic_logger("TestProject", "1", agent_id=agent)
+        for i in range(20):
+            level = logging.ERROR if i % 10 == 0 else logging.INFO
+            epic_logger.log(level, f"{agent} step {i}")
+    aedt_logger.close()
+
+    log_file = epic_log_path(aedt_dir)
+    index = SegmentIndex.load(sidecar_path(log_file))
+    assert len(index.blocks) == 6
+    assert [sorted(block.agents) for block in index.blocks] == [
+        ["agent-1"], ["agent-1"], ["agent-2"], ["agent-2"], ["agent-1"], ["agent-1"]
+    ]
+    assert index.blocks[0].offset == 0
+    assert index.blocks[-1].end == log_file.stat().st_size
+    assert index.blocks[0].levels == {"ERROR": 1, "INFO": 9}
+
+    stats = QueryStats()
+    entries = list(query_log(log_file, LogQuery(agent_id="agent-2"), stats))
+    assert len(entries) == 20
+    assert all(json.loads(entry.text)['agent_id'] == "agent-2" for entry in entries)
+    assert stats.blocks_skipped == 4
+    assert stats.bytes_read < log_file.stat().st_size / 2
+
+    errors = list(query_log(log_file, LogQuery(min_level=logging.ERROR, agent_id="agent-1")))
+    assert [json.loads(entry.text)['message'] for entry in errors] == [
+        "agent-1 step 0", "agent-1 step 10", "agent-1 step 0", "agent-1 step 10"
+    ]
+
+
+@pytest.mark.parametrize("queued", [False, True])
+def test_text_format_agent_query(tmp_path, queued):
+    """Test the agent given to get_epic_logger is indexed for text logs, also after a rebind"""
+    aedt_dir = tmp_path / ".aedt"
+    aedt_logger = AEDTLogger(aedt_dir / "logs", index_records=10, queued=queued)
+    for agent in ("agent-1", "agent-2"):
+        epic_logger = aedt_logger.get_epic_logger("TestProject", "1", agent_id=agent)
+        for i in range(20):
+            level = logging.ERROR if i % 10 == 0 else logging.INFO
+            epic_logger.log(level, f"{agent} step {i}")
+        aedt_logger.flush()
+    aedt_logger.close()
+
+    log_file = epic_log_path(aedt_dir)
+    index = SegmentIndex.load(sidecar_path(log_file))
+    assert [sorted(block.agents) for block in index.blocks] == [
+        ["agent-1"], ["agent-1"], ["agent-2"], ["agent-2"]
+    ]
+
+    errors = list(query_log(log_file, LogQuery(min_level=logging.ERROR, agent_id="agent-1")))
+    assert [entry.text.split("] ")[-1] for entry in errors] == [
+        "agent-1 step 0", "agent-1 step 10"
+    ]
+    assert len(list(query_log(log_file, LogQuery(agent_id="agent-2")))) == 20
+
+
+def test_query_across_compressed_segments(tmp_path):
+    """Test sidecars follow rotation and queries read compressed backups"""
+    aedt_dir = tmp_path / ".aedt"
+    aedt_logger = AEDTLogger(aedt_dir / "logs", compression="gzip", index_records=5)
+    epic_logger = aedt_logger.get_epic_logger("TestProject", "1")
+    for handler in epic_logger.handlers:
+        if isinstance(handler, RotatingFileHandler):
+            handler.maxBytes = 2048
+
+    for i in range(60):
+        if i % 7 == 0:
+            epic_logger.error(f"failure {i}")
+        else:
+            epic_logger.info(f"progress {i} " + "z" * 40)
+    aedt_logger.close()
+
+    log_file = epic_log_path(aedt_dir)
+    segments = log_segments(log_file)
+    assert segments[0].name.endswith(".gz")
+    for segment in segments:
+        assert sidecar_path(segment).exists()
+        index = SegmentIndex.load(sidecar_path(segment))
+        assert index.complete == (segment != log_file)
+
+    stats = QueryStats()
+    entries = list(query_log(log_file, LogQuery(min_level=logging.ERROR), stats))
+    retained = [int(line.split()[-1]) for line in (
+        entry.text for entry in query_log(log_file, LogQuery(pattern=re.compile("failure")))
+    )]
+    assert [entry.text.split()[-1] for entry in entries] == [str(i) for i in retained]
+    assert retained == [i for i in range(60) if i % 7 == 0][-len(retained):]
+    assert stats.blocks_skipped > 0
+
+
+def test_query_scans_unindexed_ranges(tmp_path):
+    """Test records outside the index (crash, old logs) are still found"""
+    aedt_dir = tmp_path / ".aedt"
+    aedt_logger = AEDTLogger(aedt_dir / "logs", index_records=2)
+    epic_logger = aedt_logger.get_epic_logger("TestProject", "1")
+    for i in range(4):
+        epic_logger.info(f"indexed {i}")
+    aedt_logger.close()
+
+    log_file = epic_log_path(aedt_dir)
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write("[2025-01-01 10:00:00] [ERROR] [aedt.TestProject.epic.1] unindexed\n")
+
+    entries = list(query_log(log_file, LogQuery(min_level=logging.ERROR)))
+    assert [entry.text.split("] ")[-1] for entry in entries] == ["unindexed"]
+
+    # A sidecar pointing past the end of a replaced file is ignored
+    log_file.write_text("", encoding='utf-8')
+    aedt_logger = AEDTLogger(aedt_dir / "logs", index_records=2)
+    aedt_logger.get_epic_logger("TestProject", "1").warning("fresh")
+    aedt_logger.close()
+    index = SegmentIndex.load(sidecar_path(log_file))
+    assert [block.count for block in index.blocks] == [1]
+    assert [e.level for e in query_log(log_file, LogQuery())] == ["WARNING"]
+
+
+def test_parse_entries_groups_tracebacks(tmp_path):
+    """Test text continuation lines belong to the preceding record"""
+    lines = [
+        "[2025-01-01 10:00:00] [ERROR] [aedt.demo.epic.3] failed",
+        "Traceback (most recent call last):",
+        "RuntimeError: boom",
+        "[2025-01-01 10:00:01] [INFO] [aedt.scheduler] next",
+        '{"ts":"2025-01-01T10:00:02.000","level":"INFO","logger":"aedt.demo.epic.3",'
+        '"project":"demo","epic_id":"3","agent_id":"a1","message":"json"}',
+    ]
+    entries = list(parse_entries(tmp_path / "x.log", lines))
+    assert [entry.level for entry in entries] == ["ERROR", "INFO", "INFO"]
+    assert entries[0].text.endswith("RuntimeError: boom")
+    assert entries[0].epic_id == "3"
+    assert entries[1].epic_id is None
+    assert entries[2].agent_id == "a1"
+    assert entries[2].ts - entries[0].ts == 2.0
+
+
+def test_find_log_files(tmp_path):
+    """Test live log files are found per project and epic"""
+    aedt_dir = tmp_path / ".aedt"
+    aedt_logger = AEDTLogger(aedt_dir / "logs")
+    aedt_logger.global_logger.info("global")
+    aedt_logger.get_epic_logger("ProjectA", "1").info("a1")
+    aedt_logger.get_epic_logger("ProjectA", "10").info("a10")
+    aedt_logger.get_epic_logger("ProjectB", "1").info("b1")
+    aedt_logger.close()
+
+    names = lambda files: [str(path.relative_to(aedt_dir)) for path in files]
+    assert names(find_log_files(aedt_dir)) == [
+        "logs/aedt.log",
+        "projects/ProjectA/epics/epic-1.log",
+        "projects/ProjectA/epics/epic-10.log",
+        "projects/ProjectB/epics/epic-1.log",
+    ]
+    assert names(find_log_files(aedt_dir, epic_id="1")) == [
+        "projects/ProjectA/epics/epic-1.log",
+        "projects/ProjectB/epics/epic-1.log",
+    ]
+    assert names(find_log_files(aedt_dir, project_name="ProjectB")) == [
+        "projects/ProjectB/epics/epic-1.log",
+    ]
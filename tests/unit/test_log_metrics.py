@@ -0,0 +1,133 @@
+"""Unit tests for logging metrics and their Prometheus export"""
+
+import threading
+import urllib.error
+import urllib.request
+from logging.handlers import RotatingFileHandler
+
+import pytest
+
+from aedt.core.log_metrics import MetricFamily, render_prometheus
+from aedt.core.log_rotation import log_segments
+from aedt.core.logger import AEDTLogger
+
+
+def samples(aedt_logger):
+    """Map (sample name, sorted label items) to value"""
+    result = {}
+    for family in aedt_logger.collect_metrics():
+        for name, labels, value in family.samples:
+            result[(name, tuple(sorted(labels.items())))] = value
+    return result
+
+
+def epic_labels(epic_id, **extra):
+    labels = {'log': f"aedt.demo.epic.{epic_id}", 'project': "demo", 'epic': epic_id, **extra}
+    return tuple(sorted(labels.items()))
+
+
+def test_records_bytes_and_rotations(tmp_path):
+    """Test per-epic level counts, bytes matching the files and rollovers"""
+    aedt_logger = AEDTLogger(tmp_path / "logs", compression="none")
+    epic_logger = aedt_logger.get_epic_logger("demo", "1")
+    for handler in epic_logger.handlers:
+        if isinstance(handler, RotatingFileHandler):
+            handler.maxBytes = 1024
+            handler.backupCount = 50
+    for i in range(40):
+        epic_logger.info("progress %d %s", i, "z" * 30)
+    for i in range(3):
+        epic_logger.error("failed %d", i)
+    aedt_logger.get_epic_logger("demo", "2").warning("other epic")
+
+    values = samples(aedt_logger)
+    aedt_logger.close()
+
+    log_file = tmp_path / "projects" / "demo" / "epics" / "epic-1.log"
+    segments = log_segments(log_file)
+    assert values[("aedt_log_records_total", epic_labels("1", level="INFO"))] == 40
+    assert values[("aedt_log_records_total", epic_labels("1", level="ERROR"))] == 3
+    assert values[("aedt_log_records_total", epic_labels("2", level="WARNING"))] == 1
+    assert values[("aedt_log_bytes_written_total", epic_labels("1"))] == sum(
+        segment.stat().st_size for segment in segments
+    )
+    assert values[("aedt_log_rotations_total", epic_labels("1"))] == len(segments) - 1 > 0
+
+
+def test_counts_exact_under_concurrent_writers(tmp_path):
+    """Test counters lose no increments when many threads log"""
+    aedt_logger = AEDTLogger(tmp_path / "logs")
+    epic_logger = aedt_logger.get_epic_logger("demo", "1")
+
+    def write():
+        for i in range(500):
+            epic_logger.error("spike %d", i)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    values = samples(aedt_logger)
+    aedt_logger.close()
+
+    assert values[("aedt_log_records_total", epic_labels("1", level="ERROR"))] == 4000
+
+
+def test_queue_metrics(tmp_path):
+    """Test queued mode exports depth, lag and drops"""
+    aedt_logger = AEDTLogger(tmp_path / "logs", queued=True)
+    for i in range(20):
+        aedt_logger.global_logger.info("queued %d", i)
+    aedt_logger.flush()
+    values = samples(aedt_logger)
+    aedt_logger.close()
+
+    assert values[("aedt_log_queue_depth", ())] == 0
+    assert values[("aedt_log_queue_lag_seconds_count", ())] == 20
+    assert values[("aedt_log_queue_lag_seconds_sum", ())] >= 0.0
+    global_labels = (('epic', ''), ('level', 'INFO'), ('log', 'aedt'), ('project', ''))
+    assert values[("aedt_log_records_total", global_labels)] == 20
+
+
+def test_render_prometheus_format():
+    """Test help/type lines, label escaping and value formatting"""
+    family = MetricFamily("aedt_test", "gauge", "A test metric")
+    family.add(3, log='a"b\\c\nd')
+    family.add(0.5, "_sum")
+    family.add(float("inf"))
+    assert render_prometheus([family]) == (
+        "# HELP aedt_test A test metric\n"
+        "# TYPE aedt_test gauge\n"
+        'aedt_test{log="a\\"b\\\\c\\nd"} 3\n'
+        "aedt_test_sum 0.5\n"
+        "aedt_test +Inf\n"
+    )
+
+
+def test_write_and_serve_metrics(tmp_path):
+    """Test export to a file and over local HTTP"""
+    aedt_logger = AEDTLogger(tmp_path / "logs")
+    aedt_logger.global_logger.error("alert me")
+
+    metrics_file = tmp_path / "textfile" / "aedt.prom"
+    aedt_logger.write_metrics(metrics_file)
+    assert 'aedt_log_records_total{epic="",level="ERROR",log="aedt",project=""} 1' in (
+        metrics_file.read_text(encoding='utf-8')
+    )
+    assert list(metrics_file.parent.iterdir()) == [metrics_file]
+
+    server = aedt_logger.serve_metrics()
+    host, port = server.address
+    url = f"http://{host}:{port}"
+    with urllib.request.urlopen(url + "/metrics", timeout=5) as response:
+        assert response.status == 200
+        assert response.headers['Content-Type'].startswith("text/plain; version=0.0.4")
+        assert "# TYPE aedt_log_records_total counter" in response.read().decode('utf-8')
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        urllib.request.urlopen(url + "/other", timeout=5)
+    assert excinfo.value.code == 404
+
+    aedt_logger.close()
+    with pytest.raises(urllib.error.URLError):
+        urllib.request.urlopen(url + "/metrics", timeout=5)
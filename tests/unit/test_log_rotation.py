@@ -0,0 +1,133 @@
+"""Unit tests for compressed log rotation"""
+
+import gzip
+import logging
+from logging.handlers import RotatingFileHandler
+import pytest
+import threading
+
+import aedt.core.log_rotation as log_rotation
+from aedt.core.log_rotation import (
+    CompressingRotatingFileHandler,
+    LogCompressor,
+    log_segments,
+    read_log_lines,
+    resolve_compression,
+    search_logs
+)
+from aedt.core.logger import AEDTLogger
+
+
+def make_record(message):
+    return logging.LogRecord("aedt", logging.INFO, __file__, 0, message, None, None)
+
+
+def write_lines(handler, start, count):
+    for i in range(start, start + count):
+        handler.handle(make_record(f"line {i:04d} " + "x" * 80))
+
+
+def test_resolve_compression():
+    """Test compression settings resolve to codecs"""
+    assert resolve_compression(None) is None
+    assert resolve_compression("none") is None
+    assert resolve_compression("gzip") == "gzip"
+    assert resolve_compression("auto") in ("gzip", "zstd")
+    with pytest.raises(ValueError, match="未知的日志压缩方式"):
+        resolve_compression("bzip2")
+
+
+def test_rotated_backups_are_compressed(tmp_path):
+    """Test backups end up gzip-compressed and readable as one stream"""
+    log_file = tmp_path / "aedt.log"
+    compressor = LogCompressor("gzip")
+    handler = CompressingRotatingFileHandler(
+        log_file, compressor=compressor, maxBytes=2048, backupCount=3, encoding='utf-8'
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    write_lines(handler, 0, 120)
+    handler.close()
+    compressor.close()
+
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert names == ["aedt.log", "aedt.log.1.gz", "aedt.log.2.gz", "aedt.log.3.gz"]
+    with gzip.open(tmp_path / "aedt.log.1.gz", 'rt', encoding='utf-8') as f:
+        assert f.readline().startswith("line ")
+
+    lines = list(read_log_lines(log_file))
+    numbers = [int(line.split()[1]) for line in lines]
+    assert numbers == sorted(numbers)
+    assert numbers[-1] == 119
+
+
+def test_rollover_does_not_wait_for_compression(tmp_path, monkeypatch):
+    """Test logging returns while compression runs, and the next shift waits"""
+    release = threading.Event()
+    started = threading.Event()
+    original = log_rotation.compress_file
+
+    def slow_compress(source, target, codec):
+        started.set()
+        release.wait(5)
+        original(source, target, codec)
+
+    monkeypatch.setattr(log_rotation, "compress_file", slow_compress)
+    log_file = tmp_path / "epic-1.log"
+    compressor = LogCompressor("gzip")
+    handler = CompressingRotatingFileHandler(
+        log_file, compressor=compressor, maxBytes=1024, backupCount=5, encoding='utf-8'
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    write_lines(handler, 0, 12)  # One rollover
+    assert started.wait(5)
+    assert compressor.pending(str(log_file)) == 1
+    assert (tmp_path / "epic-1.log.1").exists()
+
+    # The plain pending backup is already readable
+    assert [int(line.split()[1]) for line in read_log_lines(log_file)] == list(range(12))
+
+    release.set()
+    write_lines(handler, 12, 24)  # More rollovers wait for the pending one
+    handler.close()
+    compressor.close()
+
+    assert not (tmp_path / "epic-1.log.1").exists()
+    assert [int(line.split()[1]) for line in read_log_lines(log_file)] == list(range(36))
+
+
+def test_log_segments_order_and_search(tmp_path):
+    """Test segments are listed oldest first and searched across formats"""
+    log_file = tmp_path / "aedt.log"
+    log_file.write_text("live ERROR c\n", encoding='utf-8')
+    (tmp_path / "aedt.log.1").write_text("plain INFO b\n", encoding='utf-8')
+    with gzip.open(tmp_path / "aedt.log.2.gz", 'wt', encoding='utf-8') as f:
+        f.write("old ERROR a\n")
+    (tmp_path / "aedt.log.other").write_text("ignored\n", encoding='utf-8')
+
+    assert [path.name for path in log_segments(log_file)] == [
+        "aedt.log.2.gz", "aedt.log.1", "aedt.log"
+    ]
+    matches = [(segment.name, line) for segment, line in search_logs(log_file, r"ERROR")]
+    assert matches == [("aedt.log.2.gz", "old ERROR a"), ("aedt.log", "live ERROR c")]
+
+
+def test_aedt_logger_compresses_epic_backups(tmp_path):
+    """Test AEDTLogger rotation compresses backups and close() waits for it"""
+    aedt_logger = AEDTLogger(tmp_path / ".aedt" / "logs", compression="gzip")
+    epic_logger = aedt_logger.get_epic_logger("TestProject", "1")
+    for handler in epic_logger.handlers:
+        if isinstance(handler, RotatingFileHandler):
+            handler.maxBytes = 1024
+
+    for i in range(40):
+        epic_logger.info(f"Story progress {i} " + "y" * 60)
+    aedt_logger.close()
+
+    epic_log = tmp_path / ".aedt" / "projects" / "TestProject" / "epics" / "epic-1.log"
+    segments = log_segments(epic_log)
+    assert all(path.suffix == ".gz" for path in segments[:-1])
+    assert len(segments) > 1
+    lines = list(read_log_lines(epic_log))
+    assert "Story progress 39" in lines[-1]
@@ -0,0 +1,149 @@
+"""Unit tests for the central multi-process log sink"""
+
+import json
+import logging
+import multiprocessing
+import threading
+from logging.handlers import RotatingFileHandler
+from multiprocessing.connection import Listener
+from pathlib import Path
+
+from aedt.core.log_rotation import read_log_lines
+from aedt.core.log_sink import (
+    LogSink,
+    SinkClient,
+    sink_from_environment
+)
+from aedt.core.logger import AEDTLogger
+
+RECORDS_PER_WORKER = 200
+
+
+def worker_main(log_dir, environment, worker):
+    """Log through the sink from a separate process"""
+    address, authkey = sink_from_environment(environment)
+    aedt_logger = AEDTLogger(Path(log_dir), log_format="json",
+                             sink_address=address, sink_authkey=authkey)
+    epic_logger = aedt_logger.get_epic_logger("demo", "1", agent_id=f"agent-{worker}")
+    for i in range(RECORDS_PER_WORKER):
+        aedt_logger.get_logger("worker").info("worker %d global %d", worker, i)
+        epic_logger.info("worker %d epic %d " + "p" * 60, worker, i)
+    try:
+        raise RuntimeError("worker failure")
+    except RuntimeError:
+        epic_logger.exception("worker %d failed", worker)
+    stats = aedt_logger.sink_stats
+    aedt_logger.close()
+    assert stats['records_fallback'] == 0
+
+
+def run_workers(log_dir, sink, count):
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=worker_main, args=(str(log_dir), sink.environment(), worker))
+        for worker in range(count)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+    return [process.exitcode for process in workers]
+
+
+def test_workers_write_through_sink_with_rotation(tmp_path):
+    """Test one writer owns the files while several processes log and rotate"""
+    log_dir = tmp_path / ".aedt" / "logs"
+    owner = AEDTLogger(log_dir, log_format="json", compression="gzip")
+    epic_logger = owner.get_epic_logger("demo", "1")
+    for handler in epic_logger.handlers:
+        if isinstance(handler, RotatingFileHandler):
+            handler.maxBytes = 16 * 1024
+            handler.backupCount = 20
+    sink = LogSink(owner)
+    sink.start()
+
+    assert run_workers(log_dir, sink, 3) == [0, 0, 0]
+    sink.stop()
+    owner.close()
+
+    global_lines = [json.loads(line) for line in read_log_lines(log_dir / "aedt.log")]
+    assert len(global_lines) == 3 * RECORDS_PER_WORKER
+    assert {entry['logger'] for entry in global_lines} == {"aedt.worker"}
+
+    epic_log = tmp_path / ".aedt" / "projects" / "demo" / "epics" / "epic-1.log"
+    assert (epic_log.parent / "epic-1.log.1.gz").exists()
+    epic_lines = [json.loads(line) for line in read_log_lines(epic_log)]
+    assert len(epic_lines) == 3 * (RECORDS_PER_WORKER + 1)
+    for worker in range(3):
+        messages = [entry['message'] for entry in epic_lines
+                    if entry['message'].startswith(f"worker {worker} epic")]
+        assert [int(message.split()[3]) for message in messages] == list(range(RECORDS_PER_WORKER))
+    assert all(entry['agent_id'] == f"agent-{entry['message'].split()[1]}" for entry in epic_lines)
+    failures = [entry for entry in epic_lines if "failed" in entry['message']]
+    assert len(failures) == 3
+    assert all("RuntimeError: worker failure" in entry['exc_info'] for entry in failures)
+    assert sink.records_received == 3 * (2 * RECORDS_PER_WORKER + 1)
+
+
+def test_client_batches_records(tmp_path):
+    """Test records are sent in batches, partial batches after the interval"""
+    listener = Listener(authkey=b"secret")
+    batches = []
+
+    def receive():
+        conn = listener.accept()
+        try:
+            while True:
+                batches.append(conn.recv())
+        except EOFError:
+            conn.close()
+
+    receiver = threading.Thread(target=receive)
+    receiver.start()
+    client = SinkClient(listener.address, b"secret", fallback=None,
+                        batch_size=50, flush_interval=0.05)
+    for i in range(120):
+        record = logging.LogRecord("aedt", logging.INFO, __file__, 0, "msg %d", None, None)
+        record.msg = f"msg {i}"
+        client.put(record, "aedt", None)
+    client.close()
+    receiver.join(5)
+    listener.close()
+
+    assert [len(batch) for batch in batches] == [50, 50, 20]
+    assert [data['msg'] for batch in batches for data in batch] == [
+        f"msg {i}" for i in range(120)
+    ]
+    assert client.stats()['batches_sent'] == 3
+
+
+def test_unavailable_sink_falls_back_to_local_files(tmp_path, capsys):
+    """Test a worker writes the files directly when the sink is unreachable"""
+    log_dir = tmp_path / ".aedt" / "logs"
+    worker = AEDTLogger(log_dir, sink_address=str(tmp_path / "missing.sock"),
+                        sink_authkey=b"secret")
+    worker.get_logger("scheduler").warning("no sink")
+    worker.get_epic_logger("demo", "2").info("epic without sink")
+    worker.flush()
+    stats = worker.sink_stats
+    worker.close()
+
+    assert stats['records_fallback'] == 2
+    assert stats['records_sent'] == 0
+    assert "no sink" in (log_dir / "aedt.log").read_text(encoding='utf-8')
+    epic_log = tmp_path / ".aedt" / "projects" / "demo" / "epics" / "epic-2.log"
+    assert "epic without sink" in epic_log.read_text(encoding='utf-8')
+    assert "无法连接日志汇聚进程" in capsys.readouterr().err
+
+
+def test_sink_environment_roundtrip(tmp_path):
+    """Test the sink address and key survive the environment"""
+    owner = AEDTLogger(tmp_path / "logs")
+    sink = LogSink(owner, authkey=b"\x01\x02")
+    sink.start()
+    try:
+        assert sink_from_environment(sink.environment()) == (sink.address, b"\x01\x02")
+        assert sink_from_environment({}) is None
+    finally:
+        sink.stop()
+        owner.close()
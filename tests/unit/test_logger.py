@@ -1,13 +1,16 @@
 """Unit tests for AEDTLogger"""
 
+import json
 import pytest
 import tempfile
 import shutil
 from pathlib import Path
 import logging
+import logging.handlers
+import threading
 import time
 
-from aedt.core.logger import AEDTLogger
+from aedt.core.logger import AEDTLogger, HandlerPool, LogQueue, RingBufferHandler
 
 
 @pytest.fixture
@@ -343,3 +346,305 @@ def test_utf8_encoding_support(logger_instance, temp_dir):
         content = f.read()
 
     assert "测试中文日志 🚀" in content
+
+
+def make_record(level, msg):
+    """Build a log record for queue tests"""
+    return logging.LogRecord("aedt", level, __file__, 0, msg, None, None)
+
+
+def test_queued_logger_writes_on_listener_thread(temp_dir, monkeypatch):
+    """Test queued mode moves file I/O off the logging thread"""
+    log_dir = temp_dir / ".aedt" / "logs"
+    emit_threads = []
+    original_emit = logging.handlers.RotatingFileHandler.emit
+
+    def recording_emit(self, record):
+        emit_threads.append(threading.current_thread().name)
+        original_emit(self, record)
+
+    monkeypatch.setattr(logging.handlers.RotatingFileHandler, "emit", recording_emit)
+    aedt_logger = AEDTLogger(log_dir, log_level="DEBUG", queued=True)
+
+    aedt_logger.get_logger("scheduler").info("Queued module message")
+    aedt_logger.get_epic_logger("TestProject", "1").info("Queued epic message")
+    aedt_logger.flush()
+
+    global_content = (log_dir / "aedt.log").read_text(encoding='utf-8')
+    epic_log = temp_dir / ".aedt" / "projects" / "TestProject" / "epics" / "epic-1.log"
+    assert "[aedt.scheduler] Queued module message" in global_content
+    assert "Queued epic message" not in global_content
+    assert "Queued epic message" in epic_log.read_text(encoding='utf-8')
+    assert emit_threads and threading.current_thread().name not in emit_threads
+
+    aedt_logger.close()
+
+
+def test_queued_close_drains_queue(temp_dir):
+    """Test close() writes every record enqueued before it"""
+    log_dir = temp_dir / ".aedt" / "logs"
+    aedt_logger = AEDTLogger(log_dir, log_level="INFO", queued=True, queue_size=16)
+
+    for i in range(500):
+        aedt_logger.global_logger.info(f"drain message {i}")
+    aedt_logger.close()
+
+    lines = (log_dir / "aedt.log").read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 500
+    assert lines[-1].endswith("drain message 499")
+    assert aedt_logger.dropped_records == {}
+
+
+def test_log_queue_drop_debug_policy():
+    """Test drop-debug drops only DEBUG records when the queue is full"""
+    log_queue = LogQueue(maxsize=2, overflow="drop-debug")
+    log_queue.put(make_record(logging.INFO, "first"))
+    log_queue.put(make_record(logging.INFO, "second"))
+
+    log_queue.put(make_record(logging.DEBUG, "dropped"))
+
+    assert log_queue.dropped == {"DEBUG": 1}
+    assert log_queue.queue.qsize() == 2
+
+
+def test_log_queue_drop_oldest_policy():
+    """Test drop-oldest evicts the oldest record to make room"""
+    log_queue = LogQueue(maxsize=2, overflow="drop-oldest")
+    for msg in ("first", "second", "third"):
+        log_queue.put(make_record(logging.INFO, msg))
+
+    assert log_queue.dropped == {"INFO": 1}
+    assert [log_queue.queue.get_nowait().msg for _ in range(2)] == ["second", "third"]
+
+
+def test_log_queue_rejects_unknown_policy(temp_dir):
+    """Test an unknown overflow policy is rejected"""
+    with pytest.raises(ValueError, match="未知的日志溢出策略"):
+        AEDTLogger(temp_dir / "logs", queued=True, overflow="drop-newest")
+
+
+def test_foreign_handlers_do_not_block_setup(temp_dir):
+    """Test handlers attached by others do not count as AEDT handlers"""
+    foreign = logging.NullHandler()
+    logging.getLogger("aedt").addHandler(foreign)
+    try:
+        aedt_logger = AEDTLogger(temp_dir / "logs")
+        aedt_logger.global_logger.info("Written despite foreign handler")
+        aedt_logger.close()
+
+        assert "Written despite foreign handler" in (temp_dir / "logs" / "aedt.log").read_text()
+        assert foreign in logging.getLogger("aedt").handlers
+    finally:
+        logging.getLogger("aedt").removeHandler(foreign)
+
+
+def test_json_format_epic_logger(temp_dir):
+    """Test JSON-lines output carries the context bound at get_epic_logger"""
+    aedt_logger = AEDTLogger(temp_dir / ".aedt" / "logs", log_format="json")
+    epic_logger = aedt_logger.get_epic_logger("TestProject", "3", agent_id="agent-1")
+
+    epic_logger.info("Story %s done", "3-1", extra={'duration': 1.5})
+    aedt_logger.get_epic_logger("TestProject", "3", agent_id="agent-2").warning("Reassigned")
+    aedt_logger.close()
+
+    epic_log = temp_dir / ".aedt" / "projects" / "TestProject" / "epics" / "epic-3.log"
+    first, second = [json.loads(line) for line in epic_log.read_text(encoding='utf-8').splitlines()]
+    assert list(first) == ['ts', 'level', 'logger', 'project', 'epic_id', 'agent_id',
+                           'message', 'extra']
+    assert first['level'] == "INFO"
+    assert first['logger'] == "aedt.TestProject.epic.3"
+    assert first['project'] == "TestProject"
+    assert first['epic_id'] == "3"
+    assert first['agent_id'] == "agent-1"
+    assert first['message'] == "Story 3-1 done"
+    assert first['extra'] == {'duration': 1.5}
+    assert second['agent_id'] == "agent-2"
+    assert 'extra' not in second
+
+
+def test_json_format_global_logger_with_exception(temp_dir):
+    """Test JSON-lines output of module loggers and exceptions is the same queued or not"""
+    entries = {}
+    for queued in (False, True):
+        log_dir = temp_dir / f"queued-{queued}" / ".aedt" / "logs"
+        aedt_logger = AEDTLogger(log_dir, log_format="json", queued=queued)
+        try:
+            raise RuntimeError("测试异常")
+        except RuntimeError:
+            aedt_logger.get_logger("scheduler").exception("调度失败 %d", 3)
+        aedt_logger.close()
+        entries[queued] = json.loads((log_dir / "aedt.log").read_text(encoding='utf-8'))
+
+    for entry in entries.values():
+        assert list(entry) == ['ts', 'level', 'logger', 'message', 'exc_info']
+        assert entry['logger'] == "aedt.scheduler"
+        assert entry['message'] == "调度失败 3"
+        assert entry['exc_info'].endswith("RuntimeError: 测试异常")
+    assert {**entries[True], 'ts': None} == {**entries[False], 'ts': None}
+
+
+def test_invalid_log_format(temp_dir):
+    """Test an unknown log format is rejected"""
+    with pytest.raises(ValueError, match="未知的日志格式"):
+        AEDTLogger(temp_dir / "logs", log_format="xml")
+
+
+def test_handler_pool_limits_open_epic_files(temp_dir):
+    """Test idle epic log files are closed and reopened in append mode"""
+    aedt_logger = AEDTLogger(temp_dir / ".aedt" / "logs", max_open_files=2)
+    epic_loggers = [aedt_logger.get_epic_logger("TestProject", str(i)) for i in range(5)]
+
+    for round_number in range(2):
+        for i, epic_logger in enumerate(epic_loggers):
+            epic_logger.info(f"Epic {i} round {round_number}")
+            open_streams = [
+                handler for handler in aedt_logger._file_handlers.values()
+                if handler.stream is not None and handler is not aedt_logger._file_handlers["aedt"]
+            ]
+            assert len(open_streams) <= 2
+
+    stats = aedt_logger.handler_pool_stats
+    assert stats['open'] == 2
+    assert stats['misses'] == 10
+    assert stats['hits'] == 0
+    assert stats['evictions'] == 8
+
+    epic_loggers[4].info("Again")
+    assert aedt_logger.handler_pool_stats['hits'] == 1
+    aedt_logger.close()
+
+    epics_dir = temp_dir / ".aedt" / "projects" / "TestProject" / "epics"
+    content = (epics_dir / "epic-0.log").read_text(encoding='utf-8')
+    assert "Epic 0 round 0" in content
+    assert "Epic 0 round 1" in content
+
+
+def test_handler_pool_concurrent_writers(temp_dir):
+    """Test concurrent writes to more epics than the pool allows"""
+    aedt_logger = AEDTLogger(temp_dir / ".aedt" / "logs", max_open_files=3)
+
+    def write(worker):
+        for i in range(50):
+            aedt_logger.get_epic_logger("TestProject", str((worker + i) % 8)).info(
+                f"worker {worker} line {i}"
+            )
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    aedt_logger.close()
+
+    epics_dir = temp_dir / ".aedt" / "projects" / "TestProject" / "epics"
+    lines = sum(
+        len(path.read_text(encoding='utf-8').splitlines()) for path in epics_dir.glob("*.log")
+    )
+    assert lines == 200
+
+
+def test_handler_pool_rejects_invalid_limit():
+    """Test max_open must be positive"""
+    with pytest.raises(ValueError, match="max_open"):
+        HandlerPool(0)
+
+
+def test_recent_records_per_epic(temp_dir):
+    """Test recent() returns the last formatted records of one epic"""
+    aedt_logger = AEDTLogger(temp_dir / ".aedt" / "logs", log_level="DEBUG", ring_size=5)
+    epic1 = aedt_logger.get_epic_logger("TestProject", "1")
+    epic2 = aedt_logger.get_epic_logger("TestProject", "2")
+
+    for i in range(8):
+        epic1.debug(f"Epic 1 step {i}")
+    epic1.error("Epic 1 failed")
+    epic2.info("Epic 2 started")
+    aedt_logger.get_logger("scheduler").warning("Scheduler busy")
+
+    recent = aedt_logger.recent("1", n=3)
+    assert [r.text.split("] ")[-1] for r in recent] == [
+        "Epic 1 step 6", "Epic 1 step 7", "Epic 1 failed"
+    ]
+    assert recent[-1].text.startswith("[")
+    assert "[ERROR] [aedt.TestProject.epic.1]" in recent[-1].text
+    assert [r.levelname for r in aedt_logger.recent("1", min_level="ERROR")] == ["ERROR"]
+    assert len(aedt_logger.recent("1", n=100)) == 5
+    assert [r.text.split("] ")[-1] for r in aedt_logger.recent("2")] == ["Epic 2 started"]
+    assert [r.text.split("] ")[-1] for r in aedt_logger.recent()] == ["Scheduler busy"]
+    assert aedt_logger.recent("99") == []
+    aedt_logger.close()
+
+
+def test_since_cursor_returns_only_new_records(temp_dir):
+    """Test since() lets a renderer pull deltas"""
+    aedt_logger = AEDTLogger(temp_dir / ".aedt" / "logs", ring_size=4)
+    epic_logger = aedt_logger.get_epic_logger("TestProject", "1")
+
+    records, cursor = aedt_logger.since(0, epic_id="1")
+    assert records == []
+
+    epic_logger.info("first")
+    epic_logger.warning("second")
+    records, cursor = aedt_logger.since(cursor, epic_id="1")
+    assert [r.seq for r in records] == [1, 2]
+
+    records, cursor = aedt_logger.since(cursor, epic_id="1")
+    assert records == [] and cursor == 2
+
+    for i in range(6):
+        epic_logger.info(f"burst {i}")
+    records, cursor = aedt_logger.since(cursor, epic_id="1")
+    # Only the 4 retained records come back; the seq gap shows the loss
+    assert [r.seq for r in records] == [5, 6, 7, 8]
+    assert cursor == 8
+
+    epic_logger.warning("third")
+    records, cursor = aedt_logger.since(cursor, epic_id="1", min_level="WARNING")
+    assert [r.text.split("] ")[-1] for r in records] == ["third"]
+    aedt_logger.close()
+
+
+def test_recent_requires_project_for_ambiguous_epic(temp_dir):
+    """Test epic ids shared by several projects need project_name"""
+    aedt_logger = AEDTLogger(temp_dir / ".aedt" / "logs")
+    aedt_logger.get_epic_logger("ProjectA", "1").info("from A")
+    aedt_logger.get_epic_logger("ProjectB", "1").info("from B")
+
+    with pytest.raises(ValueError, match="project_name"):
+        aedt_logger.recent("1")
+    recent = aedt_logger.recent("1", project_name="ProjectB")
+    assert recent[0].text.endswith("from B")
+    aedt_logger.close()
+
+
+def test_recent_in_queued_mode(temp_dir):
+    """Test ring buffers are filled by the queue listener"""
+    aedt_logger = AEDTLogger(temp_dir / ".aedt" / "logs", queued=True)
+    aedt_logger.get_epic_logger("TestProject", "1").info("queued record")
+    aedt_logger.flush()
+
+    assert aedt_logger.recent("1")[0].text.endswith("queued record")
+    aedt_logger.close()
+
+
+def test_ring_buffer_concurrent_writers():
+    """Test sequence numbers stay unique and ordered under concurrency"""
+    ring_buffer = RingBufferHandler(capacity=10000)
+    ring_logger = logging.getLogger("aedt.test.ring")
+    ring_logger.propagate = False
+    ring_logger.addHandler(ring_buffer)
+
+    def write(worker):
+        for i in range(500):
+            ring_logger.warning(f"worker {worker} record {i}")
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ring_logger.removeHandler(ring_buffer)
+
+    records, cursor = ring_buffer.since(0)
+    assert [r.seq for r in records] == list(range(1, 2001))
+    assert cursor == 2000
@@ -0,0 +1,197 @@
+"""Unit tests for SQLiteStateStore"""
+
+import pytest
+import tempfile
+import shutil
+import sqlite3
+from pathlib import Path
+
+from aedt.core.data_store import DataStore
+from aedt.core.sqlite_state_store import SQLiteStateStore
+from aedt.core.state_manager import EpicState, ProjectState, StateManager
+
+
+@pytest.fixture
+def temp_dir():
+    """Create temporary directory for tests"""
+    tmp_dir = Path(tempfile.mkdtemp())
+    yield tmp_dir
+    # Cleanup
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+
+
+@pytest.fixture
+def store(temp_dir):
+    """Create SQLiteStateStore instance"""
+    sqlite_store = SQLiteStateStore(temp_dir / "state.db")
+    yield sqlite_store
+    sqlite_store.close()
+
+
+def make_project(index: int, epic_count: int = 3) -> ProjectState:
+    """Build a project state with a few epics"""
+    epics = {
+        str(i): EpicState(
+            epic_id=str(i),
+            status="developing" if i % 2 else "queued",
+            progress=float(i * 10),
+            agent_id=f"agent-{i % 2}",
+            completed_stories=[f"{i}-1", f"{i}-2"]
+        )
+        for i in range(1, epic_count + 1)
+    }
+    return ProjectState(
+        project_id=f"proj-{index:03d}",
+        project_name=f"Project{index}",
+        epics=epics
+    )
+
+
+def test_database_uses_wal_mode(store, temp_dir):
+    """Test database is opened in WAL journal mode"""
+    conn = sqlite3.connect(str(temp_dir / "state.db"))
+    try:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        indexes = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )}
+    finally:
+        conn.close()
+
+    assert mode == "wal"
+    assert "idx_epics_status" in indexes
+    assert "idx_epics_agent_id" in indexes
+
+
+def test_upsert_and_load_roundtrip(store):
+    """Test batch upsert followed by load returns identical states"""
+    projects = [make_project(i) for i in range(5)]
+
+    assert store.upsert_projects(projects) == 5
+
+    loaded = store.load_projects()
+    assert len(loaded) == 5
+    original = projects[2]
+    restored = loaded[original.project_id]
+    assert restored.project_name == original.project_name
+    assert list(restored.epics) == list(original.epics)
+    assert restored.epics["1"].completed_stories == ["1-1", "1-2"]
+    assert restored.epics["1"].agent_id == "agent-1"
+
+
+def test_upsert_replaces_removed_epics(store):
+    """Test upsert drops epics no longer present in the project state"""
+    project = make_project(1, epic_count=3)
+    store.upsert_project(project)
+
+    del project.epics["3"]
+    project.epics["1"].status = "completed"
+    store.upsert_project(project)
+
+    restored = store.load_project(project.project_id)
+    assert set(restored.epics) == {"1", "2"}
+    assert restored.epics["1"].status == "completed"
+
+
+def test_query_epics_by_status_and_agent(store):
+    """Test cross-project epic queries"""
+    store.upsert_projects([make_project(i) for i in range(3)])
+
+    developing = store.query_epics(status="developing")
+    assert len(developing) == 6  # epics 1 and 3 in each project
+    assert all(epic.status == "developing" for _, epic in developing)
+
+    agent_epics = store.query_epics(agent_id="agent-0", project_id="proj-001")
+    assert [epic.epic_id for _, epic in agent_epics] == ["2"]
+
+
+def test_load_missing_project_returns_none(store):
+    """Test loading unknown project returns None"""
+    assert store.load_project("missing") is None
+
+
+def test_delete_project(store):
+    """Test deleting a project removes its epics"""
+    store.upsert_project(make_project(1))
+
+    assert store.delete_project("proj-001") is True
+    assert store.load_projects() == {}
+    assert store.query_epics() == []
+
+
+def test_export_and_import_yaml_layout(store, temp_dir):
+    """Test export to status.yaml layout and import back"""
+    data_store = DataStore(temp_dir)
+    projects_dir = temp_dir / "projects"
+    store.upsert_projects([make_project(i) for i in range(3)])
+
+    assert store.export_to_yaml(projects_dir, data_store) == 3
+    assert (projects_dir / "Project1" / "status.yaml").exists()
+
+    # File backend sees the exported states
+    file_manager = StateManager(temp_dir, data_store)
+    file_manager.load_all_states()
+    assert set(file_manager.projects) == {"proj-000", "proj-001", "proj-002"}
+
+    # Import into a fresh database
+    other = SQLiteStateStore(temp_dir / "other.db")
+    try:
+        assert other.import_from_yaml(projects_dir, data_store, batch_size=2) == 3
+        assert set(other.load_projects()) == {"proj-000", "proj-001", "proj-002"}
+    finally:
+        other.close()
+
+
+def test_import_skips_invalid_files(store, temp_dir):
+    """Test import skips corrupted status files"""
+    data_store = DataStore(temp_dir)
+    projects_dir = temp_dir / "projects"
+    data_store.atomic_write(
+        projects_dir / "Good" / "status.yaml",
+        {'project_id': 'good', 'project_name': 'Good', 'epics': {}}
+    )
+    bad_file = projects_dir / "Bad" / "status.yaml"
+    bad_file.parent.mkdir(parents=True)
+    bad_file.write_text("invalid: yaml: [", encoding='utf-8')
+
+    assert store.import_from_yaml(projects_dir, data_store) == 1
+    assert set(store.load_projects()) == {"good"}
+
+
+def test_import_state_file_streams_in_batches(store, temp_dir):
+    """Test importing a large status.yaml in epic batches"""
+    data_store = DataStore(temp_dir)
+    state_file = temp_dir / "projects" / "Big" / "status.yaml"
+    project = make_project(7, epic_count=25)
+    data_store.atomic_write(state_file, {
+        'project_id': project.project_id,
+        'project_name': project.project_name,
+        'version': 3,
+        'epics': {
+            epic_id: {
+                'epic_id': epic.epic_id,
+                'status': epic.status,
+                'progress': epic.progress,
+                'completed_stories': epic.completed_stories,
+            }
+            for epic_id, epic in project.epics.items()
+        }
+    })
+
+    assert store.import_state_file(state_file, data_store, batch_size=4) == "proj-007"
+
+    restored = store.load_project("proj-007")
+    assert len(restored.epics) == 25
+    assert restored.version == 3
+
+
+def test_import_state_file_missing_fields(store, temp_dir):
+    """Test import rejects status files without project identity"""
+    data_store = DataStore(temp_dir)
+    state_file = temp_dir / "projects" / "Bad" / "status.yaml"
+    data_store.atomic_write(state_file, {'epics': {}})
+
+    with pytest.raises(ValueError, match="缺少必需字段"):
+        store.import_state_file(state_file, data_store)
+    assert store.load_projects() == {}
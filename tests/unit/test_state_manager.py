@@ -3,9 +3,12 @@
 import pytest
 import tempfile
 import shutil
+import threading
+import yaml
 from pathlib import Path
 from datetime import datetime
 
+from aedt.core.config_manager import StateConfig
 from aedt.core.data_store import DataStore
 from aedt.core.state_manager import StateManager, EpicState, ProjectState
 
@@ -405,3 +408,248 @@ def test_project_state_to_dict(state_manager):
     assert epic_dict['status'] == "completed"
     assert epic_dict['progress'] == 100.0
     assert epic_dict['completed_stories'] == ["1-1", "1-2"]
+
+
+def test_unknown_backend_rejected(temp_dir, data_store):
+    """Test StateManager rejects unknown backends"""
+    with pytest.raises(ValueError, match="未知的状态后端"):
+        StateManager(temp_dir, data_store, backend="redis")
+
+
+def test_sqlite_backend_save_and_load(temp_dir, data_store):
+    """Test StateManager persists through the SQLite backend"""
+    manager = StateManager(temp_dir, data_store, backend="sqlite")
+    project = ProjectState(
+        project_id="test-001",
+        project_name="TestProject",
+        epics={
+            "1": EpicState(epic_id="1", status="developing", progress=40.0,
+                           agent_id="agent-1"),
+            "2": EpicState(epic_id="2", status="queued", progress=0.0),
+        }
+    )
+    manager.save_project_state(project)
+    manager.close()
+
+    # No status.yaml written with the sqlite backend
+    assert not (temp_dir / "projects" / "TestProject" / "status.yaml").exists()
+    assert (temp_dir / "state.db").exists()
+
+    reloaded = StateManager(temp_dir, data_store, backend="sqlite")
+    try:
+        projects = reloaded.load_all_states()
+        # Crash recovery still applies
+        assert projects["test-001"].epics["1"].status == "paused"
+        assert [epic.epic_id for _, epic in reloaded.query_epics(agent_id="agent-1")] == ["1"]
+    finally:
+        reloaded.close()
+
+
+def test_from_config_resolves_sqlite_path_against_project_root(tmp_path, monkeypatch):
+    """Test the configured SQLite path is relative to the project root, not the cwd"""
+    base_dir = tmp_path / "project" / ".aedt"
+    data_store = DataStore(base_dir)
+    monkeypatch.chdir(tmp_path)
+
+    manager = StateManager.from_config(base_dir, data_store, StateConfig(backend="sqlite"))
+    try:
+        manager.save_project_state(ProjectState(project_id="p1", project_name="P1"))
+    finally:
+        manager.close()
+    assert (base_dir / "state.db").exists()
+    assert not (tmp_path / ".aedt").exists()
+
+    custom = tmp_path / "elsewhere" / "custom.db"
+    manager = StateManager.from_config(
+        base_dir, data_store, StateConfig(backend="sqlite", sqlite_path=str(custom))
+    )
+    try:
+        assert manager.sqlite_store is not None
+    finally:
+        manager.close()
+    assert custom.exists()
+
+    manager = StateManager.from_config(base_dir, data_store, StateConfig())
+    assert manager.backend == "file"
+    assert manager.sqlite_store is None
+
+
+def test_query_epics_file_backend(state_manager):
+    """Test query_epics scans in-memory states for the file backend"""
+    project = ProjectState(
+        project_id="test-001",
+        project_name="TestProject",
+        epics={
+            "1": EpicState(epic_id="1", status="completed", progress=100.0),
+            "2": EpicState(epic_id="2", status="queued", progress=0.0),
+        }
+    )
+    state_manager.save_project_state(project)
+
+    result = state_manager.query_epics(status="queued")
+    assert [(pid, epic.epic_id) for pid, epic in result] == [("test-001", "2")]
+
+
+def test_reload_project_merges_newer_state(state_manager, temp_dir, data_store):
+    """Test reload_project picks up a newer state written by another process"""
+    project = ProjectState(
+        project_id="test-001",
+        project_name="TestProject",
+        epics={"1": EpicState(epic_id="1", status="queued", progress=0.0)}
+    )
+    state_manager.save_project_state(project)
+    held_reference = state_manager.get_project_state("test-001")
+
+    events = []
+    state_manager.add_change_listener(lambda pid, state: events.append((pid, state.version)))
+
+    # Another process writes a newer version
+    other = StateManager(temp_dir, data_store)
+    other.load_all_states()
+    other.update_epic_state("test-001", "1", status="developing", progress=30.0)
+
+    state_file = temp_dir / "projects" / "TestProject" / "status.yaml"
+    merged = state_manager.reload_project(state_file)
+
+    assert merged is held_reference
+    assert held_reference.epics["1"].status == "developing"
+    assert held_reference.version == 2
+    assert events == [("test-001", 2)]
+
+
+def test_reload_project_ignores_own_and_stale_writes(state_manager, temp_dir):
+    """Test reload_project does not emit events for unchanged or older states"""
+    project = ProjectState(project_id="test-001", project_name="TestProject")
+    state_manager.save_project_state(project)
+    state_file = temp_dir / "projects" / "TestProject" / "status.yaml"
+
+    events = []
+    state_manager.add_change_listener(lambda pid, state: events.append(pid))
+
+    # Our own write
+    assert state_manager.reload_project(state_file) is None
+
+    # In-memory state moved ahead of disk
+    project.version += 1
+    assert state_manager.reload_project(state_file) is None
+    assert events == []
+
+
+def test_reload_project_waits_for_concurrent_save(state_manager, temp_dir, monkeypatch):
+    """Test a reload does not merge while a save of the project is in progress"""
+    project = ProjectState(project_id="test-001", project_name="TestProject")
+    state_manager.save_project_state(project)
+    state_file = temp_dir / "projects" / "TestProject" / "status.yaml"
+
+    order = []
+    reloader = threading.Thread(
+        target=lambda: order.append(("reload", state_manager.reload_project(state_file)))
+    )
+    original_write = state_manager.data_store.atomic_write
+
+    def write_while_reloading(path, data):
+        reloader.start()
+        reloader.join(0.2)
+        order.append("written")
+        return original_write(path, data)
+
+    monkeypatch.setattr(state_manager.data_store, "atomic_write", write_while_reloading)
+    project.epics["1"] = EpicState(epic_id="1", status="queued", progress=0.0)
+    state_manager.save_project_state(project)
+    reloader.join(5)
+
+    assert order == ["written", ("reload", None)]
+    assert state_manager.get_project_state("test-001").epics["1"].status == "queued"
+
+
+def test_reload_project_adds_unknown_project(state_manager, temp_dir, data_store):
+    """Test reload_project adds projects not yet in memory"""
+    state_file = temp_dir / "projects" / "NewProject" / "status.yaml"
+    data_store.atomic_write(state_file, {
+        'project_id': 'new-001',
+        'project_name': 'NewProject',
+        'version': 1,
+        'epics': {}
+    })
+
+    merged = state_manager.reload_project(state_file)
+
+    assert merged is not None
+    assert state_manager.get_project_state("new-001") is merged
+
+
+def test_load_skips_validation_for_unchanged_files(temp_dir, monkeypatch):
+    """Test load_all_states does not re-validate files with a known digest"""
+    data_store = DataStore(temp_dir, integrity=True)
+    manager = StateManager(temp_dir, data_store)
+    manager.save_project_state(ProjectState(project_id="p1", project_name="P1"))
+    manager.save_project_state(ProjectState(project_id="p2", project_name="P2"))
+
+    validated = []
+    original_validate = StateManager._validate_state
+
+    def counting_validate(self, project_state):
+        validated.append(project_state.project_id)
+        return original_validate(self, project_state)
+
+    monkeypatch.setattr(StateManager, "_validate_state", counting_validate)
+
+    manager.load_all_states()
+    assert sorted(validated) == ["p1", "p2"]
+
+    # Nothing changed on disk: no validation
+    validated.clear()
+    manager.load_all_states()
+    assert validated == []
+
+    # Only the changed project is validated again
+    manager.save_project_state(manager.get_project_state("p1"))
+    manager.load_all_states()
+    assert validated == ["p1"]
+
+
+def test_load_reads_each_state_file_once(state_manager, temp_dir, monkeypatch):
+    """Test load_all_states reads a file once and parses it only if it changed"""
+    state_manager.save_project_state(ProjectState(project_id="p1", project_name="P1"))
+    state_manager.load_all_states()
+
+    reads = []
+    original_read_bytes = Path.read_bytes
+
+    def counting_read_bytes(path):
+        if path.name == "status.yaml":
+            reads.append(path)
+        return original_read_bytes(path)
+
+    monkeypatch.setattr(Path, "read_bytes", counting_read_bytes)
+    monkeypatch.setattr(yaml, "safe_load", lambda *args: pytest.fail("unchanged file parsed"))
+    state_manager.load_all_states()
+    assert len(reads) == 1
+
+    monkeypatch.undo()
+    project = state_manager.get_project_state("p1")
+    project.epics["1"] = EpicState(epic_id="1", status="queued", progress=0.0)
+    state_manager.save_project_state(project)
+    monkeypatch.setattr(Path, "read_bytes", counting_read_bytes)
+    reads.clear()
+    assert list(state_manager.load_all_states()["p1"].epics) == ["1"]
+    assert len(reads) == 1
+
+
+def test_iter_epic_states_streams_epics(state_manager, temp_dir):
+    """Test iter_epic_states yields EpicState objects from status.yaml"""
+    project = ProjectState(
+        project_id="test-001",
+        project_name="TestProject",
+        epics={
+            str(i): EpicState(epic_id=str(i), status="queued", progress=0.0)
+            for i in range(5)
+        }
+    )
+    state_manager.save_project_state(project)
+    state_file = temp_dir / "projects" / "TestProject" / "status.yaml"
+
+    epics = list(state_manager.iter_epic_states(state_file))
+
+    assert [epic.epic_id for epic in epics] == ["0", "1", "2", "3", "4"]
+    assert all(isinstance(epic, EpicState) for epic in epics)